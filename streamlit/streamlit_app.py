@@ -1,9 +1,26 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from snowflake.snowpark.context import get_active_session
-from utils.data_loader import load_dashboard_data, load_baseline_data as load_baseline_parallel
+from utils.data_loader import load_dashboard_store
+from utils.sensitivity import sensitivity_aggregates, calculate_roce_sensitivity, calculate_roce_surface
+from utils.causal_graph import compile_causal_graph
+from utils.monte_carlo import simulate_shock_bands
+from utils.explanation_store import ExplanationStore, explanation_key
+from utils.prefetch import Prefetcher
+from utils.doc_index import DEFAULT_SYNC_INTERVAL, default_index
+from utils.theme import (
+    DARK_BG, CARD_BG, BORDER, TEXT, TEXT_MUTED, SNOWFLAKE_BLUE, VALENCIA_ORANGE, PURPLE_MOON,
+    BLUE_ORANGE_DIVERGING, ACRONYM_DEFINITIONS, apply_dark_theme
+)
+from utils.dashboard import render_metrics_tree_dashboard, inventory_decomposition, create_inventory_area
+from utils.visualizations import frame_fingerprint
+from utils.instrumentation import (
+    begin_rerun_profile, finish_rerun_profile, in_fragment_rerun, profiled_fragment, render_debug_panel, span,
+    timed, bind, tracked_cache_data
+)
 
 st.set_page_config(
     page_title="Causal Chain: Strategy Simulator",
@@ -12,145 +29,49 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-DARK_BG = "#000000"
-CARD_BG = "#24323D"
-BORDER = "#334155"
-TEXT = "#FFFFFF"
-TEXT_MUTED = "#8A999E"
-SNOWFLAKE_BLUE = "#29B5E8"
-STAR_BLUE = "#71D3DC"
-MID_BLUE = "#11567F"
-VALENCIA_ORANGE = "#FF9F36"
-PURPLE_MOON = "#7D44CF"
-FIRST_LIGHT = "#D45B90"
-
-CATEGORICAL_COLORS = ['#29B5E8', '#FF9F36', '#71D3DC', '#7D44CF', '#D45B90', '#8A999E']
-SNOWFLAKE_BLUES = ['#E6F7FC', '#CCF0F9', '#99E1F3', '#66D2ED', '#29B5E8', '#2198C8', '#197BA8', '#11567F', '#003545']
-BLUE_ORANGE_DIVERGING = ['#003545', '#11567F', '#29B5E8', '#71D3DC', '#8A999E', '#FFBF6B', '#FF9F36', '#E68A2E', '#CC7A29']
-
-ACRONYM_DEFINITIONS = {
-    'ROCE': ('Return on Capital Employed', 'Measures profitability relative to capital invested. ROCE = NOPAT / Capital Employed'),
-    'NOPAT': ('Net Operating Profit After Tax', 'Operating profit minus taxes, excluding financing costs. Shows true operational performance'),
-    'FCF': ('Free Cash Flow', 'Cash generated after capital expenditures. Available for dividends, debt repayment, or reinvestment'),
-    'DIOH': ('Days Inventory On Hand', 'Average number of days inventory is held before sale. Lower = faster turnover'),
-    'MAPE': ('Mean Absolute Percentage Error', 'Forecast accuracy metric. Lower values indicate more accurate demand predictions'),
-    'OEE': ('Overall Equipment Effectiveness', 'Manufacturing productivity metric combining availability, performance, and quality'),
-    'OTIF': ('On Time In Full', 'Delivery performance metric. Percentage of orders delivered complete and on schedule'),
-    'COGS': ('Cost of Goods Sold', 'Direct costs of producing goods sold. Includes materials, labor, and manufacturing overhead'),
-    'SKU': ('Stock Keeping Unit', 'Unique identifier for each distinct product. SKU breadth = product variety offered'),
-    'NPI': ('New Product Introduction', 'Process of bringing new products to market. Impacts SKU breadth and inventory complexity'),
-    'CapEx': ('Capital Expenditure', 'Funds used to acquire or upgrade physical assets like equipment or facilities'),
-    'WC': ('Working Capital', 'Current assets minus current liabilities. Measures short-term liquidity'),
-    'CI': ('Confidence Interval', 'Statistical range likely to contain the true value. Wider CI = more uncertainty'),
-    'EVA': ('Economic Value Added', 'Net operating profit minus cost of capital. Positive EVA means value creation above required returns'),
-}
-
-def acronym_with_tooltip(acronym, color=None):
-    if acronym not in ACRONYM_DEFINITIONS:
-        return acronym
-    full_name, description = ACRONYM_DEFINITIONS[acronym]
-    text_color = color if color else TEXT_MUTED
-    return f'''<span style="position: relative; cursor: help; border-bottom: 1px dotted {TEXT_MUTED};" title="{full_name}: {description}">{acronym}<sup style="font-size: 0.5rem; color: {SNOWFLAKE_BLUE}; margin-left: 1px;">ⓘ</sup></span>'''
-
-def text_with_acronym_tooltips(text, color=None):
-    result = text
-    for acronym in ACRONYM_DEFINITIONS.keys():
-        if acronym in result:
-            result = result.replace(acronym, acronym_with_tooltip(acronym, color))
-    return result
-
-STRATEGY_TARGETS = {
-    'GROWTH': {
-        'FORECAST_MAPE_PCT': 15.0, 'LEAD_TIME_DAYS': 14.0, 'BATCH_SIZE': 100, 'OEE_PCT': 75.0, 'SKU_BREADTH': 200,
-        'SAFETY_STOCK_VALUE': 6_000_000, 'PIPELINE_STOCK_VALUE': 7_000_000, 'CYCLE_STOCK_VALUE': 15_000_000,
-        'COGS_USD': 55_000_000, 'DIOH_DAYS': 35,
-        'OTIF_PCT': 98.0, 'NET_SALES_GROWTH_PCT': 15.0, 'ROCE_PCT': 12.0, 'FREE_CASH_FLOW_USD': 8_000_000, 'CAPITAL_EMPLOYED_USD': 120_000_000
-    },
-    'MARGIN': {
-        'FORECAST_MAPE_PCT': 18.0, 'LEAD_TIME_DAYS': 10.0, 'BATCH_SIZE': 150, 'OEE_PCT': 80.0, 'SKU_BREADTH': 120,
-        'SAFETY_STOCK_VALUE': 3_500_000, 'PIPELINE_STOCK_VALUE': 4_500_000, 'CYCLE_STOCK_VALUE': 10_000_000,
-        'COGS_USD': 50_000_000, 'DIOH_DAYS': 22,
-        'OTIF_PCT': 94.0, 'NET_SALES_GROWTH_PCT': 8.0, 'ROCE_PCT': 16.0, 'FREE_CASH_FLOW_USD': 12_000_000, 'CAPITAL_EMPLOYED_USD': 85_000_000
-    },
-    'CASH': {
-        'FORECAST_MAPE_PCT': 20.0, 'LEAD_TIME_DAYS': 8.0, 'BATCH_SIZE': 200, 'OEE_PCT': 85.0, 'SKU_BREADTH': 100,
-        'SAFETY_STOCK_VALUE': 3_000_000, 'PIPELINE_STOCK_VALUE': 4_000_000, 'CYCLE_STOCK_VALUE': 8_000_000,
-        'COGS_USD': 48_000_000, 'DIOH_DAYS': 18,
-        'OTIF_PCT': 92.0, 'NET_SALES_GROWTH_PCT': 5.0, 'ROCE_PCT': 18.0, 'FREE_CASH_FLOW_USD': 15_000_000, 'CAPITAL_EMPLOYED_USD': 75_000_000
-    }
-}
+rerun_profile = begin_rerun_profile()
 
-METRIC_DIRECTION = {
-    'FORECAST_MAPE_PCT': 'lower', 'LEAD_TIME_DAYS': 'lower', 'BATCH_SIZE': 'context', 'OEE_PCT': 'higher', 'SKU_BREADTH': 'context',
-    'SAFETY_STOCK_VALUE': 'context', 'PIPELINE_STOCK_VALUE': 'lower', 'CYCLE_STOCK_VALUE': 'lower',
-    'COGS_USD': 'lower', 'DIOH_DAYS': 'lower',
-    'OTIF_PCT': 'higher', 'NET_SALES_GROWTH_PCT': 'higher', 'ROCE_PCT': 'higher', 'FREE_CASH_FLOW_USD': 'higher', 'CAPITAL_EMPLOYED_USD': 'context'
-}
-
-
-def apply_dark_theme(fig):
-    fig.update_layout(
-        paper_bgcolor=DARK_BG,
-        plot_bgcolor=CARD_BG,
-        font=dict(color=TEXT, family="Inter, sans-serif"),
-        title_font=dict(color=SNOWFLAKE_BLUE, size=16),
-        hoverlabel=dict(bgcolor=CARD_BG, bordercolor=SNOWFLAKE_BLUE, font_color=TEXT),
-        legend=dict(bgcolor='rgba(36, 50, 61, 0.8)', bordercolor=SNOWFLAKE_BLUE, font=dict(color=TEXT)),
-        colorway=CATEGORICAL_COLORS,
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    fig.update_xaxes(gridcolor=BORDER, zerolinecolor=BORDER, tickfont=dict(color=TEXT_MUTED))
-    fig.update_yaxes(gridcolor=BORDER, zerolinecolor=BORDER, tickfont=dict(color=TEXT_MUTED))
-    return fig
-
-
-def get_variance_color(actual, target, direction='higher'):
-    if target == 0:
-        return TEXT_MUTED
-    variance_pct = ((actual - target) / abs(target)) * 100
-    if direction == 'higher':
-        if variance_pct >= 5:
-            return SNOWFLAKE_BLUE
-        elif variance_pct >= -5:
-            return TEXT_MUTED
-        else:
-            return VALENCIA_ORANGE
-    elif direction == 'lower':
-        if variance_pct <= -5:
-            return SNOWFLAKE_BLUE
-        elif variance_pct <= 5:
-            return TEXT_MUTED
-        else:
-            return VALENCIA_ORANGE
-    else:
-        return TEXT_MUTED
-
-
-def format_variance(actual, target, direction='higher'):
-    if target == 0:
-        return ""
-    variance = actual - target
-    variance_pct = (variance / abs(target)) * 100
-    color = get_variance_color(actual, target, direction)
-    arrow = "▲" if variance > 0 else "▼" if variance < 0 else "–"
-    return f'<span style="color: {color}; font-size: 0.65rem;">{arrow} {abs(variance_pct):.0f}% vs target</span>'
+CORTEX_MODEL = "mistral-large2"
+CORTEX_TIMEOUT_SECONDS = 60
+PREFETCH_WORKERS = 8
 
 
 @st.cache_resource
 def get_session():
+    if os.environ.get('CAUSAL_CHAIN_LOCAL_DATA'):
+        from utils.local_session import local_session_from_env
+        return local_session_from_env()
+    from snowflake.snowpark.context import get_active_session
     return get_active_session()
 
 
-@st.cache_data(ttl=300)
+@tracked_cache_data(ttl=300)
 def load_all_data(_session, strategy_mode, shock_event, load_baseline=False):
-    data = load_dashboard_data(_session, strategy_mode, shock_event)
+    store = load_dashboard_store(_session)
+    data = store.slice(strategy_mode, shock_event)
     df = data.get('performance', pd.DataFrame())
     predictions = data.get('predictions', pd.DataFrame())
     traces = data.get('causal_traces', pd.DataFrame())
-    baseline_df = load_baseline_parallel(_session, strategy_mode) if load_baseline else None
+    baseline_df = store.baseline(strategy_mode) if load_baseline else None
     return df, predictions, traces, baseline_df
 
 
+@st.cache_resource
+def load_causal_graph(traces_df):
+    return compile_causal_graph(traces_df)
+
+
+@tracked_cache_data(ttl=300)
+def load_sensitivity_aggregates(_df, df_version, strategy_mode, shock_event):
+    return sensitivity_aggregates(_df)
+
+
+@tracked_cache_data(ttl=300)
+def load_shock_bands(_df, df_version, strategy_mode, shock_event, region):
+    region_df = _df[_df['REGION'] == region]
+    return simulate_shock_bands(region_df, region_df.iloc[0])
+
+
 def render_confidence_metric(label, value, lower, upper, format_str="${:.1f}M", color=SNOWFLAKE_BLUE):
     if value == 0:
         range_pct = 0
@@ -201,136 +122,9 @@ def render_delta_badge(current, baseline, format_str="{:.1f}%", invert=False):
     return f'<span style="color: {color}; font-size: 0.75rem; margin-left: 0.5rem;">{arrow}{format_str.format(delta)} ({arrow}{delta_pct:.1f}%)</span>'
 
 
-def create_causal_tree(traces_df):
-    if traces_df.empty:
-        return go.Figure()
-    
-    driver_nodes = ['FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'BATCH_SIZE', 'OEE_PCT', 'SKU_BREADTH']
-    lever_nodes = ['SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'CYCLE_STOCK_VALUE', 'COGS_USD', 'DIOH_DAYS']
-    outcome_nodes = ['FREE_CASH_FLOW_USD', 'ROCE_PCT', 'NET_SALES_GROWTH_PCT', 'CAPITAL_EMPLOYED_USD', 'OTIF_PCT']
-    
-    sources_in_data = set(traces_df['SOURCE_METRIC'].tolist())
-    targets_in_data = set(traces_df['TARGET_METRIC'].tolist())
-    all_in_data = sources_in_data | targets_in_data
-    
-    drivers = [n for n in driver_nodes if n in all_in_data]
-    levers = [n for n in lever_nodes if n in all_in_data]
-    outcomes = [n for n in outcome_nodes if n in all_in_data]
-    
-    remaining = all_in_data - set(drivers) - set(levers) - set(outcomes)
-    for n in remaining:
-        if n in sources_in_data and n not in targets_in_data:
-            drivers.append(n)
-        elif n in targets_in_data and n not in sources_in_data:
-            outcomes.append(n)
-        else:
-            levers.append(n)
-    
-    def format_label(n):
-        return n.replace('_', ' ').replace(' PCT', '%').replace(' USD', '$').replace(' VALUE', '').title()
-    
-    node_positions = {}
-    x_positions = {'drivers': 0, 'levers': 1, 'outcomes': 2}
-    
-    for i, n in enumerate(drivers):
-        node_positions[n] = (x_positions['drivers'], len(drivers) - 1 - i)
-    for i, n in enumerate(levers):
-        node_positions[n] = (x_positions['levers'], len(levers) - 1 - i)
-    for i, n in enumerate(outcomes):
-        node_positions[n] = (x_positions['outcomes'], len(outcomes) - 1 - i)
-    
-    fig = go.Figure()
-    
-    for _, row in traces_df.iterrows():
-        src, tgt = row['SOURCE_METRIC'], row['TARGET_METRIC']
-        if src in node_positions and tgt in node_positions:
-            x0, y0 = node_positions[src]
-            x1, y1 = node_positions[tgt]
-            weight = abs(row['CAUSAL_WEIGHT'])
-            is_positive = row['RELATIONSHIP_TYPE'] == 'POSITIVE'
-            color = f'rgba(41,181,232,{0.3 + weight * 0.5})' if is_positive else f'rgba(255,159,54,{0.3 + weight * 0.5})'
-            
-            mid_x = (x0 + x1) / 2
-            fig.add_trace(go.Scatter(
-                x=[x0 + 0.12, mid_x, x1 - 0.12],
-                y=[y0, (y0 + y1) / 2, y1],
-                mode='lines',
-                line=dict(color=color, width=1 + weight * 3, shape='spline'),
-                hoverinfo='text',
-                hovertext=f"{format_label(src)} → {format_label(tgt)}<br>Weight: {weight:.2f}",
-                showlegend=False
-            ))
-    
-    for category, nodes, color, label in [
-        ('drivers', drivers, VALENCIA_ORANGE, 'Process Drivers'),
-        ('levers', levers, SNOWFLAKE_BLUE, 'Economic Levers'),
-        ('outcomes', outcomes, PURPLE_MOON, 'Financial Outcomes')
-    ]:
-        if not nodes:
-            continue
-        x_vals = [node_positions[n][0] for n in nodes]
-        y_vals = [node_positions[n][1] for n in nodes]
-        labels = [format_label(n) for n in nodes]
-        
-        fig.add_trace(go.Scatter(
-            x=x_vals, y=y_vals,
-            mode='markers+text',
-            marker=dict(size=28, color=color, line=dict(color=BORDER, width=2)),
-            text=labels,
-            textposition='middle right' if category == 'drivers' else ('middle left' if category == 'outcomes' else 'top center'),
-            textfont=dict(size=10, color=TEXT),
-            hoverinfo='text',
-            hovertext=labels,
-            name=label,
-            showlegend=True
-        ))
-    
-    max_y = max(len(drivers), len(levers), len(outcomes)) - 1
-    fig.update_layout(
-        height=450,
-        xaxis=dict(
-            showgrid=False, zeroline=False, showticklabels=False,
-            range=[-0.5, 2.5]
-        ),
-        yaxis=dict(
-            showgrid=False, zeroline=False, showticklabels=False,
-            range=[-0.8, max_y + 0.8]
-        ),
-        legend=dict(
-            orientation='h', yanchor='bottom', y=1.02, xanchor='center', x=0.5,
-            font=dict(size=10)
-        ),
-        margin=dict(l=20, r=20, t=60, b=20)
-    )
-    return apply_dark_theme(fig)
-
-
-def calculate_roce_sensitivity(current_data, safety_reduction_pct, lead_time_delta, batch_delta):
-    current_roce = current_data['ROCE_PCT'].mean()
-    current_safety = current_data['SAFETY_STOCK_VALUE'].sum()
-    current_capital = current_data['CAPITAL_EMPLOYED_USD'].sum()
-    current_cycle = current_data['CYCLE_STOCK_VALUE'].sum()
-    nopat = current_data['NOPAT_USD'].sum()
-    
-    capital_freed = current_safety * (safety_reduction_pct / 100)
-    pipeline_impact = lead_time_delta * 150000
-    cycle_impact = current_cycle * (batch_delta / 100) * 0.5
-    
-    new_capital = current_capital - capital_freed + pipeline_impact + cycle_impact
-    new_roce = (nopat / new_capital) * 100 if new_capital > 0 else 0
-    
-    return {
-        'current_roce': current_roce,
-        'new_roce': new_roce,
-        'roce_delta': new_roce - current_roce,
-        'roce_delta_bps': (new_roce - current_roce) * 100,
-        'capital_freed': capital_freed,
-        'pipeline_impact': pipeline_impact,
-        'cycle_impact': cycle_impact,
-        'net_capital_impact': capital_freed - pipeline_impact - cycle_impact
-    }
 
 
+@timed(category='cortex')
 def query_cortex_analyst(session, question):
     prompt = f"""You are a supply chain finance analyst. Answer this question about the causal chain data model concisely.
     
@@ -342,23 +136,25 @@ Be specific with metrics when relevant. Keep answer under 150 words."""
 
     try:
         result = session.sql(f"""
-            SELECT SNOWFLAKE.CORTEX.COMPLETE('mistral-large2', $${prompt}$$) as RESPONSE
+            SELECT SNOWFLAKE.CORTEX.COMPLETE('{CORTEX_MODEL}', $${prompt}$$) as RESPONSE
         """).collect()[0]['RESPONSE']
         return {"success": True, "response": result}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+@st.cache_resource
+def get_document_index():
+    return default_index()
+
+
+@timed(category='data')
 def search_qbr_docs(session, query):
     try:
-        result = session.sql(f"""
-            SELECT DOC_NAME, QUARTER, YEAR, CONTENT_TEXT
-            FROM RAW.QBR_DOCUMENTS
-            WHERE CONTAINS(LOWER(CONTENT_TEXT), LOWER('{query}'))
-            LIMIT 3
-        """).to_pandas()
-        return result.to_dict('records')
-    except:
+        index = get_document_index()
+        index.sync(session, max_age=DEFAULT_SYNC_INTERVAL)
+        return index.search(query, limit=3)
+    except Exception:
         return []
 
 
@@ -381,37 +177,88 @@ METRIC_CONTEXT = {
 }
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def get_cached_causal_explanation(_session, source_metric, target_metric, relationship_type, weight, strategy_mode):
-    source_info = METRIC_CONTEXT.get(source_metric, (source_metric, 'operational metric', 'a key performance indicator'))
-    target_info = METRIC_CONTEXT.get(target_metric, (target_metric, 'operational metric', 'a key performance indicator'))
-    
-    prompt = f"""You are a McKinsey supply chain strategist. Explain this causal link concisely for a CFO.
+CAUSAL_PROMPT_TEMPLATE = """You are a McKinsey supply chain strategist. Explain this causal link concisely for a CFO.
 
-LINK: {source_info[0]} to {target_info[0]} ({relationship_type}, weight: {weight:.2f})
+LINK: {source_name} to {target_name} ({relationship_type}, weight: {weight:.2f})
 STRATEGY: {strategy_mode}
 
 Provide 4 brief sections (about 100 words each):
 
-1. MECHANISM: How does {source_info[0]} ({source_info[2]}) mechanically impact {target_info[0]} ({target_info[2]})? One clear cause-effect chain.
+1. MECHANISM: How does {source_name} ({source_definition}) mechanically impact {target_name} ({target_definition})? One clear cause-effect chain.
 
-2. FINANCIAL IMPACT: If {source_info[0]} improves 10 percent, what is the expected impact on {target_info[0]}? One industry benchmark.
+2. FINANCIAL IMPACT: If {source_name} improves 10 percent, what is the expected impact on {target_name}? One industry benchmark.
 
 3. STRATEGIC FIT: How does this link align with {strategy_mode} strategy? One key trade-off.
 
-4. ACTION LEVERS: 2-3 specific operational actions to influence {source_info[0]}. Be concrete.
+4. ACTION LEVERS: 2-3 specific operational actions to influence {source_name}. Be concrete.
 
 Use markdown headers. Be direct and specific. Max 400 words total. No preamble or follow-up questions."""
 
+
+@st.cache_resource
+def get_explanation_store():
+    return ExplanationStore()
+
+
+@st.cache_resource
+def get_prefetch_executor():
+    # One bounded pool for every session, rather than a pool per session and strategy that is never shut down.
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+@timed(category='cortex')
+def fetch_causal_explanation(session, store, source_metric, target_metric, relationship_type, weight, strategy_mode):
+    source_info = METRIC_CONTEXT.get(source_metric, (source_metric, 'operational metric', 'a key performance indicator'))
+    target_info = METRIC_CONTEXT.get(target_metric, (target_metric, 'operational metric', 'a key performance indicator'))
+    
+    prompt = CAUSAL_PROMPT_TEMPLATE.format(
+        source_name=source_info[0], source_definition=source_info[2],
+        target_name=target_info[0], target_definition=target_info[2],
+        relationship_type=relationship_type, weight=weight, strategy_mode=strategy_mode
+    )
+
+    store_key = explanation_key(prompt, CORTEX_MODEL)
+    stored = store.get(store_key)
+    if stored is not None:
+        return {"success": True, "response": stored}
+
     escaped_prompt = prompt.replace("'", "''")
     
     try:
-        result = _session.sql(f"""
-            SELECT SNOWFLAKE.CORTEX.COMPLETE('mistral-large2', '{escaped_prompt}') as RESPONSE
-        """).collect()[0]['RESPONSE']
-        return {"success": True, "response": result}
+        result = session.sql(f"""
+            SELECT SNOWFLAKE.CORTEX.COMPLETE('{CORTEX_MODEL}', '{escaped_prompt}') as RESPONSE
+        """).collect(statement_params={'STATEMENT_TIMEOUT_IN_SECONDS': CORTEX_TIMEOUT_SECONDS})[0]['RESPONSE']
     except Exception as e:
         return {"success": False, "error": str(e)}
+    if result is None:
+        return {"success": False, "error": "Cortex returned an empty response"}
+    store.put(store_key, result)
+    return {"success": True, "response": result}
+
+
+@tracked_cache_data(ttl=86400, show_spinner=False)
+def get_cached_causal_explanation(_session, source_metric, target_metric, relationship_type, weight, strategy_mode):
+    return fetch_causal_explanation(_session, get_explanation_store(), source_metric, target_metric,
+                                    relationship_type, weight, strategy_mode)
+
+
+def collect_explanations(prefetcher, wait_seconds=0):
+    results = prefetcher.drain(wait_seconds)
+    for cache_key, explanation in results.items():
+        if explanation["success"]:
+            st.session_state.causal_explanations[cache_key] = explanation["response"]
+    return results
+
+
+def show_prefetched_explanation(placeholder, prefetcher, cache_key):
+    if cache_key in st.session_state.causal_explanations:
+        placeholder.markdown(st.session_state.causal_explanations[cache_key])
+    else:
+        placeholder.error(f"Analysis failed: {prefetcher.failed.get(cache_key, 'Unknown error')}")
+
+
+def select_causal_relationship(rel_id):
+    st.session_state.selected_causal_rel = rel_id
 
 
 def get_causal_explanation(session, source_metric, target_metric, relationship_type, weight, strategy_mode):
@@ -543,6 +390,9 @@ if df.empty:
     st.error("No data available for selected filters")
     st.stop()
 
+# _df arguments are not hashed, so derived caches key on this to stay on the same snapshot as the KPIs.
+df_version = frame_fingerprint(df)
+
 latest = df.iloc[0] if len(df) > 0 else {}
 baseline_latest = baseline_df.iloc[0] if baseline_df is not None and len(baseline_df) > 0 else None
 
@@ -566,45 +416,46 @@ values = {'SERVICE': service_val, 'COST': cost_val, 'CASH': cash_val}
 colors_map = {'SERVICE': SNOWFLAKE_BLUE, 'COST': VALENCIA_ORANGE, 'CASH': PURPLE_MOON}
 weights = {'SERVICE': service_weight, 'COST': cost_weight, 'CASH': cash_weight}
 
-tri_fig = go.Figure()
+with span('trade_off_triangle', 'chart'):
+    tri_fig = go.Figure()
 
-tri_fig.add_trace(go.Scatter(
-    x=[0.1, 0.5, 0.9, 0.1], y=[0.1, 0.9, 0.1, 0.1],
-    mode='lines', line=dict(color=BORDER, width=2),
-    fill='toself', fillcolor='rgba(30, 41, 59, 0.5)', hoverinfo='skip'
-))
+    tri_fig.add_trace(go.Scatter(
+        x=[0.1, 0.5, 0.9, 0.1], y=[0.1, 0.9, 0.1, 0.1],
+        mode='lines', line=dict(color=BORDER, width=2),
+        fill='toself', fillcolor='rgba(30, 41, 59, 0.5)', hoverinfo='skip'
+    ))
+
+    for corner, (x, y) in vertices.items():
+        val = values[corner]
+        is_active = corner == active_corner
+        color = colors_map[corner]
+        weight = weights[corner]
+        marker_size = 35 + (weight * 30)
+
+        if is_active:
+            tri_fig.add_trace(go.Scatter(
+                x=[x], y=[y], mode='markers',
+                marker=dict(size=marker_size + 15, color=color, opacity=0.3, line=dict(width=0)),
+                hoverinfo='skip'
+            ))
 
-for corner, (x, y) in vertices.items():
-    val = values[corner]
-    is_active = corner == active_corner
-    color = colors_map[corner]
-    weight = weights[corner]
-    marker_size = 35 + (weight * 30)
-    
-    if is_active:
         tri_fig.add_trace(go.Scatter(
-            x=[x], y=[y], mode='markers',
-            marker=dict(size=marker_size + 15, color=color, opacity=0.3, line=dict(width=0)),
-            hoverinfo='skip'
+            x=[x], y=[y], mode='markers+text',
+            marker=dict(size=marker_size, color=CARD_BG if not is_active else color,
+                        line=dict(color=color, width=3 if is_active else 2), opacity=1 if is_active else 0.7),
+            text=[f"<b>{corner}</b><br>{val:.1f}%"],
+            textposition='middle center',
+            textfont=dict(color='white' if is_active else TEXT, size=11),
+            hovertemplate=f'{corner}<br>Value: {val:.1f}%<br>Weight: {weight:.0%}<extra></extra>'
         ))
-    
-    tri_fig.add_trace(go.Scatter(
-        x=[x], y=[y], mode='markers+text',
-        marker=dict(size=marker_size, color=CARD_BG if not is_active else color,
-                    line=dict(color=color, width=3 if is_active else 2), opacity=1 if is_active else 0.7),
-        text=[f"<b>{corner}</b><br>{val:.1f}%"],
-        textposition='middle center',
-        textfont=dict(color='white' if is_active else TEXT, size=11),
-        hovertemplate=f'{corner}<br>Value: {val:.1f}%<br>Weight: {weight:.0%}<extra></extra>'
-    ))
 
-tri_fig.update_layout(
-    showlegend=False, xaxis=dict(visible=False, range=[-0.05, 1.05]),
-    yaxis=dict(visible=False, range=[-0.05, 1.1], scaleanchor='x'),
-    height=350, margin=dict(l=20, r=20, t=40, b=20),
-    title=dict(text=f"Active Mode: {strategy_mode}", font=dict(size=12))
-)
-tri_fig = apply_dark_theme(tri_fig)
+    tri_fig.update_layout(
+        showlegend=False, xaxis=dict(visible=False, range=[-0.05, 1.05]),
+        yaxis=dict(visible=False, range=[-0.05, 1.1], scaleanchor='x'),
+        height=350, margin=dict(l=20, r=20, t=40, b=20),
+        title=dict(text=f"Active Mode: {strategy_mode}", font=dict(size=12))
+    )
+    tri_fig = apply_dark_theme(tri_fig)
 
 tri_col1, tri_col2 = st.columns([1, 1])
 with tri_col1:
@@ -679,15 +530,18 @@ if shock_event != "None" and not predictions.empty:
     
     pred_latest = predictions.iloc[0]
     
-    has_bounds = 'FCF_LOWER_BOUND' in predictions.columns and pd.notna(pred_latest.get('FCF_LOWER_BOUND'))
+    shock_bands = load_shock_bands(df, df_version, strategy_mode, shock_event, pred_latest['REGION'])
+    has_bounds = not shock_bands.empty
+    if has_bounds:
+        band_latest = shock_bands.iloc[-1]
     
     pcol1, pcol2, pcol3 = st.columns(3)
     
     with pcol1:
         pred_fcf = float(pred_latest.get('PREDICTED_FCF_USD', 0)) / 1_000_000
         if has_bounds:
-            fcf_lower = float(pred_latest.get('FCF_LOWER_BOUND', pred_fcf * 0.85)) / 1_000_000
-            fcf_upper = float(pred_latest.get('FCF_UPPER_BOUND', pred_fcf * 1.15)) / 1_000_000
+            fcf_lower = float(band_latest['FCF_P5']) / 1_000_000
+            fcf_upper = float(band_latest['FCF_P95']) / 1_000_000
             render_confidence_metric("Predicted FCF", pred_fcf, fcf_lower, fcf_upper, "${:.1f}M", SNOWFLAKE_BLUE)
         else:
             st.metric("Predicted FCF", f"${pred_fcf:.1f}M")
@@ -695,8 +549,8 @@ if shock_event != "None" and not predictions.empty:
     with pcol2:
         pred_roce = float(pred_latest.get('PREDICTED_ROCE_PCT', 0))
         if has_bounds:
-            roce_lower = float(pred_latest.get('ROCE_LOWER_BOUND', pred_roce * 0.9))
-            roce_upper = float(pred_latest.get('ROCE_UPPER_BOUND', pred_roce * 1.1))
+            roce_lower = float(band_latest['ROCE_P5'])
+            roce_upper = float(band_latest['ROCE_P95'])
             render_confidence_metric("Predicted ROCE", pred_roce, roce_lower, roce_upper, "{:.1f}%", PURPLE_MOON)
         else:
             st.metric("Predicted ROCE", f"{pred_roce:.1f}%")
@@ -715,198 +569,86 @@ st.markdown("---")
 roce_sens_tip = f'<span style="cursor: help; border-bottom: 1px dotted {TEXT_MUTED};" title="{ACRONYM_DEFINITIONS["ROCE"][0]}: {ACRONYM_DEFINITIONS["ROCE"][1]}">ROCE<sup style="font-size: 0.6rem; color: {SNOWFLAKE_BLUE};">ⓘ</sup></span>'
 st.markdown(f"### {roce_sens_tip} Sensitivity Calculator", unsafe_allow_html=True)
 
-sens_col1, sens_col2 = st.columns([1, 2], gap="medium")
 
-with sens_col1:
-    st.markdown("**Adjust Parameters:**")
-    safety_reduction = st.slider("Safety Stock Reduction %", 0, 30, 10, key="safety_slider")
-    lead_time_change = st.slider("Lead Time Change (days)", -5, 10, 0, key="lead_slider")
-    batch_change = st.slider("Batch Size Change %", -20, 50, 0, key="batch_slider")
+@st.fragment
+@profiled_fragment
+def render_sensitivity_calculator(df, df_version, strategy_mode, shock_event):
+    sens_col1, sens_col2 = st.columns([1, 2], gap="medium")
+
+    with sens_col1:
+        st.markdown("**Adjust Parameters:**")
+        safety_reduction = st.slider("Safety Stock Reduction %", 0, 30, 10, key="safety_slider")
+        lead_time_change = st.slider("Lead Time Change (days)", -5, 10, 0, key="lead_slider")
+        batch_change = st.slider("Batch Size Change %", -20, 50, 0, key="batch_slider")
+
+    with sens_col2:
+        sens_aggregates = load_sensitivity_aggregates(df, df_version, strategy_mode, shock_event)
+        with span('calculate_roce_sensitivity'):
+            sensitivity = calculate_roce_sensitivity(sens_aggregates, safety_reduction, lead_time_change, batch_change)
+
+        with span('roce_gauge', 'chart'):
+            gauge_fig = go.Figure(go.Indicator(
+                mode="gauge+number+delta",
+                value=sensitivity['new_roce'],
+                delta={'reference': sensitivity['current_roce'], 'relative': False, 'valueformat': '.2f',
+                       'increasing': {'color': SNOWFLAKE_BLUE}, 'decreasing': {'color': VALENCIA_ORANGE},
+                       'font': {'color': TEXT}},
+                number={'suffix': '%', 'valueformat': '.1f', 'font': {'color': TEXT}},
+                title={'text': "Projected ROCE", 'font': {'color': TEXT, 'size': 16}},
+                domain={'x': [0, 1], 'y': [0, 1]},
+                gauge={
+                    'axis': {'range': [0, 25], 'tickwidth': 1, 'tickcolor': BORDER},
+                    'bar': {'color': SNOWFLAKE_BLUE},
+                    'bgcolor': CARD_BG,
+                    'borderwidth': 2,
+                    'bordercolor': BORDER,
+                    'steps': [
+                        {'range': [0, 10], 'color': 'rgba(255, 159, 54, 0.2)'},
+                        {'range': [10, 15], 'color': 'rgba(138, 153, 158, 0.2)'},
+                        {'range': [15, 25], 'color': 'rgba(41, 181, 232, 0.2)'}
+                    ],
+                    'threshold': {'line': {'color': TEXT, 'width': 3}, 'thickness': 0.8, 'value': sensitivity['current_roce']}
+                }
+            ))
+            gauge_fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+            gauge_fig = apply_dark_theme(gauge_fig)
+            st.plotly_chart(gauge_fig, use_container_width=True, theme=None, key="roce_gauge")
 
-with sens_col2:
-    sensitivity = calculate_roce_sensitivity(df, safety_reduction, lead_time_change, batch_change)
-    
-    gauge_fig = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=sensitivity['new_roce'],
-        delta={'reference': sensitivity['current_roce'], 'relative': False, 'valueformat': '.2f',
-               'increasing': {'color': SNOWFLAKE_BLUE}, 'decreasing': {'color': VALENCIA_ORANGE},
-               'font': {'color': TEXT}},
-        number={'suffix': '%', 'valueformat': '.1f', 'font': {'color': TEXT}},
-        title={'text': "Projected ROCE", 'font': {'color': TEXT, 'size': 16}},
-        domain={'x': [0, 1], 'y': [0, 1]},
-        gauge={
-            'axis': {'range': [0, 25], 'tickwidth': 1, 'tickcolor': BORDER},
-            'bar': {'color': SNOWFLAKE_BLUE},
-            'bgcolor': CARD_BG,
-            'borderwidth': 2,
-            'bordercolor': BORDER,
-            'steps': [
-                {'range': [0, 10], 'color': 'rgba(255, 159, 54, 0.2)'},
-                {'range': [10, 15], 'color': 'rgba(138, 153, 158, 0.2)'},
-                {'range': [15, 25], 'color': 'rgba(41, 181, 232, 0.2)'}
-            ],
-            'threshold': {'line': {'color': TEXT, 'width': 3}, 'thickness': 0.8, 'value': sensitivity['current_roce']}
-        }
-    ))
-    gauge_fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
-    gauge_fig = apply_dark_theme(gauge_fig)
-    st.plotly_chart(gauge_fig, use_container_width=True, theme=None, key="roce_gauge")
-    
-    capital_freed_m = sensitivity['capital_freed'] / 1_000_000
-    st.markdown(f"""
-    **Impact Summary:** A {safety_reduction}% safety stock reduction would improve ROCE by 
-    **{sensitivity['roce_delta_bps']:.0f} basis points**, freeing **${capital_freed_m:.1f}M** in capital.
-    """)
+        capital_freed_m = sensitivity['capital_freed'] / 1_000_000
+        st.markdown(f"""
+        **Impact Summary:** A {safety_reduction}% safety stock reduction would improve ROCE by 
+        **{sensitivity['roce_delta_bps']:.0f} basis points**, freeing **${capital_freed_m:.1f}M** in capital.
+        """)
+
+    with st.expander("Sensitivity Surface: Safety Stock vs Lead Time"):
+        safety_axis = np.arange(0, 31)
+        lead_axis = np.arange(-5, 11)
+        safety_grid, lead_grid = np.meshgrid(safety_axis, lead_axis)
+        with span('calculate_roce_surface'):
+            surface = calculate_roce_surface(sens_aggregates, safety_grid, lead_grid, batch_change)
+
+        with span('roce_surface', 'chart'):
+            surface_colors = BLUE_ORANGE_DIVERGING[::-1]
+            surface_fig = go.Figure(go.Heatmap(
+                z=surface['roce_delta_bps'], x=safety_axis, y=lead_axis,
+                colorscale=[[i / (len(surface_colors) - 1), c] for i, c in enumerate(surface_colors)],
+                zmid=0,
+                colorbar=dict(title=dict(text='bps', font=dict(color=TEXT)), tickfont=dict(color=TEXT_MUTED)),
+                hovertemplate='Safety -%{x}% | Lead %{y:+d}d<br>ROCE %{z:+.0f} bps<extra></extra>'
+            ))
+            surface_fig.update_layout(
+                title=f"ROCE change (bps) at {batch_change:+d}% batch size",
+                xaxis_title="Safety Stock Reduction %", yaxis_title="Lead Time Change (days)",
+                height=350
+            )
+            surface_fig = apply_dark_theme(surface_fig)
+            st.plotly_chart(surface_fig, use_container_width=True, key="roce_surface")
+
+
+render_sensitivity_calculator(df, df_version, strategy_mode, shock_event)
 
 st.subheader("Interactive Causal Trace")
 
-def render_metrics_tree_dashboard(data_df, traces_df, strategy_mode):
-    latest = data_df.iloc[0] if not data_df.empty else {}
-    targets = STRATEGY_TARGETS.get(strategy_mode, STRATEGY_TARGETS['GROWTH'])
-    
-    metric_values = {
-        'FORECAST_MAPE_PCT': latest.get('FORECAST_MAPE_PCT', 0),
-        'LEAD_TIME_DAYS': latest.get('LEAD_TIME_DAYS', 0),
-        'BATCH_SIZE': latest.get('BATCH_SIZE', latest.get('CYCLE_STOCK_VALUE', 0) / 100000) if 'BATCH_SIZE' not in latest else latest.get('BATCH_SIZE', 0),
-        'OEE_PCT': latest.get('OEE_PCT', 0),
-        'SKU_BREADTH': latest.get('SKU_BREADTH', 150),
-        'SAFETY_STOCK_VALUE': latest.get('SAFETY_STOCK_VALUE', 0),
-        'PIPELINE_STOCK_VALUE': latest.get('PIPELINE_STOCK_VALUE', 0),
-        'CYCLE_STOCK_VALUE': latest.get('CYCLE_STOCK_VALUE', 0),
-        'COGS_USD': latest.get('COGS_USD', 0),
-        'DIOH_DAYS': latest.get('CASH_CONVERSION_CYCLE_DAYS', 0) * 0.4,
-        'FREE_CASH_FLOW_USD': latest.get('FREE_CASH_FLOW_USD', 0),
-        'ROCE_PCT': latest.get('ROCE_PCT', 0),
-        'NET_SALES_GROWTH_PCT': latest.get('NET_SALES_GROWTH_PCT', 0),
-        'CAPITAL_EMPLOYED_USD': latest.get('CAPITAL_EMPLOYED_USD', 0),
-        'OTIF_PCT': latest.get('OTIF_PCT', 0)
-    }
-    
-    def format_value(metric, value):
-        if 'PCT' in metric:
-            return f"{value:.1f}%"
-        elif 'USD' in metric or 'VALUE' in metric:
-            if abs(value) >= 1_000_000:
-                return f"${value/1_000_000:.1f}M"
-            elif abs(value) >= 1_000:
-                return f"${value/1_000:.0f}K"
-            else:
-                return f"${value:.0f}"
-        elif 'DAYS' in metric:
-            return f"{value:.1f}d"
-        else:
-            return f"{value:.1f}"
-    
-    def format_label(metric):
-        acronym_map = {
-            'FORECAST_MAPE_PCT': 'Forecast MAPE',
-            'LEAD_TIME_DAYS': 'Lead Time',
-            'BATCH_SIZE': 'Batch Size',
-            'OEE_PCT': 'OEE',
-            'SKU_BREADTH': 'SKU Breadth',
-            'SAFETY_STOCK_VALUE': 'Safety Stock',
-            'PIPELINE_STOCK_VALUE': 'Pipeline Stock',
-            'CYCLE_STOCK_VALUE': 'Cycle Stock',
-            'COGS_USD': 'COGS',
-            'DIOH_DAYS': 'DIOH',
-            'FREE_CASH_FLOW_USD': 'FCF',
-            'ROCE_PCT': 'ROCE',
-            'NET_SALES_GROWTH_PCT': 'Sales Growth',
-            'CAPITAL_EMPLOYED_USD': 'Capital Employed',
-            'OTIF_PCT': 'OTIF'
-        }
-        return acronym_map.get(metric, metric.replace('_', ' ').title())
-    
-    def format_label_with_tooltip(metric):
-        label = format_label(metric)
-        acronyms_in_label = ['MAPE', 'OEE', 'SKU', 'COGS', 'DIOH', 'FCF', 'ROCE', 'OTIF']
-        for acr in acronyms_in_label:
-            if acr in label and acr in ACRONYM_DEFINITIONS:
-                full_name, desc = ACRONYM_DEFINITIONS[acr]
-                tooltip_html = f'<span style="cursor: help; border-bottom: 1px dotted {TEXT_MUTED};" title="{full_name}: {desc}">{acr}<sup style="font-size: 0.45rem; color: {SNOWFLAKE_BLUE};">ⓘ</sup></span>'
-                label = label.replace(acr, tooltip_html)
-                break
-        return label
-    
-    drivers = ['FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'BATCH_SIZE', 'OEE_PCT', 'SKU_BREADTH']
-    levers = ['SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'CYCLE_STOCK_VALUE', 'COGS_USD', 'DIOH_DAYS']
-    outcomes = ['OTIF_PCT', 'NET_SALES_GROWTH_PCT', 'ROCE_PCT', 'FREE_CASH_FLOW_USD', 'CAPITAL_EMPLOYED_USD']
-    
-    driver_colors = {'FORECAST_MAPE_PCT': VALENCIA_ORANGE, 'LEAD_TIME_DAYS': '#FFBF6B', 'BATCH_SIZE': '#E68A2E', 'OEE_PCT': '#FF9F36', 'SKU_BREADTH': '#CC7A29'}
-    lever_colors = {'SAFETY_STOCK_VALUE': SNOWFLAKE_BLUE, 'PIPELINE_STOCK_VALUE': STAR_BLUE, 'CYCLE_STOCK_VALUE': '#66D2ED', 'COGS_USD': '#99E1F3', 'DIOH_DAYS': MID_BLUE}
-    outcome_colors = {'OTIF_PCT': PURPLE_MOON, 'NET_SALES_GROWTH_PCT': '#9B7ED8', 'ROCE_PCT': FIRST_LIGHT, 'FREE_CASH_FLOW_USD': '#E07BA8', 'CAPITAL_EMPLOYED_USD': '#B366C2'}
-    
-    def metric_card(metric, color):
-        value = metric_values.get(metric, 0)
-        target = targets.get(metric, 0)
-        direction = METRIC_DIRECTION.get(metric, 'higher')
-        label = format_label_with_tooltip(metric)
-        formatted_val = format_value(metric, value)
-        formatted_target = format_value(metric, target)
-        variance_html = format_variance(value, target, direction)
-        variance_color = get_variance_color(value, target, direction)
-        
-        return f'''
-        <div style="background: linear-gradient(135deg, {CARD_BG} 0%, {DARK_BG} 100%); border: 2px solid {color}; border-radius: 10px; padding: 0.6rem 0.8rem; text-align: center; min-width: 110px;">
-            <div style="color: {color}; font-size: 1.4rem; font-weight: 700;">{formatted_val}</div>
-            <div style="color: {TEXT_MUTED}; font-size: 0.6rem; text-transform: uppercase; letter-spacing: 0.5px; margin: 0.2rem 0;">{label}</div>
-            <div style="color: {TEXT_MUTED}; font-size: 0.55rem; border-top: 1px solid {BORDER}; padding-top: 0.3rem; margin-top: 0.3rem;">
-                Target: {formatted_target}
-            </div>
-            <div>{variance_html}</div>
-        </div>
-        '''
-    
-    st.markdown(f"""
-    <div style="background: linear-gradient(180deg, {DARK_BG} 0%, {CARD_BG} 100%); border: 1px solid {BORDER}; border-radius: 12px; padding: 1.5rem; margin-bottom: 1.5rem;">
-        <h4 style="color: {VALENCIA_ORANGE}; text-align: center; margin: 0 0 1rem 0; font-size: 0.85rem; letter-spacing: 1.5px;">PROCESS DRIVERS</h4>
-    """, unsafe_allow_html=True)
-    
-    driver_cols = st.columns(5)
-    for i, metric in enumerate(drivers):
-        with driver_cols[i]:
-            st.markdown(metric_card(metric, driver_colors[metric]), unsafe_allow_html=True)
-    
-    st.markdown(f"""
-        <div style="display: flex; justify-content: center; margin: 1rem 0;">
-            <svg width="100" height="40" viewBox="0 0 100 40">
-                <defs>
-                    <marker id="arrow-down" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
-                        <path d="M0,0 L10,5 L0,10 Z" fill="{SNOWFLAKE_BLUE}"/>
-                    </marker>
-                </defs>
-                <line x1="50" y1="0" x2="50" y2="30" stroke="{SNOWFLAKE_BLUE}" stroke-width="2" marker-end="url(#arrow-down)"/>
-            </svg>
-        </div>
-        <h4 style="color: {SNOWFLAKE_BLUE}; text-align: center; margin: 0 0 1rem 0; font-size: 0.85rem; letter-spacing: 1.5px;">ECONOMIC LEVERS</h4>
-    """, unsafe_allow_html=True)
-    
-    lever_cols = st.columns(5)
-    for i, metric in enumerate(levers):
-        with lever_cols[i]:
-            st.markdown(metric_card(metric, lever_colors[metric]), unsafe_allow_html=True)
-    
-    st.markdown(f"""
-        <div style="display: flex; justify-content: center; margin: 1rem 0;">
-            <svg width="100" height="40" viewBox="0 0 100 40">
-                <defs>
-                    <marker id="arrow-down2" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
-                        <path d="M0,0 L10,5 L0,10 Z" fill="{PURPLE_MOON}"/>
-                    </marker>
-                </defs>
-                <line x1="50" y1="0" x2="50" y2="30" stroke="{PURPLE_MOON}" stroke-width="2" marker-end="url(#arrow-down2)"/>
-            </svg>
-        </div>
-        <h4 style="color: {PURPLE_MOON}; text-align: center; margin: 0 0 1rem 0; font-size: 0.85rem; letter-spacing: 1.5px;">FINANCIAL OUTCOMES</h4>
-    """, unsafe_allow_html=True)
-    
-    outcome_cols = st.columns(5)
-    for i, metric in enumerate(outcomes):
-        with outcome_cols[i]:
-            st.markdown(metric_card(metric, outcome_colors[metric]), unsafe_allow_html=True)
-    
-    st.markdown("</div>", unsafe_allow_html=True)
 
 if not traces.empty:
     render_metrics_tree_dashboard(df, traces, strategy_mode)
@@ -938,128 +680,149 @@ if not traces.empty:
             'weight': row['CAUSAL_WEIGHT']
         })
     
-    cache_key_prefix = f"precomputed_{strategy_mode}"
-    if cache_key_prefix not in st.session_state:
-        st.session_state[cache_key_prefix] = False
-    
-    if not st.session_state[cache_key_prefix]:
-        with st.spinner(f"Pre-computing AI analysis for {len(rel_options)} relationships..."):
-            progress_bar = st.progress(0)
-            for i, rel in enumerate(rel_options):
-                cache_key = f"{rel['id']}_{strategy_mode}"
-                if cache_key not in st.session_state.causal_explanations:
-                    explanation = get_causal_explanation(
-                        session, rel['source'], rel['target'], rel['type'], rel['weight'], strategy_mode
-                    )
-                    if explanation["success"]:
-                        st.session_state.causal_explanations[cache_key] = explanation["response"]
-                progress_bar.progress((i + 1) / len(rel_options))
-            progress_bar.empty()
-            st.session_state[cache_key_prefix] = True
-    
-    st.markdown(f"<p style='text-align:center;color:{TEXT_MUTED};font-size:0.85rem;margin:1rem 0;'>Select a relationship below to view AI-powered causal analysis</p>", unsafe_allow_html=True)
-    
-    rel_labels = [r['label'] for r in rel_options]
-    rel_ids = [r['id'] for r in rel_options]
-    
-    button_cols = st.columns(min(len(rel_options), 4))
-    for i, rel in enumerate(rel_options):
-        col_idx = i % 4
-        is_selected = rel['id'] == st.session_state.selected_causal_rel
-        with button_cols[col_idx]:
-            rel_color = SNOWFLAKE_BLUE if rel['type'] == 'POSITIVE' else VALENCIA_ORANGE
-            btn_style = f"border: 2px solid {rel_color}; border-radius: 8px;" if is_selected else ""
-            if st.button(
-                rel['label'], 
-                key=f"btn_{rel['id']}", 
-                use_container_width=True,
-                type="primary" if is_selected else "secondary"
-            ):
-                st.session_state.selected_causal_rel = rel['id']
-                st.rerun()
-    
-    if st.session_state.selected_causal_rel:
-        selected_data = next((r for r in rel_options if r['id'] == st.session_state.selected_causal_rel), None)
-        
-        if selected_data:
-            src_label = format_rel_label(selected_data['source'])
-            tgt_label = format_rel_label(selected_data['target'])
-            rel_color = SNOWFLAKE_BLUE if selected_data['type'] == 'POSITIVE' else VALENCIA_ORANGE
-            rel_symbol = "+" if selected_data['type'] == 'POSITIVE' else "-"
-            
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, {CARD_BG} 0%, {DARK_BG} 100%); border: 1px solid {BORDER}; border-radius: 12px; padding: 1.5rem; margin-top: 1rem;">
-                <div style="text-align: center; padding: 0.75rem; margin-bottom: 1rem; background: {DARK_BG}; border-radius: 8px; border: 2px solid {rel_color};">
-                    <span style="color: {TEXT}; font-size: 1.25rem; font-weight: 600;">{src_label}</span>
-                    <span style="color: {rel_color}; font-size: 1.5rem; margin: 0 0.75rem;">→</span>
-                    <span style="color: {TEXT}; font-size: 1.25rem; font-weight: 600;">{tgt_label}</span>
-                    <br/>
-                    <span style="color: {rel_color}; font-weight: 700; font-size: 1.1rem;">{selected_data['type'].title()} ({rel_symbol}{selected_data['weight']:.2f})</span>
-                </div>
+    prefetch_key = f"explanation_prefetch_{strategy_mode}"
+    for key in [k for k in st.session_state if k.startswith("explanation_prefetch_") and k != prefetch_key]:
+        # Work queued for a strategy the user has left would only hold shared prefetch slots.
+        st.session_state.pop(key).shutdown()
+    if prefetch_key not in st.session_state:
+        st.session_state[prefetch_key] = Prefetcher(timeout=CORTEX_TIMEOUT_SECONDS, retries=2,
+                                                    executor=get_prefetch_executor())
+    explanation_prefetch = st.session_state[prefetch_key]
+    explanation_store = get_explanation_store()
+    for rel in rel_options:
+        cache_key = f"{rel['id']}_{strategy_mode}"
+        if cache_key not in st.session_state.causal_explanations:
+            explanation_prefetch.submit(
+                cache_key, bind(fetch_causal_explanation),
+                session, explanation_store, rel['source'], rel['target'], rel['type'], rel['weight'], strategy_mode
+            )
+    prefetch_progress = st.empty()
+    
+    @st.fragment
+    @profiled_fragment
+    def render_causal_selector(session, rel_options, strategy_mode, explanation_prefetch):
+        collect_explanations(explanation_prefetch)
+        selected_explanation = None
+
+        st.markdown(f"<p style='text-align:center;color:{TEXT_MUTED};font-size:0.85rem;margin:1rem 0;'>Select a relationship below to view AI-powered causal analysis</p>", unsafe_allow_html=True)
+
+        rel_labels = [r['label'] for r in rel_options]
+        rel_ids = [r['id'] for r in rel_options]
+
+        button_cols = st.columns(min(len(rel_options), 4))
+        for i, rel in enumerate(rel_options):
+            col_idx = i % 4
+            is_selected = rel['id'] == st.session_state.selected_causal_rel
+            with button_cols[col_idx]:
+                rel_color = SNOWFLAKE_BLUE if rel['type'] == 'POSITIVE' else VALENCIA_ORANGE
+                btn_style = f"border: 2px solid {rel_color}; border-radius: 8px;" if is_selected else ""
+                st.button(
+                    rel['label'], 
+                    key=f"btn_{rel['id']}", 
+                    use_container_width=True,
+                    type="primary" if is_selected else "secondary",
+                    on_click=select_causal_relationship, args=(rel['id'],)
+                )
+
+        if st.session_state.selected_causal_rel:
+            selected_data = next((r for r in rel_options if r['id'] == st.session_state.selected_causal_rel), None)
+
+            if selected_data:
+                src_label = format_rel_label(selected_data['source'])
+                tgt_label = format_rel_label(selected_data['target'])
+                rel_color = SNOWFLAKE_BLUE if selected_data['type'] == 'POSITIVE' else VALENCIA_ORANGE
+                rel_symbol = "+" if selected_data['type'] == 'POSITIVE' else "-"
+
+                st.markdown(f"""
+                <div style="background: linear-gradient(135deg, {CARD_BG} 0%, {DARK_BG} 100%); border: 1px solid {BORDER}; border-radius: 12px; padding: 1.5rem; margin-top: 1rem;">
+                    <div style="text-align: center; padding: 0.75rem; margin-bottom: 1rem; background: {DARK_BG}; border-radius: 8px; border: 2px solid {rel_color};">
+                        <span style="color: {TEXT}; font-size: 1.25rem; font-weight: 600;">{src_label}</span>
+                        <span style="color: {rel_color}; font-size: 1.5rem; margin: 0 0.75rem;">→</span>
+                        <span style="color: {TEXT}; font-size: 1.25rem; font-weight: 600;">{tgt_label}</span>
+                        <br/>
+                        <span style="color: {rel_color}; font-weight: 700; font-size: 1.1rem;">{selected_data['type'].title()} ({rel_symbol}{selected_data['weight']:.2f})</span>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                cache_key = f"{selected_data['id']}_{strategy_mode}"
+
+                if cache_key in st.session_state.causal_explanations:
+                    st.markdown(st.session_state.causal_explanations[cache_key])
+                elif explanation_prefetch.is_pending(cache_key):
+                    selected_explanation = (cache_key, st.empty())
+                    selected_explanation[1].info("Generating AI analysis...")
+                    if in_fragment_rerun():
+                        # A fragment rerun never reaches the page-level drain loop, so wait for this one here.
+                        while explanation_prefetch.is_pending(cache_key):
+                            collect_explanations(explanation_prefetch, wait_seconds=1)
+                        show_prefetched_explanation(selected_explanation[1], explanation_prefetch, cache_key)
+                else:
+                    with st.spinner("Generating AI analysis..."):
+                        explanation = get_causal_explanation(
+                            session, selected_data['source'], selected_data['target'], 
+                            selected_data['type'], selected_data['weight'], strategy_mode
+                        )
+                        if explanation["success"]:
+                            st.session_state.causal_explanations[cache_key] = explanation["response"]
+                            st.markdown(explanation["response"])
+                        else:
+                            st.error(f"Analysis failed: {explanation.get('error', 'Unknown error')}")
+
+                st.markdown("</div>", unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div style="background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%); border: 1px solid #334155; border-radius: 12px; padding: 1.5rem; margin-top: 1rem; text-align: center;">
+                <h4 style="color: #29b5e8; margin-top: 0;">AI-Powered Analysis</h4>
+                <p style="color: #94a3b8; font-size: 1rem;">Click a relationship button above to view pre-computed analysis.</p>
+                <p style="color: #64748b; font-size: 0.9rem; margin-top: 0.5rem;">Analysis covers: Mechanism, Financial Impact, Strategic Fit, and Action Levers</p>
+            </div>
             """, unsafe_allow_html=True)
-            
-            cache_key = f"{selected_data['id']}_{strategy_mode}"
-            
-            if cache_key in st.session_state.causal_explanations:
-                st.markdown(st.session_state.causal_explanations[cache_key])
+        return selected_explanation
+
+    selected_explanation = render_causal_selector(session, rel_options, strategy_mode, explanation_prefetch)
+
+    with st.expander("Multi-Hop Impact Propagation"):
+        causal_graph = load_causal_graph(traces)
+        prop_col1, prop_col2 = st.columns([1, 2])
+        with prop_col1:
+            prop_driver = st.selectbox("Perturbed metric", causal_graph.drivers(),
+                                       format_func=format_rel_label, key="propagation_driver")
+            prop_change = st.slider("Change %", -20, 20, 5, key="propagation_change")
+        with prop_col2:
+            impacts = causal_graph.propagate({prop_driver: prop_change})
+            impacts = impacts[(impacts != 0) & (impacts.index != prop_driver)]
+            if impacts.empty:
+                st.info("No downstream metrics for this driver")
             else:
-                with st.spinner("Generating AI analysis..."):
-                    explanation = get_causal_explanation(
-                        session, selected_data['source'], selected_data['target'], 
-                        selected_data['type'], selected_data['weight'], strategy_mode
+                with span('propagation', 'chart'):
+                    prop_fig = go.Figure(go.Bar(
+                        x=impacts.values, y=[format_rel_label(m) for m in impacts.index], orientation='h',
+                        marker_color=[SNOWFLAKE_BLUE if v > 0 else VALENCIA_ORANGE for v in impacts.values],
+                        hovertemplate='%{y}: %{x:+.2f}%<extra></extra>'
+                    ))
+                    prop_fig.update_layout(
+                        title=f"Downstream impact of {prop_change:+d}% {format_rel_label(prop_driver)}",
+                        xaxis_title="Impact %", height=80 + 40 * len(impacts),
+                        yaxis=dict(autorange='reversed')
                     )
-                    if explanation["success"]:
-                        st.session_state.causal_explanations[cache_key] = explanation["response"]
-                        st.markdown(explanation["response"])
-                    else:
-                        st.error(f"Analysis failed: {explanation.get('error', 'Unknown error')}")
-            
-            st.markdown("</div>", unsafe_allow_html=True)
-    else:
-        st.markdown("""
-        <div style="background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%); border: 1px solid #334155; border-radius: 12px; padding: 1.5rem; margin-top: 1rem; text-align: center;">
-            <h4 style="color: #29b5e8; margin-top: 0;">AI-Powered Analysis</h4>
-            <p style="color: #94a3b8; font-size: 1rem;">Click a relationship button above to view pre-computed analysis.</p>
-            <p style="color: #64748b; font-size: 0.9rem; margin-top: 0.5rem;">Analysis covers: Mechanism, Financial Impact, Strategic Fit, and Action Levers</p>
-        </div>
-        """, unsafe_allow_html=True)
+                    prop_fig = apply_dark_theme(prop_fig)
+                    st.plotly_chart(prop_fig, use_container_width=True, key="propagation_chart")
 
 st.markdown("---")
 st.subheader("Inventory Decomposition")
 
-inv_data = df.groupby('PERFORMANCE_MONTH').agg({
-    'CYCLE_STOCK_VALUE': 'sum', 'SAFETY_STOCK_VALUE': 'sum',
-    'PIPELINE_STOCK_VALUE': 'sum', 'ANTICIPATION_STOCK_VALUE': 'sum',
-    'STRATEGIC_STOCK_VALUE': 'sum'
-}).reset_index().sort_values('PERFORMANCE_MONTH')
-
-inv_data_melted = pd.melt(
-    inv_data, id_vars=['PERFORMANCE_MONTH'],
-    value_vars=['CYCLE_STOCK_VALUE', 'SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 
-                'ANTICIPATION_STOCK_VALUE', 'STRATEGIC_STOCK_VALUE'],
-    var_name='Type', value_name='Value'
-)
-inv_data_melted['Type'] = inv_data_melted['Type'].str.replace('_STOCK_VALUE', '').str.replace('_', ' ').str.title()
-inv_data_melted['Value'] = inv_data_melted['Value'] / 1_000_000
-
-fig_inv = px.area(
-    inv_data_melted, x='PERFORMANCE_MONTH', y='Value', color='Type',
-    title='Inventory Structure Over Time ($M)',
-    color_discrete_map={'Cycle': SNOWFLAKE_BLUE, 'Safety': VALENCIA_ORANGE, 'Pipeline': STAR_BLUE,
-                        'Anticipation': PURPLE_MOON, 'Strategic': FIRST_LIGHT}
-)
-fig_inv = apply_dark_theme(fig_inv)
-fig_inv.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-
-if st.session_state.compare_baseline and baseline_df is not None:
-    baseline_inv = baseline_df.groupby('PERFORMANCE_MONTH')['TOTAL_INVENTORY_VALUE'].sum().reset_index()
-    baseline_inv['Value'] = baseline_inv['TOTAL_INVENTORY_VALUE'] / 1_000_000
-    fig_inv.add_trace(go.Scatter(
-        x=baseline_inv['PERFORMANCE_MONTH'], y=baseline_inv['Value'],
-        mode='lines', name='Baseline Total', line=dict(color=BORDER, width=2, dash='dash')
-    ))
+with span('inventory_chart', 'chart'):
+    fig_inv = create_inventory_area(inventory_decomposition(df))
+
+    if st.session_state.compare_baseline and baseline_df is not None:
+        baseline_inv = baseline_df.groupby('PERFORMANCE_MONTH', observed=True)['TOTAL_INVENTORY_VALUE'].sum().reset_index()
+        baseline_inv['Value'] = baseline_inv['TOTAL_INVENTORY_VALUE'] / 1_000_000
+        fig_inv.add_trace(go.Scatter(
+            x=baseline_inv['PERFORMANCE_MONTH'], y=baseline_inv['Value'],
+            mode='lines', name='Baseline Total', line=dict(color=BORDER, width=2, dash='dash')
+        ))
 
-st.plotly_chart(fig_inv, use_container_width=True)
+    st.plotly_chart(fig_inv, use_container_width=True)
 
 st.markdown("---")
 st.subheader("Financial Bridge")
@@ -1081,25 +844,26 @@ fa_delta = capital_change - inv_change if capital_change > inv_change else capit
 
 implied_fcf = nopat_avg - wc_delta - fa_delta
 
-fig_bridge = go.Figure(go.Waterfall(
-    name="Financial Bridge", orientation="v",
-    measure=["absolute", "relative", "relative", "total"],
-    x=["NOPAT", "Working Capital", "Fixed Assets", "Free Cash Flow"],
-    y=[nopat_avg, -wc_delta, -fa_delta, 0],
-    text=[f"${nopat_avg:.1f}M", f"${-wc_delta:+.1f}M", f"${-fa_delta:+.1f}M", f"${implied_fcf:.1f}M"],
-    textposition="outside",
-    connector={"line": {"color": BORDER, "width": 2}},
-    increasing={"marker": {"color": SNOWFLAKE_BLUE}},
-    decreasing={"marker": {"color": VALENCIA_ORANGE}},
-    totals={"marker": {"color": PURPLE_MOON}}
-))
-fig_bridge.update_layout(
-    title="Cash Flow Bridge: NOPAT to Free Cash Flow ($M)",
-    showlegend=False,
-    height=400
-)
-fig_bridge = apply_dark_theme(fig_bridge)
-st.plotly_chart(fig_bridge, use_container_width=True)
+with span('financial_bridge', 'chart'):
+    fig_bridge = go.Figure(go.Waterfall(
+        name="Financial Bridge", orientation="v",
+        measure=["absolute", "relative", "relative", "total"],
+        x=["NOPAT", "Working Capital", "Fixed Assets", "Free Cash Flow"],
+        y=[nopat_avg, -wc_delta, -fa_delta, 0],
+        text=[f"${nopat_avg:.1f}M", f"${-wc_delta:+.1f}M", f"${-fa_delta:+.1f}M", f"${implied_fcf:.1f}M"],
+        textposition="outside",
+        connector={"line": {"color": BORDER, "width": 2}},
+        increasing={"marker": {"color": SNOWFLAKE_BLUE}},
+        decreasing={"marker": {"color": VALENCIA_ORANGE}},
+        totals={"marker": {"color": PURPLE_MOON}}
+    ))
+    fig_bridge.update_layout(
+        title="Cash Flow Bridge: NOPAT to Free Cash Flow ($M)",
+        showlegend=False,
+        height=400
+    )
+    fig_bridge = apply_dark_theme(fig_bridge)
+    st.plotly_chart(fig_bridge, use_container_width=True)
 
 bridge_explain_col1, bridge_explain_col2 = st.columns(2)
 with bridge_explain_col1:
@@ -1127,21 +891,28 @@ with bridge_explain_col2:
 st.markdown("---")
 st.subheader("Document Search")
 
-doc_col1, doc_col2 = st.columns([3, 1])
-with doc_col1:
-    doc_query = st.text_input("Search QBR documents", placeholder="Red Sea disruption impact", label_visibility="collapsed")
-with doc_col2:
-    search_docs = st.button("Search", use_container_width=True)
-
-if search_docs and doc_query:
-    with st.spinner("Searching..."):
-        docs = search_qbr_docs(session, doc_query)
-        if docs:
-            for doc in docs:
-                with st.expander(f"{doc['DOC_NAME']} ({doc['QUARTER']} {doc['YEAR']})"):
-                    st.markdown(str(doc['CONTENT_TEXT'])[:500] + "...")
-        else:
-            st.info("No matching documents found")
+
+@st.fragment
+@profiled_fragment
+def render_document_search(session):
+    doc_col1, doc_col2 = st.columns([3, 1])
+    with doc_col1:
+        doc_query = st.text_input("Search QBR documents", placeholder="Red Sea disruption impact", label_visibility="collapsed")
+    with doc_col2:
+        search_docs = st.button("Search", use_container_width=True)
+
+    if search_docs and doc_query:
+        with st.spinner("Searching..."):
+            docs = search_qbr_docs(session, doc_query)
+            if docs:
+                for doc in docs:
+                    with st.expander(f"{doc['DOC_NAME']} ({doc['QUARTER']} {doc['YEAR']})"):
+                        st.markdown(str(doc['CONTENT_TEXT'])[:500] + "...")
+            else:
+                st.info("No matching documents found")
+
+
+render_document_search(session)
 
 st.markdown("---")
 st.subheader("Ask Cortex")
@@ -1163,3 +934,17 @@ if ask_clicked and user_question:
             st.info(result["response"])
         else:
             st.error(f"Error: {result.get('error', 'Unknown error')}")
+
+if not traces.empty and explanation_prefetch.pending:
+    while explanation_prefetch.pending:
+        prefetch_progress.progress(
+            (explanation_prefetch.total - explanation_prefetch.pending) / explanation_prefetch.total,
+            text=f"Pre-computing AI analysis: {explanation_prefetch.pending} of {explanation_prefetch.total} relationships remaining"
+        )
+        for cache_key in collect_explanations(explanation_prefetch, wait_seconds=1):
+            if selected_explanation and selected_explanation[0] == cache_key:
+                show_prefetched_explanation(selected_explanation[1], explanation_prefetch, cache_key)
+    prefetch_progress.empty()
+
+if rerun_profile is not None:
+    render_debug_panel(finish_rerun_profile(rerun_profile))
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional, Sequence
+import pandas as pd
+from utils.compaction import compact_batches
+from utils.result_cache import ResultCache
+from utils.instrumentation import span
+
+MIN_POLL_INTERVAL = 0.002
+POLL_INTERVAL = 0.25
+PROGRESS_INTERVAL = 0.05
+
+logger = logging.getLogger('causal_chain.async_loader')
+
+
+class CompletedJob:
+    # Stand-in for sessions without async jobs; the query has already run by the time it exists.
+    def __init__(self, df):
+        self._df = df
+        self.query_id = None
+
+    def is_done(self) -> bool:
+        return True
+
+    def cancel(self) -> None:
+        pass
+
+    def result(self, result_type: str = 'row'):
+        if result_type == 'pandas_batches':
+            return iter([self._df.to_pandas()])
+        return self._df.to_pandas()
+
+
+def submit(session, query: str, params: Optional[Sequence] = None):
+    df = session.sql(query, params=params) if params else session.sql(query)
+    if hasattr(df, 'collect_nowait'):
+        return df.collect_nowait()
+    return CompletedJob(df)
+
+
+async def _await_job(job, compact: bool, poll_interval: float) -> pd.DataFrame:
+    # Each status check is a round trip for a Snowpark job, so polling backs off as the query runs longer.
+    delay = MIN_POLL_INTERVAL
+    while not job.is_done():
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, poll_interval)
+    if compact:
+        return compact_batches(job.result(result_type='pandas_batches'))
+    return job.result(result_type='pandas')
+
+
+async def run_queries_async(
+    session,
+    queries: Dict[str, str],
+    fail_fast: bool = True,
+    compact: bool = False,
+    result_cache: Optional[ResultCache] = None,
+    cache_version: Optional[str] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    poll_interval: float = POLL_INTERVAL,
+    timings: Optional[Dict[str, float]] = None,
+    params: Optional[Dict[str, Sequence]] = None
+) -> Dict[str, pd.DataFrame]:
+    results: Dict[str, pd.DataFrame] = {}
+    errors: list = []
+    use_cache = result_cache is not None and cache_version is not None
+    binds = params or {}
+    start = time.perf_counter()
+
+    jobs = {}
+    for name, query in queries.items():
+        df = result_cache.get(query, cache_version, binds.get(name), compact) if use_cache else None
+        if df is not None:
+            results[name] = df
+            continue
+        try:
+            jobs[name] = submit(session, query, binds.get(name))
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+
+    tasks = {asyncio.ensure_future(_await_job(job, compact, poll_interval)): name for name, job in jobs.items()}
+    pending = set(tasks)
+    try:
+        while pending:
+            if on_progress is not None:
+                on_progress(len(queries) - len(pending), len(queries))
+            done, pending = await asyncio.wait(pending, timeout=PROGRESS_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                if timings is not None:
+                    timings[name] = round((time.perf_counter() - start) * 1000, 1)
+                try:
+                    df = task.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+                if df is None:
+                    errors.append(f"{name}: Query '{name}' returned None")
+                    continue
+                results[name] = df
+                if use_cache:
+                    result_cache.put(queries[name], cache_version, df, binds.get(name), compact)
+    except BaseException:
+        # Streamlit stops a superseded run by raising from the progress callback; stale jobs stop with it.
+        for task in pending:
+            task.cancel()
+            _cancel_job(tasks[task], jobs[tasks[task]])
+        raise
+
+    if on_progress is not None:
+        on_progress(len(queries), len(queries))
+    if timings:
+        logger.info("Async load took %.1f ms (%s)", (time.perf_counter() - start) * 1000,
+                    ", ".join(f"{name}={ms:.1f}ms" for name, ms in timings.items()))
+    if errors and fail_fast:
+        raise RuntimeError(f"Query failures:\n" + "\n".join(errors))
+    return results
+
+
+def _cancel_job(name: str, job) -> None:
+    try:
+        job.cancel()
+        logger.info("Cancelled query '%s' (%s)", name, job.query_id)
+    except Exception as e:
+        logger.warning("Failed to cancel query '%s': %s", name, e)
+
+
+def load_queries_async(session, queries: Dict[str, str], **kwargs) -> Dict[str, pd.DataFrame]:
+    # A private loop rather than asyncio.run, which would replace the script thread's loop and its SIGINT handler.
+    loop = asyncio.new_event_loop()
+    try:
+        with span('run_queries_async', 'data'):
+            return loop.run_until_complete(run_queries_async(session, queries, **kwargs))
+    finally:
+        loop.close()
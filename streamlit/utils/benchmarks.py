@@ -0,0 +1,194 @@
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+import pandas as pd
+import streamlit as st
+from streamlit.logger import set_log_level
+from utils.causal_svg import clear_svg_caches, create_causal_svg
+from utils.dashboard import create_causal_tree, create_inventory_area, inventory_decomposition, render_metrics_tree_dashboard
+from utils.data_loader import get_result_cache, load_dashboard_data
+from utils.local_session import SYNTHETIC_DATA_DIR, LocalSession
+from utils.sensitivity import calculate_roce_sensitivity
+from utils.session_pool import close_pool_for
+from utils.visualizations import clear_figure_caches, create_causal_sankey
+
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEATS = 5
+DEFAULT_REGRESSION_RATIO = 1.25
+DEFAULT_MIN_DELTA_MS = 5.0
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parents[1] / 'benchmarks' / 'baseline.json'
+RESULT_FIELDS = ['NAME', 'SCALE', 'ROWS', 'MEDIAN_MS', 'MIN_MS', 'MAX_MS', 'REPEATS']
+STRATEGY_MODE = 'GROWTH'
+SHOCK_EVENT = 'None'
+
+
+def write_scaled_data(target_dir: Path, scale: int, source_dir: Path = SYNTHETIC_DATA_DIR) -> Path:
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for path in Path(source_dir).glob('*.csv'):
+        shutil.copy(path, target_dir / path.name)
+    if scale <= 1:
+        return target_dir
+
+    # Regions are replicated the way the generator fans out entities, so every month keeps `scale`x the rows.
+    perf = pd.read_csv(Path(source_dir) / 'fact_performance_snapshot.csv')
+    scaled = pd.concat(
+        [perf.assign(REGION=perf['REGION'] + f'_{entity + 1:05d}') for entity in range(scale)], ignore_index=True
+    )
+    scaled['SNAPSHOT_ID'] = range(1, len(scaled) + 1)
+    scaled.to_csv(target_dir / 'fact_performance_snapshot.csv', index=False)
+
+    # Trace rows are replicated too, so the per-edge cost of the graph renderers grows with scale.
+    traces = pd.read_csv(Path(source_dir) / 'causal_trace_definitions.csv')
+    traces = pd.concat([traces] * scale, ignore_index=True)
+    traces['TRACE_ID'] = range(1, len(traces) + 1)
+    traces.to_csv(target_dir / 'causal_trace_definitions.csv', index=False)
+    return target_dir
+
+
+def time_call(fn: Callable[[], object], repeats: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    if setup:
+        setup()
+    fn()
+    timings = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'MEDIAN_MS': round(statistics.median(timings), 3),
+        'MIN_MS': round(min(timings), 3),
+        'MAX_MS': round(max(timings), 3),
+        'REPEATS': repeats
+    }
+
+
+def benchmark_cases(session: LocalSession, cache_dir: str) -> List[tuple]:
+    # Cold loads clear the result cache, so they run against a private directory and never the app's shared one.
+    def cold_load() -> None:
+        st.cache_data.clear()
+        get_result_cache(cache_dir).clear()
+
+    def load() -> Dict[str, pd.DataFrame]:
+        return load_dashboard_data(session, STRATEGY_MODE, SHOCK_EVENT, cache_dir=cache_dir)
+
+    data = load()
+    df, traces = data['performance'], data['causal_traces']
+    return [
+        ('load_dashboard_data', len(df), load, cold_load),
+        ('load_dashboard_data_cached', len(df), load, st.cache_data.clear),
+        ('calculate_roce_sensitivity', len(df), lambda: calculate_roce_sensitivity(df, 10, 2, 15), None),
+        ('create_causal_tree', len(traces), lambda: create_causal_tree(traces), None),
+        ('create_causal_svg', len(traces), lambda: create_causal_svg(traces), clear_svg_caches),
+        ('create_causal_sankey', len(traces), lambda: create_causal_sankey(traces), clear_figure_caches),
+        ('render_metrics_tree_dashboard', len(df),
+         lambda: render_metrics_tree_dashboard(df, traces, STRATEGY_MODE), None),
+        ('inventory_area_prep', len(df), lambda: create_inventory_area(inventory_decomposition(df)), None)
+    ]
+
+
+def run_benchmarks(scales: Sequence[int] = DEFAULT_SCALES, repeats: int = DEFAULT_REPEATS,
+                   names: Optional[Sequence[str]] = None) -> List[Dict]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix='causal_chain_bench_') as workdir:
+        for scale in scales:
+            session = LocalSession(write_scaled_data(Path(workdir) / f'x{scale}', scale))
+            cache_dir = str(Path(workdir) / f'results_x{scale}')
+            try:
+                for name, rows, fn, setup in benchmark_cases(session, cache_dir):
+                    if names and name not in names:
+                        continue
+                    results.append({'NAME': name, 'SCALE': scale, 'ROWS': rows, **time_call(fn, repeats, setup)})
+            finally:
+                close_pool_for(session)
+                session.close()
+                st.cache_data.clear()
+                get_result_cache.clear()
+    return results
+
+
+def write_results(results: List[Dict], path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+    path.write_text(json.dumps(payload, indent=2))
+
+
+def read_results(path: Path) -> List[Dict]:
+    return json.loads(Path(path).read_text())['results']
+
+
+def compare_results(current: List[Dict], baseline: List[Dict], ratio: float = DEFAULT_REGRESSION_RATIO,
+                    min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> pd.DataFrame:
+    merged = pd.DataFrame(current)[['NAME', 'SCALE', 'ROWS', 'MEDIAN_MS']].merge(
+        pd.DataFrame(baseline)[['NAME', 'SCALE', 'MEDIAN_MS']],
+        on=['NAME', 'SCALE'], how='left', suffixes=('', '_BASELINE')
+    )
+    merged['RATIO'] = merged['MEDIAN_MS'] / merged['MEDIAN_MS_BASELINE']
+    merged['REGRESSED'] = (merged['RATIO'] > ratio) & (merged['MEDIAN_MS'] - merged['MEDIAN_MS_BASELINE'] > min_delta_ms)
+    return merged.sort_values('RATIO', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard data and compute paths offline")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                        help="Synthetic data multipliers to run at")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Timed runs per path (median is reported)")
+    parser.add_argument("--only", nargs="*", help="Benchmark names to run (default: all)")
+    parser.add_argument("--output", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH, help="Baseline results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--ratio", type=float, default=DEFAULT_REGRESSION_RATIO,
+                        help="Slowdown ratio that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Running outside `streamlit run` makes every st.* call warn about the missing script context.
+    # Reading an option parses the config first, which would otherwise reset the level afterwards.
+    st.get_option('logger.level')
+    set_log_level('error')
+    results = run_benchmarks(args.scales, args.repeats, args.only)
+    print(pd.DataFrame(results)[RESULT_FIELDS].to_string(index=False))
+
+    if args.output:
+        write_results(results, args.output)
+        print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        write_results(results, args.baseline)
+        print(f"Baseline updated at {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+
+    comparison = compare_results(results, read_results(args.baseline), args.ratio, args.min_delta_ms)
+    print()
+    print(comparison[['NAME', 'SCALE', 'MEDIAN_MS_BASELINE', 'MEDIAN_MS', 'RATIO', 'REGRESSED']].to_string(index=False))
+    return 1 if comparison['REGRESSED'].any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
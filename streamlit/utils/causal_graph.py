@@ -0,0 +1,97 @@
+from typing import Dict, List, Mapping
+import numpy as np
+import pandas as pd
+
+
+class CausalGraph:
+    def __init__(self, nodes: List[str], depths: np.ndarray, edge_src: np.ndarray, edge_tgt: np.ndarray,
+                 edge_weight: np.ndarray, layer_offsets: np.ndarray):
+        self.nodes = nodes
+        self.depths = depths
+        self.edge_src = edge_src
+        self.edge_tgt = edge_tgt
+        self.edge_weight = edge_weight
+        self.layer_offsets = layer_offsets
+        self.node_index: Dict[str, int] = {node: i for i, node in enumerate(nodes)}
+
+    @property
+    def n_layers(self) -> int:
+        return len(self.layer_offsets) - 1
+
+    def drivers(self) -> List[str]:
+        has_outgoing = np.zeros(len(self.nodes), dtype=bool)
+        has_outgoing[self.edge_src] = True
+        return [node for node, out in zip(self.nodes, has_outgoing) if out]
+
+    def downstream(self, node: str) -> List[str]:
+        return [n for n, impact in self.propagate({node: 1.0}).items() if impact != 0 and n != node]
+
+    def propagate(self, perturbation: Mapping[str, float]) -> pd.Series:
+        unknown = [node for node in perturbation if node not in self.node_index]
+        if unknown:
+            raise KeyError(f"Unknown causal nodes: {unknown}")
+
+        x = np.zeros(len(self.nodes))
+        for node, value in perturbation.items():
+            x[self.node_index[node]] += value
+
+        # Edges are grouped by the depth of their source node, so by the time a layer is
+        # applied every input to its sources has already been accumulated.
+        for layer in range(self.n_layers):
+            lo, hi = self.layer_offsets[layer], self.layer_offsets[layer + 1]
+            if lo == hi:
+                continue
+            src = self.edge_src[lo:hi]
+            x += np.bincount(self.edge_tgt[lo:hi], weights=self.edge_weight[lo:hi] * x[src], minlength=len(x))
+
+        return pd.Series(x, index=self.nodes, name='IMPACT_PCT')
+
+
+def compile_causal_graph(traces_df: pd.DataFrame) -> CausalGraph:
+    codes, names = pd.factorize(pd.concat([traces_df['SOURCE_METRIC'], traces_df['TARGET_METRIC']], ignore_index=True))
+    n_edges = len(traces_df)
+    src, tgt = codes[:n_edges], codes[n_edges:]
+    n_nodes = len(names)
+
+    magnitude = np.abs(traces_df['CAUSAL_WEIGHT'].to_numpy(dtype=float))
+    weight = np.where(traces_df['RELATIONSHIP_TYPE'].str.upper().to_numpy() == 'NEGATIVE', -magnitude, magnitude)
+
+    depths = _longest_path_depths(src, tgt, n_nodes, names)
+
+    node_order = np.lexsort((np.asarray(names, dtype=object).astype(str), depths))
+    new_position = np.empty(n_nodes, dtype=np.int64)
+    new_position[node_order] = np.arange(n_nodes)
+    src, tgt = new_position[src], new_position[tgt]
+    depths = depths[node_order]
+
+    edge_order = np.argsort(depths[src], kind='stable')
+    src, tgt, weight = src[edge_order], tgt[edge_order], weight[edge_order]
+
+    n_layers = int(depths.max()) + 1 if n_nodes else 0
+    layer_offsets = np.searchsorted(depths[src], np.arange(n_layers + 1), side='left')
+
+    return CausalGraph([str(names[i]) for i in node_order], depths, src, tgt, weight, layer_offsets)
+
+
+def _longest_path_depths(src: np.ndarray, tgt: np.ndarray, n_nodes: int, names) -> np.ndarray:
+    indegree = np.bincount(tgt, minlength=n_nodes)
+    by_source = np.argsort(src, kind='stable')
+    source_offsets = np.searchsorted(src[by_source], np.arange(n_nodes + 1), side='left')
+
+    depths = np.zeros(n_nodes, dtype=np.int64)
+    frontier = np.flatnonzero(indegree == 0)
+    visited = 0
+    while len(frontier):
+        visited += len(frontier)
+        out_edges = np.concatenate([by_source[source_offsets[n]:source_offsets[n + 1]] for n in frontier])
+        if len(out_edges) == 0:
+            break
+        np.maximum.at(depths, tgt[out_edges], depths[src[out_edges]] + 1)
+        indegree = indegree - np.bincount(tgt[out_edges], minlength=n_nodes)
+        released = np.unique(tgt[out_edges])
+        frontier = released[indegree[released] == 0]
+
+    if visited < n_nodes:
+        unresolved = sorted(str(names[i]) for i in np.flatnonzero(indegree > 0))
+        raise ValueError(f"Causal traces contain a cycle; unresolved metrics: {', '.join(unresolved)}")
+    return depths
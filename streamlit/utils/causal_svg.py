@@ -1,6 +1,8 @@
 import base64
-from typing import List, Dict
+import re
+from typing import Dict, List, Optional
 import pandas as pd
+from utils.visualizations import MemoCache, frame_fingerprint
 
 CONSULTING_PALETTE = {
     'bg': '#1a1a2e',
@@ -15,16 +17,59 @@ CONSULTING_PALETTE = {
     'line': '#495057'
 }
 
+SVG_COLUMNS = ['SOURCE_METRIC', 'TARGET_METRIC', 'CAUSAL_WEIGHT', 'RELATIONSHIP_TYPE']
+SVG_WIDTH, SVG_HEIGHT = 1000, 600
+
+_static_layers = MemoCache(max_entries=8)
+_data_uris = MemoCache(max_entries=128)
+_BETWEEN_TAGS = re.compile(r'>\s+<')
+_RUNS_OF_SPACE = re.compile(r'\s{2,}')
+
+
 def create_causal_svg(traces_df: pd.DataFrame, selected_relationship: str = None) -> str:
     if traces_df.empty:
         return _empty_svg()
-    
+    return _compose(causal_svg_layer(traces_df), selected_relationship)
+
+
+def causal_svg_data_uri(traces_df: pd.DataFrame, selected_relationship: str = None) -> str:
+    if traces_df.empty:
+        return _data_uris.get_or_build(('', None), lambda: _data_uri(_empty_svg()))
+    traces = traces_df[SVG_COLUMNS]
+    fingerprint = frame_fingerprint(traces)
+    return _data_uris.get_or_build(
+        (fingerprint, selected_relationship),
+        lambda: _data_uri(_compose(_static_layer(fingerprint, traces), selected_relationship))
+    )
+
+
+def causal_svg_layer(traces_df: pd.DataFrame) -> Dict:
+    traces = traces_df[SVG_COLUMNS]
+    return _static_layer(frame_fingerprint(traces), traces)
+
+
+def _static_layer(fingerprint: str, traces: pd.DataFrame) -> Dict:
+    return _static_layers.get_or_build(fingerprint, lambda: _build_static_layer(traces))
+
+
+def clear_svg_caches() -> None:
+    _static_layers.clear()
+    _data_uris.clear()
+
+
+def _compose(layer: Dict, selected_relationship: Optional[str]) -> str:
+    # The highlighted edge is redrawn over the cached base edges and under the node cards.
+    overlay = ''.join(_edge_markup(*edge, selected=True) for edge in layer['edges_by_id'].get(selected_relationship, []))
+    return layer['head'] + layer['edges'] + overlay + layer['tail']
+
+
+def _build_static_layer(traces: pd.DataFrame) -> Dict:
     driver_nodes = ['FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'BATCH_SIZE', 'OEE_PCT', 'SKU_BREADTH']
     lever_nodes = ['SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'CYCLE_STOCK_VALUE', 'COGS_USD', 'DIOH_DAYS']
     outcome_nodes = ['FREE_CASH_FLOW_USD', 'ROCE_PCT', 'NET_SALES_GROWTH_PCT', 'CAPITAL_EMPLOYED_USD', 'OTIF_PCT']
     
-    sources_in_data = set(traces_df['SOURCE_METRIC'].tolist())
-    targets_in_data = set(traces_df['TARGET_METRIC'].tolist())
+    sources_in_data = set(traces['SOURCE_METRIC'].tolist())
+    targets_in_data = set(traces['TARGET_METRIC'].tolist())
     all_in_data = sources_in_data | targets_in_data
     
     drivers = [n for n in driver_nodes if n in all_in_data]
@@ -32,7 +77,7 @@ def create_causal_svg(traces_df: pd.DataFrame, selected_relationship: str = None
     outcomes = [n for n in outcome_nodes if n in all_in_data]
     
     remaining = all_in_data - set(drivers) - set(levers) - set(outcomes)
-    for n in remaining:
+    for n in sorted(remaining):
         if n in sources_in_data and n not in targets_in_data:
             drivers.append(n)
         elif n in targets_in_data and n not in sources_in_data:
@@ -40,7 +85,7 @@ def create_causal_svg(traces_df: pd.DataFrame, selected_relationship: str = None
         else:
             levers.append(n)
     
-    width, height = 1000, 600
+    width, height = SVG_WIDTH, SVG_HEIGHT
     row_y = {'drivers': 80, 'levers': 300, 'outcomes': 520}
     node_width = 160
     node_height = 44
@@ -64,18 +109,34 @@ def create_causal_svg(traces_df: pd.DataFrame, selected_relationship: str = None
             result = result.replace(acr_upper.title(), acr_display)
         return result
     
-    rel_data = []
-    for _, row in traces_df.iterrows():
-        rel_id = f"{row['SOURCE_METRIC']}__{row['TARGET_METRIC']}"
-        rel_data.append({
-            'id': rel_id,
-            'source': row['SOURCE_METRIC'],
-            'target': row['TARGET_METRIC'],
-            'weight': abs(row['CAUSAL_WEIGHT']),
-            'is_positive': row['RELATIONSHIP_TYPE'] == 'POSITIVE'
-        })
+    edges_by_id: Dict[str, List[tuple]] = {}
+    edge_parts = []
+    for src, tgt, causal_weight, relationship_type in zip(
+        traces['SOURCE_METRIC'], traces['TARGET_METRIC'], traces['CAUSAL_WEIGHT'], traces['RELATIONSHIP_TYPE']
+    ):
+        if src in driver_x:
+            x1, y1 = driver_x[src], row_y['drivers'] + node_height // 2 + 10
+        elif src in lever_x:
+            x1, y1 = lever_x[src], row_y['levers'] + node_height // 2 + 10
+        else:
+            continue
+            
+        if tgt in lever_x:
+            x2, y2 = lever_x[tgt], row_y['levers'] - node_height // 2 + 10
+        elif tgt in outcome_x:
+            x2, y2 = outcome_x[tgt], row_y['outcomes'] - node_height // 2 + 10
+        else:
+            continue
+        
+        rel_id = f"{src}__{tgt}"
+        ctrl_y1 = y1 + (y2 - y1) * 0.4
+        ctrl_y2 = y1 + (y2 - y1) * 0.6
+        edge = (rel_id, f"M{x1},{y1} C{x1},{ctrl_y1} {x2},{ctrl_y2} {x2},{y2}",
+                abs(causal_weight), relationship_type == 'POSITIVE')
+        edges_by_id.setdefault(rel_id, []).append(edge)
+        edge_parts.append(_edge_markup(*edge))
     
-    svg_parts = [f'''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" style="font-family: 'Inter', 'Helvetica Neue', Arial, sans-serif;">
+    head = [f'''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" style="font-family: 'Inter', 'Helvetica Neue', Arial, sans-serif;">
   <defs>
     <linearGradient id="bgGrad" x1="0%" y1="0%" x2="0%" y2="100%">
       <stop offset="0%" style="stop-color:#0d1b2a"/>
@@ -122,79 +183,44 @@ def create_causal_svg(traces_df: pd.DataFrame, selected_relationship: str = None
   <rect width="{width}" height="{height}" fill="url(#bgGrad)"/>
 ''']
     
-    svg_parts.append(f'''
+    head.append(f'''
   <text x="{width // 2}" y="35" text-anchor="middle" fill="#e94560" font-size="12" font-weight="600" letter-spacing="1.5">PROCESS DRIVERS</text>
   <text x="{width // 2}" y="255" text-anchor="middle" fill="#00b4d8" font-size="12" font-weight="600" letter-spacing="1.5">ECONOMIC LEVERS</text>
   <text x="{width // 2}" y="475" text-anchor="middle" fill="#40c9a2" font-size="12" font-weight="600" letter-spacing="1.5">FINANCIAL OUTCOMES</text>
 ''')
     
-    for rel in rel_data:
-        src, tgt = rel['source'], rel['target']
-        weight = rel['weight']
-        is_positive = rel['is_positive']
-        rel_id = rel['id']
-        
-        if src in driver_x:
-            x1, y1 = driver_x[src], row_y['drivers'] + node_height // 2 + 10
-        elif src in lever_x:
-            x1, y1 = lever_x[src], row_y['levers'] + node_height // 2 + 10
-        else:
-            continue
-            
-        if tgt in lever_x:
-            x2, y2 = lever_x[tgt], row_y['levers'] - node_height // 2 + 10
-        elif tgt in outcome_x:
-            x2, y2 = outcome_x[tgt], row_y['outcomes'] - node_height // 2 + 10
-        else:
-            continue
-        
-        is_selected = selected_relationship == rel_id
-        
-        color = '#00b894' if is_positive else '#d63031'
-        base_opacity = 0.35 + weight * 0.35
-        opacity = 1.0 if is_selected else base_opacity
-        stroke_width = (1.5 + weight * 2.5) * (2.2 if is_selected else 1.0)
-        
-        if is_selected:
-            marker = 'arrowPosSelected' if is_positive else 'arrowNegSelected'
-        else:
-            marker = 'arrowPos' if is_positive else 'arrowNeg'
-        
-        ctrl_y1 = y1 + (y2 - y1) * 0.4
-        ctrl_y2 = y1 + (y2 - y1) * 0.6
-        
-        glow_filter = 'filter="url(#glowStrong)"' if is_selected else ''
-        
-        hit_area = f'''  <path d="M{x1},{y1} C{x1},{ctrl_y1} {x2},{ctrl_y2} {x2},{y2}" 
-        fill="none" stroke="transparent" stroke-width="20" 
-        style="cursor:pointer;" data-rel-id="{rel_id}" class="causal-path-hit"/>
-'''
-        svg_parts.append(hit_area)
-        
-        svg_parts.append(f'''  <path id="rel_{rel_id}" d="M{x1},{y1} C{x1},{ctrl_y1} {x2},{ctrl_y2} {x2},{y2}" 
-        fill="none" stroke="{color}" stroke-width="{stroke_width:.1f}" opacity="{opacity:.2f}" 
-        marker-end="url(#{marker})" {glow_filter} style="cursor:pointer; pointer-events:none;" class="causal-path-visual" data-rel-id="{rel_id}"/>
-''')
-    
+    tail = []
     for node, x in driver_x.items():
-        y = row_y['drivers']
-        label = format_label(node)
-        svg_parts.append(_create_node_card(x, y, label, 'driverGrad', '#e94560'))
+        tail.append(_create_node_card(x, row_y['drivers'], format_label(node), 'driverGrad', '#e94560'))
     
     for node, x in lever_x.items():
-        y = row_y['levers']
-        label = format_label(node)
-        svg_parts.append(_create_node_card(x, y, label, 'leverGrad', '#00b4d8'))
+        tail.append(_create_node_card(x, row_y['levers'], format_label(node), 'leverGrad', '#00b4d8'))
     
     for node, x in outcome_x.items():
-        y = row_y['outcomes']
-        label = format_label(node)
-        svg_parts.append(_create_node_card(x, y, label, 'outcomeGrad', '#40c9a2'))
+        tail.append(_create_node_card(x, row_y['outcomes'], format_label(node), 'outcomeGrad', '#40c9a2'))
     
-    svg_parts.append(_create_legend(width, height))
-    svg_parts.append('</svg>')
+    tail.append(_create_legend(width, height))
+    tail.append('</svg>')
     
-    return ''.join(svg_parts)
+    return {'head': ''.join(head), 'edges': ''.join(edge_parts), 'tail': ''.join(tail), 'edges_by_id': edges_by_id}
+
+
+def _edge_markup(rel_id: str, path: str, weight: float, is_positive: bool, selected: bool = False) -> str:
+    color = '#00b894' if is_positive else '#d63031'
+    if selected:
+        marker = 'arrowPosSelected' if is_positive else 'arrowNegSelected'
+        return f'''  <path id="rel_{rel_id}_selected" d="{path}" 
+        fill="none" stroke="{color}" stroke-width="{(1.5 + weight * 2.5) * 2.2:.1f}" opacity="1.00" 
+        marker-end="url(#{marker})" filter="url(#glowStrong)" style="cursor:pointer; pointer-events:none;" class="causal-path-visual causal-path-selected" data-rel-id="{rel_id}"/>
+'''
+    marker = 'arrowPos' if is_positive else 'arrowNeg'
+    return f'''  <path d="{path}" 
+        fill="none" stroke="transparent" stroke-width="20" 
+        style="cursor:pointer;" data-rel-id="{rel_id}" class="causal-path-hit"/>
+  <path id="rel_{rel_id}" d="{path}" 
+        fill="none" stroke="{color}" stroke-width="{1.5 + weight * 2.5:.1f}" opacity="{0.35 + weight * 0.35:.2f}" 
+        marker-end="url(#{marker})" style="cursor:pointer; pointer-events:none;" class="causal-path-visual" data-rel-id="{rel_id}"/>
+'''
 
 
 def _create_node_card(x: int, y: int, label: str, gradient: str, accent: str) -> str:
@@ -258,3 +284,8 @@ def _empty_svg() -> str:
 
 def svg_to_base64(svg_string: str) -> str:
     return base64.b64encode(svg_string.encode('utf-8')).decode('utf-8')
+
+
+def _data_uri(svg_string: str) -> str:
+    compact = _RUNS_OF_SPACE.sub(' ', _BETWEEN_TAGS.sub('><', svg_string))
+    return f"data:image/svg+xml;base64,{svg_to_base64(compact)}"
@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, List
+import numpy as np
+import pandas as pd
+
+MONETARY_SUFFIXES = ('_USD', '_VALUE')
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+# The UI shows money in $M to one decimal; narrowing may move a value by at most 1% of that ($1,000).
+FLOAT32_ATOL = 1_000.0
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def is_monetary(column: str) -> bool:
+    return column.upper().endswith(MONETARY_SUFFIXES)
+
+
+def downcast_monetary(df: pd.DataFrame, atol: float = FLOAT32_ATOL) -> List[str]:
+    downcast = []
+    for column in df.columns:
+        if not is_monetary(column) or df[column].dtype != np.float64:
+            continue
+        values = df[column].to_numpy()
+        narrowed = values.astype(np.float32)
+        if np.allclose(narrowed, values, rtol=0, atol=atol, equal_nan=True):
+            df[column] = narrowed
+            downcast.append(column)
+    return downcast
+
+
+def categorize_strings(df: pd.DataFrame, max_unique_ratio: float = CATEGORY_MAX_UNIQUE_RATIO) -> List[str]:
+    categorized = []
+    for column in df.columns:
+        series = df[column]
+        if len(series) == 0 or isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+            continue
+        if series.nunique(dropna=True) <= max_unique_ratio * len(series):
+            df[column] = series.astype('category')
+            categorized.append(column)
+    return categorized
+
+
+def compact_batches(batches: Iterable[pd.DataFrame], atol: float = FLOAT32_ATOL) -> pd.DataFrame:
+    # Strings stay as objects until all batches are in, so every batch shares one category set.
+    bytes_before = 0
+    downcast = set()
+    frames = []
+    for batch in batches:
+        bytes_before += frame_nbytes(batch)
+        downcast.update(downcast_monetary(batch, atol))
+        frames.append(batch)
+
+    # concat promotes a column back to float64 unless every batch passed the tolerance check.
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    categorized = categorize_strings(df)
+
+    bytes_after = frame_nbytes(df)
+    df.attrs['compaction'] = {
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+        'float32_columns': sorted(c for c in downcast if df[c].dtype == np.float32),
+        'category_columns': categorized
+    }
+    return df
+
+
+def compaction_summary(frames: Dict[str, pd.DataFrame]) -> Dict[str, int]:
+    reports = [df.attrs['compaction'] for df in frames.values() if 'compaction' in df.attrs]
+    return {
+        key: sum(report[key] for report in reports)
+        for key in ('bytes_before', 'bytes_after', 'bytes_saved')
+    }
@@ -1,11 +1,14 @@
 import json
-from typing import Dict, List, Optional
-from snowflake.snowpark import Session
+from typing import TYPE_CHECKING, Dict, List, Optional
+from utils.doc_index import DEFAULT_SYNC_INTERVAL, DocumentIndex, default_index
+
+if TYPE_CHECKING:
+    from snowflake.snowpark import Session
 
 SEMANTIC_MODEL_PATH = "@CAUSAL_CHAIN.STAGES.SEMANTIC_MODELS/causal_chain_model.yaml"
 SEARCH_SERVICE = "CAUSAL_CHAIN.STRATEGY_SIMULATOR.SUPPLY_CHAIN_CONTEXT_SEARCH"
 
-def query_cortex_analyst(session: Session, question: str) -> Dict:
+def query_cortex_analyst(session: 'Session', question: str) -> Dict:
     prompt = f"""You are a supply chain finance analyst. Given this question about the causal chain data model, answer based on the semantic model context.
     
 Question: {question}
@@ -39,26 +42,18 @@ Provide a concise answer with specific metrics when relevant."""
         }
 
 
-def search_qbr_documents(session: Session, query: str, limit: int = 3) -> List[Dict]:
+def search_qbr_documents(session: 'Session', query: str, limit: int = 3,
+                         index: Optional[DocumentIndex] = None) -> List[Dict]:
     try:
-        result = session.sql(f"""
-            SELECT 
-                DOC_NAME,
-                QUARTER,
-                YEAR,
-                CONTENT_TEXT
-            FROM RAW.QBR_DOCUMENTS
-            WHERE CONTAINS(LOWER(CONTENT_TEXT), LOWER('{query}'))
-            OR CONTAINS(LOWER(DOC_NAME), LOWER('{query}'))
-            LIMIT {limit}
-        """).to_pandas()
-        
-        return result.to_dict('records')
+        if index is None:
+            index = default_index()
+        index.sync(session, max_age=DEFAULT_SYNC_INTERVAL)
+        return index.search(query, limit)
     except Exception as e:
         return []
 
 
-def generate_rag_response(session: Session, question: str, context: List[Dict]) -> str:
+def generate_rag_response(session: 'Session', question: str, context: List[Dict]) -> str:
     if not context:
         return "No relevant documents found for your query."
     
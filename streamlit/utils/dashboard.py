@@ -0,0 +1,351 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from utils.theme import (
+    DARK_BG, CARD_BG, BORDER, TEXT, TEXT_MUTED, SNOWFLAKE_BLUE, STAR_BLUE, MID_BLUE,
+    VALENCIA_ORANGE, PURPLE_MOON, FIRST_LIGHT, ACRONYM_DEFINITIONS, apply_dark_theme
+)
+from utils.instrumentation import timed
+
+STRATEGY_TARGETS = {
+    'GROWTH': {
+        'FORECAST_MAPE_PCT': 15.0, 'LEAD_TIME_DAYS': 14.0, 'BATCH_SIZE': 100, 'OEE_PCT': 75.0, 'SKU_BREADTH': 200,
+        'SAFETY_STOCK_VALUE': 6_000_000, 'PIPELINE_STOCK_VALUE': 7_000_000, 'CYCLE_STOCK_VALUE': 15_000_000,
+        'COGS_USD': 55_000_000, 'DIOH_DAYS': 35,
+        'OTIF_PCT': 98.0, 'NET_SALES_GROWTH_PCT': 15.0, 'ROCE_PCT': 12.0, 'FREE_CASH_FLOW_USD': 8_000_000, 'CAPITAL_EMPLOYED_USD': 120_000_000
+    },
+    'MARGIN': {
+        'FORECAST_MAPE_PCT': 18.0, 'LEAD_TIME_DAYS': 10.0, 'BATCH_SIZE': 150, 'OEE_PCT': 80.0, 'SKU_BREADTH': 120,
+        'SAFETY_STOCK_VALUE': 3_500_000, 'PIPELINE_STOCK_VALUE': 4_500_000, 'CYCLE_STOCK_VALUE': 10_000_000,
+        'COGS_USD': 50_000_000, 'DIOH_DAYS': 22,
+        'OTIF_PCT': 94.0, 'NET_SALES_GROWTH_PCT': 8.0, 'ROCE_PCT': 16.0, 'FREE_CASH_FLOW_USD': 12_000_000, 'CAPITAL_EMPLOYED_USD': 85_000_000
+    },
+    'CASH': {
+        'FORECAST_MAPE_PCT': 20.0, 'LEAD_TIME_DAYS': 8.0, 'BATCH_SIZE': 200, 'OEE_PCT': 85.0, 'SKU_BREADTH': 100,
+        'SAFETY_STOCK_VALUE': 3_000_000, 'PIPELINE_STOCK_VALUE': 4_000_000, 'CYCLE_STOCK_VALUE': 8_000_000,
+        'COGS_USD': 48_000_000, 'DIOH_DAYS': 18,
+        'OTIF_PCT': 92.0, 'NET_SALES_GROWTH_PCT': 5.0, 'ROCE_PCT': 18.0, 'FREE_CASH_FLOW_USD': 15_000_000, 'CAPITAL_EMPLOYED_USD': 75_000_000
+    }
+}
+
+METRIC_DIRECTION = {
+    'FORECAST_MAPE_PCT': 'lower', 'LEAD_TIME_DAYS': 'lower', 'BATCH_SIZE': 'context', 'OEE_PCT': 'higher', 'SKU_BREADTH': 'context',
+    'SAFETY_STOCK_VALUE': 'context', 'PIPELINE_STOCK_VALUE': 'lower', 'CYCLE_STOCK_VALUE': 'lower',
+    'COGS_USD': 'lower', 'DIOH_DAYS': 'lower',
+    'OTIF_PCT': 'higher', 'NET_SALES_GROWTH_PCT': 'higher', 'ROCE_PCT': 'higher', 'FREE_CASH_FLOW_USD': 'higher', 'CAPITAL_EMPLOYED_USD': 'context'
+}
+
+INVENTORY_COLUMNS = ['CYCLE_STOCK_VALUE', 'SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE',
+                     'ANTICIPATION_STOCK_VALUE', 'STRATEGIC_STOCK_VALUE']
+
+
+def get_variance_color(actual, target, direction='higher'):
+    if target == 0:
+        return TEXT_MUTED
+    variance_pct = ((actual - target) / abs(target)) * 100
+    if direction == 'higher':
+        if variance_pct >= 5:
+            return SNOWFLAKE_BLUE
+        elif variance_pct >= -5:
+            return TEXT_MUTED
+        else:
+            return VALENCIA_ORANGE
+    elif direction == 'lower':
+        if variance_pct <= -5:
+            return SNOWFLAKE_BLUE
+        elif variance_pct <= 5:
+            return TEXT_MUTED
+        else:
+            return VALENCIA_ORANGE
+    else:
+        return TEXT_MUTED
+
+
+def format_variance(actual, target, direction='higher'):
+    if target == 0:
+        return ""
+    variance = actual - target
+    variance_pct = (variance / abs(target)) * 100
+    color = get_variance_color(actual, target, direction)
+    arrow = "▲" if variance > 0 else "▼" if variance < 0 else "–"
+    return f'<span style="color: {color}; font-size: 0.65rem;">{arrow} {abs(variance_pct):.0f}% vs target</span>'
+
+
+@timed(category='chart')
+def create_causal_tree(traces_df):
+    if traces_df.empty:
+        return go.Figure()
+    
+    driver_nodes = ['FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'BATCH_SIZE', 'OEE_PCT', 'SKU_BREADTH']
+    lever_nodes = ['SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'CYCLE_STOCK_VALUE', 'COGS_USD', 'DIOH_DAYS']
+    outcome_nodes = ['FREE_CASH_FLOW_USD', 'ROCE_PCT', 'NET_SALES_GROWTH_PCT', 'CAPITAL_EMPLOYED_USD', 'OTIF_PCT']
+    
+    sources_in_data = set(traces_df['SOURCE_METRIC'].tolist())
+    targets_in_data = set(traces_df['TARGET_METRIC'].tolist())
+    all_in_data = sources_in_data | targets_in_data
+    
+    drivers = [n for n in driver_nodes if n in all_in_data]
+    levers = [n for n in lever_nodes if n in all_in_data]
+    outcomes = [n for n in outcome_nodes if n in all_in_data]
+    
+    remaining = all_in_data - set(drivers) - set(levers) - set(outcomes)
+    for n in remaining:
+        if n in sources_in_data and n not in targets_in_data:
+            drivers.append(n)
+        elif n in targets_in_data and n not in sources_in_data:
+            outcomes.append(n)
+        else:
+            levers.append(n)
+    
+    def format_label(n):
+        return n.replace('_', ' ').replace(' PCT', '%').replace(' USD', '$').replace(' VALUE', '').title()
+    
+    node_positions = {}
+    x_positions = {'drivers': 0, 'levers': 1, 'outcomes': 2}
+    
+    for i, n in enumerate(drivers):
+        node_positions[n] = (x_positions['drivers'], len(drivers) - 1 - i)
+    for i, n in enumerate(levers):
+        node_positions[n] = (x_positions['levers'], len(levers) - 1 - i)
+    for i, n in enumerate(outcomes):
+        node_positions[n] = (x_positions['outcomes'], len(outcomes) - 1 - i)
+    
+    fig = go.Figure()
+    
+    for _, row in traces_df.iterrows():
+        src, tgt = row['SOURCE_METRIC'], row['TARGET_METRIC']
+        if src in node_positions and tgt in node_positions:
+            x0, y0 = node_positions[src]
+            x1, y1 = node_positions[tgt]
+            weight = abs(row['CAUSAL_WEIGHT'])
+            is_positive = row['RELATIONSHIP_TYPE'] == 'POSITIVE'
+            color = f'rgba(41,181,232,{0.3 + weight * 0.5})' if is_positive else f'rgba(255,159,54,{0.3 + weight * 0.5})'
+            
+            mid_x = (x0 + x1) / 2
+            fig.add_trace(go.Scatter(
+                x=[x0 + 0.12, mid_x, x1 - 0.12],
+                y=[y0, (y0 + y1) / 2, y1],
+                mode='lines',
+                line=dict(color=color, width=1 + weight * 3, shape='spline'),
+                hoverinfo='text',
+                hovertext=f"{format_label(src)} → {format_label(tgt)}<br>Weight: {weight:.2f}",
+                showlegend=False
+            ))
+    
+    for category, nodes, color, label in [
+        ('drivers', drivers, VALENCIA_ORANGE, 'Process Drivers'),
+        ('levers', levers, SNOWFLAKE_BLUE, 'Economic Levers'),
+        ('outcomes', outcomes, PURPLE_MOON, 'Financial Outcomes')
+    ]:
+        if not nodes:
+            continue
+        x_vals = [node_positions[n][0] for n in nodes]
+        y_vals = [node_positions[n][1] for n in nodes]
+        labels = [format_label(n) for n in nodes]
+        
+        fig.add_trace(go.Scatter(
+            x=x_vals, y=y_vals,
+            mode='markers+text',
+            marker=dict(size=28, color=color, line=dict(color=BORDER, width=2)),
+            text=labels,
+            textposition='middle right' if category == 'drivers' else ('middle left' if category == 'outcomes' else 'top center'),
+            textfont=dict(size=10, color=TEXT),
+            hoverinfo='text',
+            hovertext=labels,
+            name=label,
+            showlegend=True
+        ))
+    
+    max_y = max(len(drivers), len(levers), len(outcomes)) - 1
+    fig.update_layout(
+        height=450,
+        xaxis=dict(
+            showgrid=False, zeroline=False, showticklabels=False,
+            range=[-0.5, 2.5]
+        ),
+        yaxis=dict(
+            showgrid=False, zeroline=False, showticklabels=False,
+            range=[-0.8, max_y + 0.8]
+        ),
+        legend=dict(
+            orientation='h', yanchor='bottom', y=1.02, xanchor='center', x=0.5,
+            font=dict(size=10)
+        ),
+        margin=dict(l=20, r=20, t=60, b=20)
+    )
+    return apply_dark_theme(fig)
+
+
+@timed(category='chart')
+def render_metrics_tree_dashboard(data_df, traces_df, strategy_mode):
+    latest = data_df.iloc[0] if not data_df.empty else {}
+    targets = STRATEGY_TARGETS.get(strategy_mode, STRATEGY_TARGETS['GROWTH'])
+    
+    metric_values = {
+        'FORECAST_MAPE_PCT': latest.get('FORECAST_MAPE_PCT', 0),
+        'LEAD_TIME_DAYS': latest.get('LEAD_TIME_DAYS', 0),
+        'BATCH_SIZE': latest.get('BATCH_SIZE', latest.get('CYCLE_STOCK_VALUE', 0) / 100000) if 'BATCH_SIZE' not in latest else latest.get('BATCH_SIZE', 0),
+        'OEE_PCT': latest.get('OEE_PCT', 0),
+        'SKU_BREADTH': latest.get('SKU_BREADTH', 150),
+        'SAFETY_STOCK_VALUE': latest.get('SAFETY_STOCK_VALUE', 0),
+        'PIPELINE_STOCK_VALUE': latest.get('PIPELINE_STOCK_VALUE', 0),
+        'CYCLE_STOCK_VALUE': latest.get('CYCLE_STOCK_VALUE', 0),
+        'COGS_USD': latest.get('COGS_USD', 0),
+        'DIOH_DAYS': latest.get('CASH_CONVERSION_CYCLE_DAYS', 0) * 0.4,
+        'FREE_CASH_FLOW_USD': latest.get('FREE_CASH_FLOW_USD', 0),
+        'ROCE_PCT': latest.get('ROCE_PCT', 0),
+        'NET_SALES_GROWTH_PCT': latest.get('NET_SALES_GROWTH_PCT', 0),
+        'CAPITAL_EMPLOYED_USD': latest.get('CAPITAL_EMPLOYED_USD', 0),
+        'OTIF_PCT': latest.get('OTIF_PCT', 0)
+    }
+    
+    def format_value(metric, value):
+        if 'PCT' in metric:
+            return f"{value:.1f}%"
+        elif 'USD' in metric or 'VALUE' in metric:
+            if abs(value) >= 1_000_000:
+                return f"${value/1_000_000:.1f}M"
+            elif abs(value) >= 1_000:
+                return f"${value/1_000:.0f}K"
+            else:
+                return f"${value:.0f}"
+        elif 'DAYS' in metric:
+            return f"{value:.1f}d"
+        else:
+            return f"{value:.1f}"
+    
+    def format_label(metric):
+        acronym_map = {
+            'FORECAST_MAPE_PCT': 'Forecast MAPE',
+            'LEAD_TIME_DAYS': 'Lead Time',
+            'BATCH_SIZE': 'Batch Size',
+            'OEE_PCT': 'OEE',
+            'SKU_BREADTH': 'SKU Breadth',
+            'SAFETY_STOCK_VALUE': 'Safety Stock',
+            'PIPELINE_STOCK_VALUE': 'Pipeline Stock',
+            'CYCLE_STOCK_VALUE': 'Cycle Stock',
+            'COGS_USD': 'COGS',
+            'DIOH_DAYS': 'DIOH',
+            'FREE_CASH_FLOW_USD': 'FCF',
+            'ROCE_PCT': 'ROCE',
+            'NET_SALES_GROWTH_PCT': 'Sales Growth',
+            'CAPITAL_EMPLOYED_USD': 'Capital Employed',
+            'OTIF_PCT': 'OTIF'
+        }
+        return acronym_map.get(metric, metric.replace('_', ' ').title())
+    
+    def format_label_with_tooltip(metric):
+        label = format_label(metric)
+        acronyms_in_label = ['MAPE', 'OEE', 'SKU', 'COGS', 'DIOH', 'FCF', 'ROCE', 'OTIF']
+        for acr in acronyms_in_label:
+            if acr in label and acr in ACRONYM_DEFINITIONS:
+                full_name, desc = ACRONYM_DEFINITIONS[acr]
+                tooltip_html = f'<span style="cursor: help; border-bottom: 1px dotted {TEXT_MUTED};" title="{full_name}: {desc}">{acr}<sup style="font-size: 0.45rem; color: {SNOWFLAKE_BLUE};">ⓘ</sup></span>'
+                label = label.replace(acr, tooltip_html)
+                break
+        return label
+    
+    drivers = ['FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'BATCH_SIZE', 'OEE_PCT', 'SKU_BREADTH']
+    levers = ['SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'CYCLE_STOCK_VALUE', 'COGS_USD', 'DIOH_DAYS']
+    outcomes = ['OTIF_PCT', 'NET_SALES_GROWTH_PCT', 'ROCE_PCT', 'FREE_CASH_FLOW_USD', 'CAPITAL_EMPLOYED_USD']
+    
+    driver_colors = {'FORECAST_MAPE_PCT': VALENCIA_ORANGE, 'LEAD_TIME_DAYS': '#FFBF6B', 'BATCH_SIZE': '#E68A2E', 'OEE_PCT': '#FF9F36', 'SKU_BREADTH': '#CC7A29'}
+    lever_colors = {'SAFETY_STOCK_VALUE': SNOWFLAKE_BLUE, 'PIPELINE_STOCK_VALUE': STAR_BLUE, 'CYCLE_STOCK_VALUE': '#66D2ED', 'COGS_USD': '#99E1F3', 'DIOH_DAYS': MID_BLUE}
+    outcome_colors = {'OTIF_PCT': PURPLE_MOON, 'NET_SALES_GROWTH_PCT': '#9B7ED8', 'ROCE_PCT': FIRST_LIGHT, 'FREE_CASH_FLOW_USD': '#E07BA8', 'CAPITAL_EMPLOYED_USD': '#B366C2'}
+    
+    def metric_card(metric, color):
+        value = metric_values.get(metric, 0)
+        target = targets.get(metric, 0)
+        direction = METRIC_DIRECTION.get(metric, 'higher')
+        label = format_label_with_tooltip(metric)
+        formatted_val = format_value(metric, value)
+        formatted_target = format_value(metric, target)
+        variance_html = format_variance(value, target, direction)
+        variance_color = get_variance_color(value, target, direction)
+        
+        return f'''
+        <div style="background: linear-gradient(135deg, {CARD_BG} 0%, {DARK_BG} 100%); border: 2px solid {color}; border-radius: 10px; padding: 0.6rem 0.8rem; text-align: center; min-width: 110px;">
+            <div style="color: {color}; font-size: 1.4rem; font-weight: 700;">{formatted_val}</div>
+            <div style="color: {TEXT_MUTED}; font-size: 0.6rem; text-transform: uppercase; letter-spacing: 0.5px; margin: 0.2rem 0;">{label}</div>
+            <div style="color: {TEXT_MUTED}; font-size: 0.55rem; border-top: 1px solid {BORDER}; padding-top: 0.3rem; margin-top: 0.3rem;">
+                Target: {formatted_target}
+            </div>
+            <div>{variance_html}</div>
+        </div>
+        '''
+    
+    st.markdown(f"""
+    <div style="background: linear-gradient(180deg, {DARK_BG} 0%, {CARD_BG} 100%); border: 1px solid {BORDER}; border-radius: 12px; padding: 1.5rem; margin-bottom: 1.5rem;">
+        <h4 style="color: {VALENCIA_ORANGE}; text-align: center; margin: 0 0 1rem 0; font-size: 0.85rem; letter-spacing: 1.5px;">PROCESS DRIVERS</h4>
+    """, unsafe_allow_html=True)
+    
+    driver_cols = st.columns(5)
+    for i, metric in enumerate(drivers):
+        with driver_cols[i]:
+            st.markdown(metric_card(metric, driver_colors[metric]), unsafe_allow_html=True)
+    
+    st.markdown(f"""
+        <div style="display: flex; justify-content: center; margin: 1rem 0;">
+            <svg width="100" height="40" viewBox="0 0 100 40">
+                <defs>
+                    <marker id="arrow-down" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
+                        <path d="M0,0 L10,5 L0,10 Z" fill="{SNOWFLAKE_BLUE}"/>
+                    </marker>
+                </defs>
+                <line x1="50" y1="0" x2="50" y2="30" stroke="{SNOWFLAKE_BLUE}" stroke-width="2" marker-end="url(#arrow-down)"/>
+            </svg>
+        </div>
+        <h4 style="color: {SNOWFLAKE_BLUE}; text-align: center; margin: 0 0 1rem 0; font-size: 0.85rem; letter-spacing: 1.5px;">ECONOMIC LEVERS</h4>
+    """, unsafe_allow_html=True)
+    
+    lever_cols = st.columns(5)
+    for i, metric in enumerate(levers):
+        with lever_cols[i]:
+            st.markdown(metric_card(metric, lever_colors[metric]), unsafe_allow_html=True)
+    
+    st.markdown(f"""
+        <div style="display: flex; justify-content: center; margin: 1rem 0;">
+            <svg width="100" height="40" viewBox="0 0 100 40">
+                <defs>
+                    <marker id="arrow-down2" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
+                        <path d="M0,0 L10,5 L0,10 Z" fill="{PURPLE_MOON}"/>
+                    </marker>
+                </defs>
+                <line x1="50" y1="0" x2="50" y2="30" stroke="{PURPLE_MOON}" stroke-width="2" marker-end="url(#arrow-down2)"/>
+            </svg>
+        </div>
+        <h4 style="color: {PURPLE_MOON}; text-align: center; margin: 0 0 1rem 0; font-size: 0.85rem; letter-spacing: 1.5px;">FINANCIAL OUTCOMES</h4>
+    """, unsafe_allow_html=True)
+    
+    outcome_cols = st.columns(5)
+    for i, metric in enumerate(outcomes):
+        with outcome_cols[i]:
+            st.markdown(metric_card(metric, outcome_colors[metric]), unsafe_allow_html=True)
+    
+
+
+@timed(category='compute')
+def inventory_decomposition(df: pd.DataFrame) -> pd.DataFrame:
+    inv_data = df.groupby('PERFORMANCE_MONTH', observed=True)[INVENTORY_COLUMNS].sum().reset_index()
+    inv_data = inv_data.sort_values('PERFORMANCE_MONTH')
+    melted = pd.melt(
+        inv_data, id_vars=['PERFORMANCE_MONTH'], value_vars=INVENTORY_COLUMNS,
+        var_name='Type', value_name='Value'
+    )
+    melted['Type'] = melted['Type'].str.replace('_STOCK_VALUE', '').str.replace('_', ' ').str.title()
+    melted['Value'] = melted['Value'] / 1_000_000
+    return melted
+
+
+@timed(category='chart')
+def create_inventory_area(inv_data_melted: pd.DataFrame) -> go.Figure:
+    fig = px.area(
+        inv_data_melted, x='PERFORMANCE_MONTH', y='Value', color='Type',
+        title='Inventory Structure Over Time ($M)',
+        color_discrete_map={'Cycle': SNOWFLAKE_BLUE, 'Safety': VALENCIA_ORANGE, 'Pipeline': STAR_BLUE,
+                            'Anticipation': PURPLE_MOON, 'Strategic': FIRST_LIGHT}
+    )
+    fig = apply_dark_theme(fig)
+    fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return fig
@@ -1,28 +1,98 @@
+import logging
+import os
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence
 import streamlit as st
+from utils.scenario_engine import apply_scenario, select_scenario
+from utils.compaction import compact_batches, compaction_summary
+from utils.result_cache import ResultCache, data_version
+from utils.instrumentation import bind, span, timed, tracked_cache_data
+from utils.session_pool import SessionPool, pool_for
+from utils.async_loader import load_queries_async
 
+logger = logging.getLogger('causal_chain.data_loader')
+
+ASYNC_LOAD_ENV = 'CAUSAL_CHAIN_ASYNC_LOAD'
+LOAD_PROGRESS_KEY = '_data_load_progress'
+
+PERFORMANCE_COLUMNS = [
+    'PERFORMANCE_MONTH', 'REGION', 'STRATEGY_MODE',
+    'OTIF_PCT', 'FILL_RATE_PCT', 'NET_SALES_GROWTH_PCT',
+    'GROSS_MARGIN_PCT', 'EBITDA_MARGIN_PCT', 'COGS_USD',
+    'ROCE_PCT', 'FREE_CASH_FLOW_USD', 'CASH_CONVERSION_CYCLE_DAYS',
+    'CYCLE_STOCK_VALUE', 'SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE',
+    'ANTICIPATION_STOCK_VALUE', 'STRATEGIC_STOCK_VALUE', 'TOTAL_INVENTORY_VALUE',
+    'FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'OEE_PCT',
+    'NOPAT_USD', 'WORKING_CAPITAL_DELTA_USD', 'FIXED_ASSET_DELTA_USD',
+    'CAPITAL_EMPLOYED_USD', 'EVA_USD'
+]
+
+SCENARIO_COLUMNS = [
+    'SERVICE_WEIGHT', 'COST_WEIGHT', 'CASH_WEIGHT',
+    'PERMISSIBLE_RED', 'MANDATORY_GREEN', 'ECONOMIC_BET',
+    'SCENARIO_ID', 'FCF_DELTA_PCT', 'ROCE_DELTA_PCT',
+    'SAFETY_STOCK_DELTA_PCT', 'PIPELINE_STOCK_DELTA_PCT', 'LEAD_TIME_DELTA_DAYS'
+]
+
+BASELINE_SELECT_COLUMNS = [
+    'PERFORMANCE_MONTH', 'REGION', 'STRATEGY_MODE',
+    'OTIF_PCT', 'GROSS_MARGIN_PCT', 'ROCE_PCT', 'FREE_CASH_FLOW_USD',
+    'SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'TOTAL_INVENTORY_VALUE',
+    'CAPITAL_EMPLOYED_USD', 'EVA_USD'
+]
+
+@timed(category='data')
 def run_queries_parallel(
     session, 
     queries: Dict[str, str], 
     max_workers: int = 4,
-    fail_fast: bool = True
+    fail_fast: bool = True,
+    compact: bool = False,
+    result_cache: Optional[ResultCache] = None,
+    cache_version: Optional[str] = None,
+    pool: Optional[SessionPool] = None,
+    timings: Optional[Dict[str, float]] = None,
+    params: Optional[Dict[str, Sequence]] = None
 ) -> Dict[str, pd.DataFrame]:
     results: Dict[str, pd.DataFrame] = {}
     errors: list = []
+    use_cache = result_cache is not None and cache_version is not None
+    
+    def fetch(worker_session, query: str, binds: Optional[Sequence]) -> pd.DataFrame:
+        df = worker_session.sql(query, params=binds) if binds else worker_session.sql(query)
+        if compact:
+            return compact_batches(df.to_pandas_batches())
+        return df.to_pandas()
     
     def execute_query(name: str, query: str):
+        start = time.perf_counter()
+        binds = (params or {}).get(name)
         try:
-            df = session.sql(query).to_pandas()
+            with span(f"query:{name}", 'data'):
+                df = result_cache.get(query, cache_version, binds, compact) if use_cache else None
+                if df is not None:
+                    return name, df, None
+                if pool is not None:
+                    with pool.checkout() as worker_session:
+                        df = fetch(worker_session, query, binds)
+                else:
+                    df = fetch(session, query, binds)
+            if use_cache and df is not None:
+                result_cache.put(query, cache_version, df, binds, compact)
             if df is None:
                 return name, None, f"Query '{name}' returned None"
             return name, df, None
         except Exception as e:
             return name, None, str(e)
+        finally:
+            if timings is not None:
+                timings[name] = round((time.perf_counter() - start) * 1000, 1)
     
+    start = time.perf_counter()
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(execute_query, n, q): n for n, q in queries.items()}
+        futures = {executor.submit(bind(execute_query), n, q): n for n, q in queries.items()}
         for future in as_completed(futures):
             name, result, error = future.result()
             if error:
@@ -30,72 +100,155 @@ def run_queries_parallel(
             else:
                 results[name] = result
     
+    if timings is not None:
+        wall_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info("Parallel load took %.1f ms for %.1f ms of queries (%s)", wall_ms, sum(timings.values()),
+                    ", ".join(f"{name}={ms:.1f}ms" for name, ms in timings.items()))
+    
     if errors and fail_fast:
         raise RuntimeError(f"Query failures:\n" + "\n".join(errors))
     
     return results
 
 
-@st.cache_data(ttl=300)
-def load_dashboard_data(_session, strategy_mode: str, shock_event: str) -> Dict[str, pd.DataFrame]:
-    shock_filter = "IS NULL" if shock_event == "None" else f"= '{shock_event}'"
+def report_load_progress(done: int, total: int) -> None:
+    # Writing session state is a Streamlit yield point: a sidebar change mid-load raises its rerun here.
+    st.session_state[LOAD_PROGRESS_KEY] = (done, total)
+
+
+def load_queries(session, queries: Dict[str, str], max_workers: int = 4, **kwargs) -> Dict[str, pd.DataFrame]:
+    if os.environ.get(ASYNC_LOAD_ENV, '1') != '0':
+        return load_queries_async(session, queries, on_progress=report_load_progress, **kwargs)
+    return run_queries_parallel(session, queries, max_workers=max_workers, pool=pool_for(session), **kwargs)
+
+
+@st.cache_resource
+def get_result_cache(directory: Optional[str] = None) -> ResultCache:
+    return ResultCache(directory) if directory else ResultCache()
+
+
+@tracked_cache_data(ttl=60, show_spinner=False)
+def current_data_version(_session, cache_dir: Optional[str] = None) -> str:
+    version = data_version(_session)
+    get_result_cache(cache_dir).purge_stale(version)
+    return version
+
+
+DASHBOARD_PERFORMANCE_SQL = """
+    SELECT 
+        f.PERFORMANCE_MONTH, f.REGION, f.STRATEGY_MODE,
+        f.OTIF_PCT, f.FILL_RATE_PCT, f.NET_SALES_GROWTH_PCT,
+        f.GROSS_MARGIN_PCT, f.EBITDA_MARGIN_PCT, f.COGS_USD,
+        f.ROCE_PCT, f.FREE_CASH_FLOW_USD, f.CASH_CONVERSION_CYCLE_DAYS,
+        f.CYCLE_STOCK_VALUE, f.SAFETY_STOCK_VALUE, f.PIPELINE_STOCK_VALUE,
+        f.ANTICIPATION_STOCK_VALUE, f.STRATEGIC_STOCK_VALUE, f.TOTAL_INVENTORY_VALUE,
+        f.FORECAST_MAPE_PCT, f.LEAD_TIME_DAYS, f.OEE_PCT,
+        f.NOPAT_USD, f.WORKING_CAPITAL_DELTA_USD, f.FIXED_ASSET_DELTA_USD,
+        f.CAPITAL_EMPLOYED_USD, f.EVA_USD,
+        s.SERVICE_WEIGHT, s.COST_WEIGHT, s.CASH_WEIGHT,
+        s.PERMISSIBLE_RED, s.MANDATORY_GREEN, s.ECONOMIC_BET,
+        s.SCENARIO_ID, s.FCF_DELTA_PCT, s.ROCE_DELTA_PCT,
+        s.SAFETY_STOCK_DELTA_PCT, s.PIPELINE_STOCK_DELTA_PCT, s.LEAD_TIME_DELTA_DAYS
+    FROM STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT f
+    JOIN ATOMIC.SCENARIO_CONTROL s 
+        ON f.STRATEGY_MODE = s.STRATEGY_MODE 
+        AND s.SHOCK_EVENT IS NOT DISTINCT FROM ?
+    WHERE f.STRATEGY_MODE = ?
+    ORDER BY f.PERFORMANCE_MONTH DESC
+"""
+
+CAUSAL_TRACES_SQL = """
+    SELECT * FROM STRATEGY_SIMULATOR.V_CAUSAL_TRACES 
+    ORDER BY CAUSAL_WEIGHT DESC
+"""
+
+BASELINE_SQL = f"""
+    SELECT {', '.join(f'f.{column}' for column in BASELINE_SELECT_COLUMNS)}
+    FROM STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT f
+    JOIN ATOMIC.SCENARIO_CONTROL s 
+        ON f.STRATEGY_MODE = s.STRATEGY_MODE 
+        AND s.SHOCK_EVENT IS NULL
+    WHERE f.STRATEGY_MODE = ?
+    ORDER BY f.PERFORMANCE_MONTH DESC
+"""
+
+
+def shock_bind(shock_event: str) -> Optional[str]:
+    return None if shock_event == "None" else shock_event
+
+
+@tracked_cache_data(ttl=300)
+def load_dashboard_data(_session, strategy_mode: str, shock_event: str,
+                        cache_dir: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    queries = {'performance': DASHBOARD_PERFORMANCE_SQL, 'causal_traces': CAUSAL_TRACES_SQL}
+    params = {'performance': [shock_bind(shock_event), strategy_mode]}
     
+    results = load_queries(_session, queries, max_workers=2, fail_fast=False, params=params,
+                           result_cache=get_result_cache(cache_dir),
+                           cache_version=current_data_version(_session, cache_dir), timings={})
+    if 'performance' in results:
+        results['predictions'] = apply_scenario(results['performance'])
+    return results
+
+
+@tracked_cache_data(ttl=300)
+def load_baseline_data(_session, strategy_mode: str) -> pd.DataFrame:
+    return get_result_cache().fetch(_session, BASELINE_SQL, current_data_version(_session), [strategy_mode])
+
+
+class DashboardStore:
+    def __init__(self, performance: pd.DataFrame, scenarios: pd.DataFrame, causal_traces: pd.DataFrame):
+        self.scenarios = scenarios
+        self.causal_traces = causal_traces
+        self.compaction = compaction_summary({
+            'performance': performance, 'scenarios': scenarios, 'causal_traces': causal_traces
+        })
+        performance = performance.sort_values('PERFORMANCE_MONTH', ascending=False, kind='stable')
+        self._by_mode: Dict[str, pd.DataFrame] = {
+            mode: frame.reset_index(drop=True) for mode, frame in performance.groupby('STRATEGY_MODE', sort=False, observed=True)
+        }
+        self._empty = performance.iloc[:0].reindex(columns=PERFORMANCE_COLUMNS + SCENARIO_COLUMNS)
+        self.query_timings: Dict[str, float] = {}
+
+    def performance(self, strategy_mode: str, shock_event: str) -> pd.DataFrame:
+        scenario = select_scenario(self.scenarios, strategy_mode, shock_event)
+        mode_df = self._by_mode.get(strategy_mode)
+        if scenario is None or mode_df is None:
+            return self._empty.copy()
+        return mode_df.assign(**{column: scenario[column] for column in SCENARIO_COLUMNS})
+
+    def slice(self, strategy_mode: str, shock_event: str) -> Dict[str, pd.DataFrame]:
+        performance = self.performance(strategy_mode, shock_event)
+        return {
+            'performance': performance,
+            'causal_traces': self.causal_traces,
+            'predictions': apply_scenario(performance)
+        }
+
+    def baseline(self, strategy_mode: str) -> pd.DataFrame:
+        return self.performance(strategy_mode, "None")[BASELINE_SELECT_COLUMNS]
+
+
+@st.cache_resource(ttl=300)
+def load_dashboard_store(_session) -> DashboardStore:
     queries = {
         'performance': f"""
-            SELECT 
-                f.PERFORMANCE_MONTH, f.REGION, f.STRATEGY_MODE,
-                f.OTIF_PCT, f.FILL_RATE_PCT, f.NET_SALES_GROWTH_PCT,
-                f.GROSS_MARGIN_PCT, f.EBITDA_MARGIN_PCT, f.COGS_USD,
-                f.ROCE_PCT, f.FREE_CASH_FLOW_USD, f.CASH_CONVERSION_CYCLE_DAYS,
-                f.CYCLE_STOCK_VALUE, f.SAFETY_STOCK_VALUE, f.PIPELINE_STOCK_VALUE,
-                f.ANTICIPATION_STOCK_VALUE, f.STRATEGIC_STOCK_VALUE, f.TOTAL_INVENTORY_VALUE,
-                f.FORECAST_MAPE_PCT, f.LEAD_TIME_DAYS, f.OEE_PCT,
-                f.NOPAT_USD, f.CAPITAL_EMPLOYED_USD, f.EVA_USD,
-                s.SERVICE_WEIGHT, s.COST_WEIGHT, s.CASH_WEIGHT,
-                s.PERMISSIBLE_RED, s.MANDATORY_GREEN, s.ECONOMIC_BET
-            FROM STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT f
-            JOIN ATOMIC.SCENARIO_CONTROL s 
-                ON f.STRATEGY_MODE = s.STRATEGY_MODE 
-                AND s.SHOCK_EVENT {shock_filter}
-            WHERE f.STRATEGY_MODE = '{strategy_mode}'
-            ORDER BY f.PERFORMANCE_MONTH DESC
+            SELECT {', '.join(PERFORMANCE_COLUMNS)}
+            FROM STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT
+            ORDER BY PERFORMANCE_MONTH DESC
         """,
-        'predictions': f"""
-            SELECT 
-                p.PERFORMANCE_MONTH, p.REGION,
-                p.PREDICTED_FCF_USD, p.PREDICTED_ROCE_PCT,
-                p.PREDICTED_SAFETY_STOCK_USD, p.PREDICTED_PIPELINE_STOCK_USD,
-                p.LEAD_TIME_IMPACT_FCF, p.FORECAST_ERROR_IMPACT_SAFETY,
-                p.FCF_LOWER_BOUND, p.FCF_UPPER_BOUND,
-                p.ROCE_LOWER_BOUND, p.ROCE_UPPER_BOUND
-            FROM STRATEGY_SIMULATOR.PREDICTIVE_BRIDGE p
-            JOIN ATOMIC.SCENARIO_CONTROL s ON p.SCENARIO_ID = s.SCENARIO_ID
-            WHERE s.STRATEGY_MODE = '{strategy_mode}'
-            AND s.SHOCK_EVENT {shock_filter}
-            ORDER BY p.PERFORMANCE_MONTH DESC
+        'scenarios': f"""
+            SELECT STRATEGY_MODE, SHOCK_EVENT, {', '.join(SCENARIO_COLUMNS)}
+            FROM ATOMIC.SCENARIO_CONTROL
         """,
-        'causal_traces': """
-            SELECT * FROM STRATEGY_SIMULATOR.V_CAUSAL_TRACES 
-            ORDER BY CAUSAL_WEIGHT DESC
-        """
+        'causal_traces': CAUSAL_TRACES_SQL
     }
     
-    return run_queries_parallel(_session, queries, max_workers=3, fail_fast=False)
-
-
-@st.cache_data(ttl=300)
-def load_baseline_data(_session, strategy_mode: str) -> pd.DataFrame:
-    sql = f"""
-        SELECT 
-            f.PERFORMANCE_MONTH, f.REGION, f.STRATEGY_MODE,
-            f.OTIF_PCT, f.GROSS_MARGIN_PCT, f.ROCE_PCT, f.FREE_CASH_FLOW_USD,
-            f.SAFETY_STOCK_VALUE, f.PIPELINE_STOCK_VALUE, f.TOTAL_INVENTORY_VALUE,
-            f.CAPITAL_EMPLOYED_USD, f.EVA_USD
-        FROM STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT f
-        JOIN ATOMIC.SCENARIO_CONTROL s 
-            ON f.STRATEGY_MODE = s.STRATEGY_MODE 
-            AND s.SHOCK_EVENT IS NULL
-        WHERE f.STRATEGY_MODE = '{strategy_mode}'
-        ORDER BY f.PERFORMANCE_MONTH DESC
-    """
-    return _session.sql(sql).to_pandas()
+    timings: Dict[str, float] = {}
+    results = load_queries(_session, queries, max_workers=3, compact=True,
+                           result_cache=get_result_cache(), cache_version=current_data_version(_session), timings=timings)
+    store = DashboardStore(results['performance'], results['scenarios'], results['causal_traces'])
+    store.query_timings = timings
+    logger.info("Dashboard store compacted %d -> %d bytes (%d saved)", store.compaction['bytes_before'],
+                store.compaction['bytes_after'], store.compaction['bytes_saved'])
+    return store
@@ -0,0 +1,273 @@
+import argparse
+import datetime
+import functools
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+INDEX_VERSION = 2
+DEFAULT_INDEX_PATH = Path(os.environ.get(
+    'CAUSAL_QBR_INDEX', Path(tempfile.gettempdir()) / 'causal_qbr_index.sqlite'
+))
+DEFAULT_SYNC_INTERVAL = 300.0
+DOCUMENT_COLUMNS = ['DOC_ID', 'DOC_NAME', 'DOC_TYPE', 'QUARTER', 'YEAR', 'CONTENT_TEXT']
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or that the their this to was were will with
+""".split())
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+DOCUMENTS_SQL = f"SELECT {', '.join(DOCUMENT_COLUMNS)}, _LOADED_TIMESTAMP FROM RAW.QBR_DOCUMENTS"
+DOCUMENT_IDS_SQL = "SELECT DOC_ID FROM RAW.QBR_DOCUMENTS"
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+def _content_hash(doc: Dict) -> str:
+    return hashlib.sha256(f"{doc.get('DOC_NAME', '')}\n{doc.get('CONTENT_TEXT', '')}".encode('utf-8')).hexdigest()
+
+
+class DocumentIndex:
+    def __init__(self, path: Union[str, Path] = DEFAULT_INDEX_PATH, version: int = INDEX_VERSION,
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.path = Path(path)
+        self.version = version
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if self._meta('version') != str(self.version):
+            # The tokenizer or schema changed; postings built by the old one cannot be mixed with new ones.
+            self._conn.executescript("DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS documents; DELETE FROM meta;")
+            self._set_meta('version', str(self.version))
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                doc_name TEXT,
+                doc_type TEXT,
+                quarter TEXT,
+                year INTEGER,
+                content_text TEXT,
+                content_hash TEXT NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+        """)
+        if self._meta('doc_count') is None:
+            self._write_stats()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _write_stats(self) -> None:
+        # Kept in the file rather than on the instance, so a sync by another process is seen by this one's scoring.
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents").fetchone()
+        self._set_meta('doc_count', str(count))
+        self._set_meta('total_length', str(total))
+
+    def _stats(self) -> Tuple[int, float]:
+        stats = dict(self._conn.execute("SELECT key, value FROM meta WHERE key IN ('doc_count', 'total_length')"))
+        count = int(stats.get('doc_count', 0))
+        return count, int(stats.get('total_length', 0)) / count if count else 0.0
+
+    def add_documents(self, docs: Iterable[Dict]) -> int:
+        changed = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for doc in docs:
+                    doc_id = int(doc['DOC_ID'])
+                    content_hash = _content_hash(doc)
+                    row = self._conn.execute("SELECT content_hash FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+                    if row is not None and row[0] == content_hash:
+                        continue
+                    # The document name is indexed with the body so title-only matches still rank.
+                    terms = Counter(tokenize(f"{doc.get('DOC_NAME', '')} {doc.get('CONTENT_TEXT', '')}"))
+                    self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO documents "
+                        "(doc_id, doc_name, doc_type, quarter, year, content_text, content_hash, length) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (doc_id, doc.get('DOC_NAME'), doc.get('DOC_TYPE'), doc.get('QUARTER'),
+                         _optional_int(doc.get('YEAR')), doc.get('CONTENT_TEXT'), content_hash,
+                         sum(terms.values()))
+                    )
+                    # Document length is repeated on each posting so scoring reads one clustered range per term.
+                    length = sum(terms.values())
+                    self._conn.executemany(
+                        "INSERT INTO postings (term, doc_id, tf, length) VALUES (?, ?, ?, ?)",
+                        [(term, doc_id, tf, length) for term, tf in terms.items()]
+                    )
+                    changed += 1
+                self._write_stats()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    def remove_documents(self, doc_ids: Iterable[int]) -> int:
+        ids = [(int(doc_id),) for doc_id in doc_ids]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("DELETE FROM postings WHERE doc_id = ?", ids)
+                removed = sum(self._conn.execute("DELETE FROM documents WHERE doc_id = ?", doc_id).rowcount
+                              for doc_id in ids)
+                self._write_stats()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def sync(self, session, max_age: float = 0.0) -> int:
+        last_sync = self._meta('last_sync')
+        if max_age and last_sync is not None and time.time() - float(last_sync) < max_age:
+            return 0
+
+        high_water = self._meta('high_water')
+        if high_water is None:
+            df = session.sql(DOCUMENTS_SQL).to_pandas()
+        else:
+            # Rows loaded at the high-water mark are fetched again; unchanged ones are skipped by content hash.
+            df = session.sql(f"{DOCUMENTS_SQL} WHERE _LOADED_TIMESTAMP >= ?",
+                             params=[datetime.datetime.fromisoformat(high_water)]).to_pandas()
+        changed = self.add_documents(df.to_dict('records'))
+
+        current_ids = set(session.sql(DOCUMENT_IDS_SQL).to_pandas()['DOC_ID'].astype(int))
+        with self._lock:
+            indexed_ids = {row[0] for row in self._conn.execute("SELECT doc_id FROM documents")}
+        changed += self.remove_documents(indexed_ids - current_ids)
+
+        loaded = pd.to_datetime(df['_LOADED_TIMESTAMP']).max() if len(df) else None
+        with self._lock:
+            if loaded is not None and not pd.isna(loaded):
+                self._set_meta('high_water', loaded.to_pydatetime().isoformat())
+            self._set_meta('last_sync', str(time.time()))
+        return changed
+
+    def index_frame(self, df: pd.DataFrame) -> int:
+        return self.add_documents(df.to_dict('records'))
+
+    def search(self, query: str, limit: int = 3) -> List[Dict]:
+        terms = set(tokenize(query))
+        with self._lock:
+            doc_count, avg_length = self._stats()
+            if not terms or not doc_count:
+                return []
+            doc_ids, contributions = [], []
+            for term in terms:
+                postings = np.array(self._conn.execute(
+                    "SELECT doc_id, tf, length FROM postings WHERE term = ?", (term,)
+                ).fetchall(), dtype=np.float64).reshape(-1, 3)
+                if not len(postings):
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                tf, length = postings[:, 1], postings[:, 2]
+                norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                doc_ids.append(postings[:, 0].astype(np.int64))
+                contributions.append(idf * tf * (self.k1 + 1) / (tf + norm))
+            if not doc_ids:
+                return []
+
+            scores = pd.Series(np.concatenate(contributions)).groupby(np.concatenate(doc_ids)).sum()
+            top = scores.sort_values(ascending=False, kind='stable').head(limit)
+            results = []
+            for doc_id, score in top.items():
+                name, doc_type, quarter, year, content = self._conn.execute(
+                    "SELECT doc_name, doc_type, quarter, year, content_text FROM documents WHERE doc_id = ?", (int(doc_id),)
+                ).fetchone()
+                results.append({
+                    'DOC_ID': int(doc_id), 'DOC_NAME': name, 'DOC_TYPE': doc_type, 'QUARTER': quarter,
+                    'YEAR': year, 'CONTENT_TEXT': content, 'SCORE': round(float(score), 4)
+                })
+            return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM meta WHERE key != 'version'")
+            self._write_stats()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._stats()[0]
+
+
+@functools.lru_cache(maxsize=None)
+def default_index() -> DocumentIndex:
+    # One connection per process for callers that do not bring their own index.
+    return DocumentIndex()
+
+
+def _optional_int(value) -> Optional[int]:
+    return None if value is None or pd.isna(value) else int(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build, update and query the QBR document index")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH, help="Index file to build or update")
+    parser.add_argument("--csv", type=Path, help="Index documents from a CSV export instead of a session")
+    parser.add_argument("--connection", help="Snowflake connection name from connections.toml")
+    parser.add_argument("--local", nargs="?", const="1", metavar="DATA_DIR",
+                        help="Sync from a local DuckDB session over CSVs (default: data/synthetic)")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the existing index first")
+    parser.add_argument("--query", help="Search the index after syncing it")
+    parser.add_argument("--limit", type=int, default=5, help="Results to show for the query")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = DocumentIndex(args.index)
+    if args.rebuild:
+        index.clear()
+
+    start = time.perf_counter()
+    if args.csv:
+        changed = index.index_frame(pd.read_csv(args.csv))
+    else:
+        from utils.registry_runner import create_session
+        changed = index.sync(create_session(args.connection, args.local))
+    print(f"{changed} documents indexed or removed in {(time.perf_counter() - start) * 1000:.0f} ms; "
+          f"{len(index)} in {args.index}")
+
+    if args.query:
+        for doc in index.search(args.query, args.limit):
+            print(f"{doc['SCORE']:8.3f}  {doc['DOC_NAME']} ({doc['QUARTER']} {doc['YEAR']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
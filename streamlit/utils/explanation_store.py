@@ -0,0 +1,94 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+# Version 2 keys on the rendered prompt, so explanations keyed on the template alone are dropped.
+STORE_VERSION = 2
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_STORE_PATH = Path(os.environ.get(
+    'CAUSAL_EXPLANATION_STORE', Path(tempfile.gettempdir()) / 'causal_explanations.sqlite'
+))
+
+
+logger = logging.getLogger('causal_chain.explanation_store')
+
+
+def explanation_key(prompt: str, model: str) -> str:
+    # The rendered prompt covers the template, the link and every definition filled into it.
+    payload = json.dumps([model, prompt])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ExplanationStore:
+    def __init__(self, path: Union[str, Path] = DEFAULT_STORE_PATH, version: int = STORE_VERSION,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.version = version
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS explanations (
+                key TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_explanations_lru ON explanations (last_accessed)")
+        self.invalidate_stale()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM explanations WHERE key = ? AND version = ?", (key, self.version)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE explanations SET last_accessed = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, response: str) -> bool:
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO explanations (key, version, response, created_at, last_accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, self.version, response, now, now)
+                )
+                self._evict()
+            except sqlite3.Error as e:
+                # The store only saves repeat Cortex calls; a locked or failed write must not lose the response.
+                logger.warning("Failed to store explanation %s: %s", key[:12], e)
+                return False
+        return True
+
+    def invalidate_stale(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM explanations WHERE version != ?", (self.version,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM explanations")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+
+    def _evict(self) -> None:
+        self._conn.execute("""
+            DELETE FROM explanations WHERE key IN (
+                SELECT key FROM explanations ORDER BY last_accessed DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
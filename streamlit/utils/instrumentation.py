@@ -0,0 +1,310 @@
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.theme import TEXT_MUTED, SNOWFLAKE_BLUE, STAR_BLUE, VALENCIA_ORANGE, PURPLE_MOON, FIRST_LIGHT, apply_dark_theme
+
+INSTRUMENTATION_ENV = 'CAUSAL_CHAIN_INSTRUMENT'
+INSTRUMENTATION_LOG_ENV = 'CAUSAL_CHAIN_INSTRUMENT_LOG'
+PROFILE_EXPIRY_SECONDS = 300.0
+DEBUG_PARAM_ENV = 'CAUSAL_CHAIN_ALLOW_DEBUG_PARAM'
+DEBUG_QUERY_PARAM = 'debug'
+CATEGORY_COLORS = {
+    'cache': SNOWFLAKE_BLUE, 'data': STAR_BLUE, 'compute': PURPLE_MOON,
+    'chart': FIRST_LIGHT, 'cortex': VALENCIA_ORANGE
+}
+
+logger = logging.getLogger('causal_chain.instrumentation')
+logger.setLevel(logging.INFO)
+
+_local = threading.local()
+_NULL_SPAN = nullcontext()
+_log_lock = threading.Lock()
+_tracing_lock = threading.Lock()
+_tracing_profiles = 0
+
+
+def instrumentation_enabled() -> bool:
+    if os.environ.get(INSTRUMENTATION_ENV):
+        return True
+    # Profiling slows every session in the process, so viewers can only opt in where the operator allows it.
+    return bool(os.environ.get(DEBUG_PARAM_ENV)) and st.query_params.get(DEBUG_QUERY_PARAM) == '1'
+
+
+def _start_memory_trace() -> int:
+    global _tracing_profiles
+    with _tracing_lock:
+        if _tracing_profiles == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            # Only reset while nobody else is profiling; resetting mid-rerun would wipe another session's peak.
+            tracemalloc.reset_peak()
+        _tracing_profiles += 1
+        return tracemalloc.get_traced_memory()[0]
+
+
+def _stop_memory_trace() -> Tuple[int, int]:
+    global _tracing_profiles
+    with _tracing_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        _tracing_profiles -= 1
+        # tracemalloc slows every allocation in the process, so it only runs while someone is profiling.
+        if _tracing_profiles == 0:
+            tracemalloc.stop()
+        return current, peak
+
+
+class RerunProfile:
+    def __init__(self, session_id: str, rerun: int, fragment: Optional[str] = None):
+        self.session_id = session_id
+        self.rerun = rerun
+        self.fragment = fragment
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.spans: List[Dict] = []
+        self.cache_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.finished = False
+        self._memory_at_start = _start_memory_trace()
+        # A profile that is never finished (a session that disconnects or stops mid-rerun) still releases its
+        # share of tracemalloc, when it is collected or when it expires, whichever comes first.
+        self._release = weakref.finalize(self, _stop_memory_trace)
+        self._expiry = threading.Timer(PROFILE_EXPIRY_SECONDS, self._release)
+        self._expiry.daemon = True
+        self._expiry.start()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    @contextmanager
+    def span(self, name: str, category: str):
+        start = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            end = self.elapsed_ms()
+            with self._lock:
+                self.spans.append({
+                    'name': name, 'category': category, 'start_ms': round(start, 3),
+                    'duration_ms': round(end - start, 3), 'thread': threading.current_thread().name
+                })
+
+    def count_cache(self, name: str, hit: bool) -> None:
+        with self._lock:
+            self.cache_stats[name]['hits' if hit else 'misses'] += 1
+
+    def abandon(self) -> None:
+        self.finished = True
+        self._expiry.cancel()
+        self._release()
+
+    def finish(self) -> Dict:
+        self.finished = True
+        self._expiry.cancel()
+        # tracemalloc is process-wide: both figures include any other sessions running at the same time.
+        current, peak = self._release() or (None, None)
+        return {
+            'session_id': self.session_id,
+            'rerun': self.rerun,
+            'fragment': self.fragment,
+            'started_at': self.started_at.isoformat(),
+            'total_ms': round(self.elapsed_ms(), 3),
+            'process_peak_memory_bytes': peak,
+            'process_memory_delta_bytes': current - self._memory_at_start if current is not None else None,
+            'spans': sorted(self.spans, key=lambda span: span['start_ms']),
+            'cache': {name: dict(stats) for name, stats in self.cache_stats.items()}
+        }
+
+
+def _computed_counts() -> Dict[str, int]:
+    counts = getattr(_local, 'computed', None)
+    if counts is None:
+        counts = _local.computed = defaultdict(int)
+    return counts
+
+
+def active_profile() -> Optional[RerunProfile]:
+    return getattr(_local, 'profile', None)
+
+
+def span(name: str, category: str = 'compute'):
+    profile = active_profile()
+    return profile.span(name, category) if profile is not None else _NULL_SPAN
+
+
+def timed(category: str = 'compute', name: Optional[str] = None):
+    def decorator(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(fn: Callable) -> Callable:
+    # Worker threads have no profile of their own; carry the submitting rerun's profile across.
+    profile = active_profile()
+    if profile is None:
+        return fn
+
+    @functools.wraps(fn)
+    def bound(*args, **kwargs):
+        previous = active_profile()
+        _local.profile = profile
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.profile = previous
+    return bound
+
+
+def tracked_cache_data(**cache_kwargs) -> Callable[[Callable], Callable]:
+    def decorator(fn: Callable) -> Callable:
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _computed_counts()[name] += 1
+            return fn(*args, **kwargs)
+
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = active_profile()
+            if profile is None:
+                return cached(*args, **kwargs)
+            # st.cache_data runs the function on the calling thread, so an unchanged count means a hit.
+            computed = _computed_counts()
+            before = computed[name]
+            with profile.span(name, 'cache'):
+                result = cached(*args, **kwargs)
+            profile.count_cache(name, hit=computed[name] == before)
+            return result
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def in_fragment_rerun() -> bool:
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def begin_rerun_profile(fragment: Optional[str] = None) -> Optional[RerunProfile]:
+    previous = st.session_state.get('_profile_active')
+    if previous is not None:
+        # The last rerun was cut short (st.stop or an exception) before it could finish its profile.
+        previous.abandon()
+        st.session_state._profile_active = None
+    _local.profile = None
+    if not instrumentation_enabled():
+        return None
+
+    if '_profile_session_id' not in st.session_state:
+        st.session_state._profile_session_id = uuid.uuid4().hex
+        st.session_state._profile_reruns = 0
+        st.session_state._profile_cache_totals = {}
+    st.session_state._profile_reruns += 1
+    profile = RerunProfile(st.session_state._profile_session_id, st.session_state._profile_reruns, fragment)
+    st.session_state._profile_active = profile
+    _local.profile = profile
+    return profile
+
+
+def finish_rerun_profile(profile: RerunProfile) -> Dict:
+    _local.profile = None
+    st.session_state._profile_active = None
+    record = profile.finish()
+    totals = st.session_state._profile_cache_totals
+    for name, stats in record['cache'].items():
+        total = totals.setdefault(name, {'hits': 0, 'misses': 0})
+        total['hits'] += stats['hits']
+        total['misses'] += stats['misses']
+    write_record(record)
+    return record
+
+
+def profiled_fragment(fn: Callable) -> Callable:
+    # Fragment reruns skip the top-level script, so the fragment profiles and reports itself instead.
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = begin_rerun_profile(fn.__name__) if in_fragment_rerun() else None
+        if profile is None:
+            return fn(*args, **kwargs)
+        result = fn(*args, **kwargs)
+        render_debug_panel(finish_rerun_profile(profile))
+        return result
+    return wrapper
+
+
+def write_record(record: Dict) -> None:
+    line = json.dumps(record, default=str)
+    logger.info(line)
+    log_path = os.environ.get(INSTRUMENTATION_LOG_ENV)
+    if log_path:
+        with _log_lock, open(log_path, 'a') as f:
+            f.write(line + '\n')
+
+
+def create_waterfall(record: Dict) -> go.Figure:
+    spans = record['spans']
+    if not spans:
+        return go.Figure()
+    labels = [f"{i + 1:02d} {span['name']}" for i, span in enumerate(spans)]
+    fig = go.Figure(go.Bar(
+        y=labels, x=[span['duration_ms'] for span in spans], base=[span['start_ms'] for span in spans],
+        orientation='h',
+        marker_color=[CATEGORY_COLORS.get(span['category'], TEXT_MUTED) for span in spans],
+        customdata=[[span['category'], span['duration_ms'], span['thread']] for span in spans],
+        hovertemplate='%{y}<br>%{customdata[0]} on %{customdata[2]}<br>%{customdata[1]:.1f} ms<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Rerun {record['rerun']} waterfall (ms)", xaxis_title="ms since rerun start",
+        height=120 + 22 * len(spans), yaxis=dict(autorange='reversed'), showlegend=False
+    )
+    return apply_dark_theme(fig)
+
+
+def render_debug_panel(record: Dict) -> None:
+    totals = st.session_state.get('_profile_cache_totals', {})
+    scope = f" ({record['fragment']})" if record.get('fragment') else ""
+    with st.expander(f"Debug: rerun {record['rerun']}{scope} took {record['total_ms']:.0f} ms", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rerun time", f"{record['total_ms']:.0f} ms")
+        if record['process_peak_memory_bytes'] is None:
+            col2.metric("Process peak traced memory", "expired")
+        else:
+            col2.metric("Process peak traced memory", f"{record['process_peak_memory_bytes'] / 1024 ** 2:.1f} MB",
+                        f"{record['process_memory_delta_bytes'] / 1024 ** 2:+.1f} MB this rerun", delta_color='off')
+        hits = sum(stats['hits'] for stats in record['cache'].values())
+        calls = hits + sum(stats['misses'] for stats in record['cache'].values())
+        col3.metric("Cache hits", f"{hits} / {calls}")
+
+        st.plotly_chart(create_waterfall(record), use_container_width=True,
+                        key=f"debug_waterfall_{record.get('fragment') or 'page'}")
+
+        cache_df = pd.DataFrame([
+            {'FUNCTION': name, 'HITS': record['cache'].get(name, {}).get('hits', 0),
+             'MISSES': record['cache'].get(name, {}).get('misses', 0),
+             'SESSION_HITS': total['hits'], 'SESSION_MISSES': total['misses']}
+            for name, total in sorted(totals.items())
+        ])
+        st.dataframe(cache_df, hide_index=True, use_container_width=True)
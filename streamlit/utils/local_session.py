@@ -0,0 +1,256 @@
+import datetime
+import functools
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+SYNTHETIC_DATA_DIR = Path(__file__).resolve().parents[2] / 'data' / 'synthetic'
+LOCAL_SESSION_ENV = 'CAUSAL_CHAIN_LOCAL_DATA'
+SCHEMAS = ['RAW', 'ATOMIC', 'STRATEGY_SIMULATOR']
+
+TABLE_SOURCES = {
+    'STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT': 'fact_performance_snapshot.csv',
+    'STRATEGY_SIMULATOR.PREDICTIVE_BRIDGE': 'predictive_bridge.csv',
+    'ATOMIC.SCENARIO_CONTROL': 'scenario_control.csv',
+    'ATOMIC.DIM_INVENTORY_STRUCTURE': 'dim_inventory_structure.csv',
+    'ATOMIC.CAUSAL_TRACE_DEFINITION': 'causal_trace_definitions.csv',
+    'ATOMIC.ML_MODEL_REGISTRY': 'ml_prediction_registry.csv',
+    'RAW.QBR_DOCUMENTS': 'qbr_documents.csv',
+    'RAW.PERFORMANCE_SNAPSHOT_STAGE': 'fact_performance_snapshot.csv',
+    'RAW.INVENTORY_STRUCTURE_STAGE': 'dim_inventory_structure.csv',
+    'RAW.SCENARIO_CONTROL_STAGE': 'scenario_control.csv',
+    'RAW.PREDICTIVE_BRIDGE_STAGE': 'predictive_bridge.csv',
+    'RAW.ML_MODEL_REGISTRY_STAGE': 'ml_prediction_registry.csv',
+    'RAW.CAUSAL_TRACE_STAGE': 'causal_trace_definitions.csv'
+}
+
+# Audit columns that Snowflake fills with defaults on load; every one is stamped with the CSV mtime.
+AUDIT_COLUMNS = {
+    'STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT': ['REFRESHED_AT'],
+    'STRATEGY_SIMULATOR.PREDICTIVE_BRIDGE': ['GENERATED_AT'],
+    'ATOMIC.SCENARIO_CONTROL': ['CREATED_TIMESTAMP', 'UPDATED_TIMESTAMP'],
+    'ATOMIC.DIM_INVENTORY_STRUCTURE': ['CREATED_TIMESTAMP'],
+    'ATOMIC.CAUSAL_TRACE_DEFINITION': ['CREATED_TIMESTAMP', 'UPDATED_TIMESTAMP'],
+    'ATOMIC.ML_MODEL_REGISTRY': ['CREATED_TIMESTAMP']
+}
+
+VIEWS = {
+    'STRATEGY_SIMULATOR.V_CAUSAL_TRACES': """
+        SELECT c.TRACE_ID, c.SOURCE_METRIC, c.TARGET_METRIC, c.RELATIONSHIP_TYPE,
+               c.CAUSAL_WEIGHT, c.DESCRIPTION, c.EXAMPLE_SCENARIO
+        FROM ATOMIC.CAUSAL_TRACE_DEFINITION c
+        ORDER BY c.CAUSAL_WEIGHT DESC
+    """,
+    'STRATEGY_SIMULATOR.V_PERFORMANCE_SUMMARY': """
+        SELECT f.PERFORMANCE_MONTH, f.REGION, f.STRATEGY_MODE,
+               ROUND(f.OTIF_PCT, 2) AS OTIF_PCT,
+               ROUND(f.GROSS_MARGIN_PCT, 2) AS GROSS_MARGIN_PCT,
+               ROUND(f.ROCE_PCT, 2) AS ROCE_PCT,
+               ROUND(f.FREE_CASH_FLOW_USD, 2) AS FREE_CASH_FLOW_USD,
+               ROUND(f.CYCLE_STOCK_VALUE, 2) AS CYCLE_STOCK_VALUE,
+               ROUND(f.SAFETY_STOCK_VALUE, 2) AS SAFETY_STOCK_VALUE,
+               ROUND(f.PIPELINE_STOCK_VALUE, 2) AS PIPELINE_STOCK_VALUE,
+               ROUND(f.ANTICIPATION_STOCK_VALUE, 2) AS ANTICIPATION_STOCK_VALUE,
+               ROUND(f.STRATEGIC_STOCK_VALUE, 2) AS STRATEGIC_STOCK_VALUE,
+               ROUND(f.TOTAL_INVENTORY_VALUE, 2) AS TOTAL_INVENTORY_VALUE
+        FROM STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT f
+    """
+}
+
+SNOWFLAKE_TRANSLATIONS = [
+    (re.compile(r'\bSNOWFLAKE\.CORTEX\.COMPLETE\s*\(', re.IGNORECASE), 'cortex_complete('),
+    (re.compile(r'\bCAUSAL_CHAIN\.(?=\w+\.)', re.IGNORECASE), ''),
+    (re.compile(r'\b(CURRENT_DATE|CURRENT_TIMESTAMP)\s*\(\s*\)', re.IGNORECASE), r'\1'),
+    (re.compile(r'\bDATEADD\s*\(\s*(\w+)\s*,\s*([-+]?\s*\d+)\s*,\s*([^()]+?)\s*\)', re.IGNORECASE),
+     r'(\3 + INTERVAL (\2) \1)')
+]
+
+
+def translate_sql(sql: str) -> str:
+    for pattern, replacement in SNOWFLAKE_TRANSLATIONS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def cortex_complete_stub(model: str, prompt: str) -> str:
+    digest = hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()[:12]
+    first_line = next((line.strip() for line in prompt.splitlines() if line.strip()), '')
+    return f"**Local {model} stub ({digest})**\n\n{first_line[:200]}"
+
+
+class Row(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self.values())[key]
+        return super().__getitem__(key)
+
+    def as_dict(self) -> Dict:
+        return dict(self)
+
+
+class LocalAsyncJob:
+    def __init__(self, session: 'LocalSession', query: str, params: Optional[Sequence] = None):
+        self.query_id = uuid.uuid4().hex
+        self._cursor = session.cursor()
+        self._done = threading.Event()
+        self._result: Optional[pd.DataFrame] = None
+        self._error: Optional[BaseException] = None
+        # The thread stands in for the warehouse running the query while the caller is free.
+        threading.Thread(target=self._run, args=(query, params), daemon=True, name=f"local-job-{self.query_id[:8]}").start()
+
+    def _run(self, query: str, params: Optional[Sequence]) -> None:
+        try:
+            self._result = _upper_columns(self._cursor.execute(translate_sql(query), params).df())
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done.set()
+            self._cursor.close()
+
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        if not self._done.is_set():
+            self._cursor.interrupt()
+            self._done.wait(timeout=1.0)
+
+    def result(self, result_type: str = 'row'):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        if result_type == 'pandas':
+            return self._result
+        if result_type == 'pandas_batches':
+            return iter([self._result])
+        return [Row(record) for record in self._result.to_dict('records')]
+
+
+class LocalDataFrame:
+    def __init__(self, session: 'LocalSession', query: str, params: Optional[Sequence] = None):
+        self._session = session
+        self.query = query
+        self.params = list(params) if params is not None else None
+
+    def to_pandas(self) -> pd.DataFrame:
+        return self._session.execute(self.query, self.params)
+
+    def to_pandas_batches(self, rows_per_batch: int = 100_000) -> Iterator[pd.DataFrame]:
+        for batch in self._session.execute_arrow(self.query, self.params, rows_per_batch):
+            yield _arrow_to_pandas(batch)
+
+    def collect(self, statement_params: Optional[Dict] = None) -> List[Row]:
+        timeout = (statement_params or {}).get('STATEMENT_TIMEOUT_IN_SECONDS')
+        df = self._session.execute(self.query, self.params, timeout=timeout)
+        return [Row(record) for record in df.to_dict('records')]
+
+    def collect_nowait(self) -> LocalAsyncJob:
+        return LocalAsyncJob(self._session, self.query, self.params)
+
+
+class LocalSession:
+    def __init__(self, data_dir: Union[str, Path] = SYNTHETIC_DATA_DIR, cortex_latency: float = 0.0,
+                 connection: Optional[duckdb.DuckDBPyConnection] = None):
+        self.data_dir = Path(data_dir)
+        self.cortex_latency = cortex_latency
+        if connection is not None:
+            # Pooled sessions open their own connection to an already loaded database.
+            self._con = connection.cursor()
+            return
+        self._con = duckdb.connect(database=':memory:')
+        self._con.create_function('cortex_complete', self._cortex_complete, ['VARCHAR', 'VARCHAR'], 'VARCHAR')
+        self._con.execute("CREATE MACRO TO_VARCHAR(x) AS CAST(x AS VARCHAR)")
+        self._load()
+
+    def _load(self) -> None:
+        for schema in SCHEMAS:
+            self._con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+
+        for table, filename in TABLE_SOURCES.items():
+            path = self.data_dir / filename
+            loaded_at = datetime.datetime.fromtimestamp(path.stat().st_mtime).replace(microsecond=0)
+            audit = AUDIT_COLUMNS.get(table, ['_LOADED_TIMESTAMP'] if table.startswith('RAW.') else [])
+            audit_sql = ''.join(f", TIMESTAMP '{loaded_at}' AS {column}" for column in audit)
+            self._con.execute(
+                f"CREATE OR REPLACE TABLE {table} AS SELECT *{audit_sql} FROM read_csv_auto(?, header=true)",
+                [str(path)]
+            )
+
+        for view, body in VIEWS.items():
+            self._con.execute(f"CREATE OR REPLACE VIEW {view} AS {body}")
+
+    def _cortex_complete(self, model: str, prompt: str) -> str:
+        if self.cortex_latency:
+            time.sleep(self.cortex_latency)
+        return cortex_complete_stub(model, prompt)
+
+    def sql(self, query: str, params: Optional[Sequence] = None) -> LocalDataFrame:
+        return LocalDataFrame(self, query, params)
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        return self._con.cursor()
+
+    def execute(self, query: str, params: Optional[Sequence] = None, timeout: Optional[float] = None) -> pd.DataFrame:
+        # DuckDB connections are not thread-safe; every statement gets its own cursor.
+        cursor = self._con.cursor()
+        # Stands in for STATEMENT_TIMEOUT_IN_SECONDS; a statement still running at the deadline is interrupted.
+        timer = threading.Timer(timeout, cursor.interrupt) if timeout else None
+        try:
+            if timer is not None:
+                timer.start()
+            return _upper_columns(cursor.execute(translate_sql(query), params).df())
+        finally:
+            if timer is not None:
+                timer.cancel()
+            cursor.close()
+
+    def execute_arrow(self, query: str, params: Optional[Sequence], rows_per_batch: int) -> Iterator[pa.RecordBatch]:
+        cursor = self._con.cursor()
+        try:
+            yield from cursor.execute(translate_sql(query), params).fetch_record_batch(rows_per_batch)
+        finally:
+            cursor.close()
+
+    def session_factory(self) -> Callable[[], 'LocalSession']:
+        # A partial rather than a bound method, so pooled sessions never keep this one alive.
+        return functools.partial(LocalSession, self.data_dir, self.cortex_latency, self._con)
+
+    def close(self) -> None:
+        self._con.close()
+
+
+def create_local_session(data_dir: Optional[str] = None) -> LocalSession:
+    return LocalSession(SYNTHETIC_DATA_DIR if data_dir in (None, '', '1') else data_dir)
+
+
+def local_session_from_env() -> Optional[LocalSession]:
+    data_dir = os.environ.get(LOCAL_SESSION_ENV)
+    return create_local_session(data_dir) if data_dir else None
+
+
+def _arrow_to_pandas(batch: pa.RecordBatch) -> pd.DataFrame:
+    # DuckDB's .df() returns DATE columns as datetime64[us]; Arrow batches are cast the same way so the
+    # batched and whole-frame fetches give identical dtypes.
+    schema = pa.schema([
+        field.with_type(pa.timestamp('us')) if pa.types.is_date(field.type) else field for field in batch.schema
+    ])
+    return _upper_columns(batch.cast(schema).to_pandas())
+
+
+def _upper_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [str(column).upper() for column in df.columns]
+    return df
@@ -0,0 +1,135 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Mapping, Optional
+import numpy as np
+import pandas as pd
+
+COST_OF_CAPITAL = 0.10
+NOPAT_NOISE_PCT = 0.02
+DEFAULT_CHUNK_PATHS = 8192
+RANDOM_SEED = 42
+QUANTILES = (5, 50, 95)
+
+SHOCK_DELTA_COLUMNS = ['FCF_DELTA_PCT', 'ROCE_DELTA_PCT', 'SAFETY_STOCK_DELTA_PCT', 'PIPELINE_STOCK_DELTA_PCT']
+
+DEFAULT_DELTA_SPREAD = {
+    'FCF_DELTA_PCT': 4.0,
+    'ROCE_DELTA_PCT': 1.5,
+    'SAFETY_STOCK_DELTA_PCT': 8.0,
+    'PIPELINE_STOCK_DELTA_PCT': 8.0
+}
+
+GRID_COLUMNS = {
+    'nopat': 'NOPAT_USD',
+    'fcf': 'FREE_CASH_FLOW_USD',
+    'wc_delta': 'WORKING_CAPITAL_DELTA_USD',
+    'fa_delta': 'FIXED_ASSET_DELTA_USD',
+    'capital': 'CAPITAL_EMPLOYED_USD',
+    'safety': 'SAFETY_STOCK_VALUE',
+    'pipeline': 'PIPELINE_STOCK_VALUE',
+    'roce': 'ROCE_PCT'
+}
+
+
+def baseline_grids(baseline_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    cells = baseline_df.groupby(['PERFORMANCE_MONTH', 'REGION'], observed=True)[list(GRID_COLUMNS.values())].sum()
+    cells = cells.unstack('REGION', fill_value=0).sort_index()
+    grid = {key: cells[column].to_numpy(dtype=float) for key, column in GRID_COLUMNS.items()}
+
+    # Every identity is linear in the per-path shock deltas, so regions are reduced up front.
+    # Independent per-region NOPAT noise sums to a single normal with the pooled sigma.
+    return {
+        'months': cells.index.to_numpy(),
+        'nopat': grid['nopat'].sum(axis=1),
+        'nopat_sigma': NOPAT_NOISE_PCT * np.sqrt((grid['nopat'] ** 2).sum(axis=1)),
+        'fcf': grid['fcf'].sum(axis=1),
+        'outflow': (grid['wc_delta'] + grid['fa_delta']).sum(axis=1),
+        'capital': grid['capital'].sum(axis=1),
+        'safety': grid['safety'].sum(axis=1),
+        'pipeline': grid['pipeline'].sum(axis=1),
+        'roce_capital': (grid['roce'] * grid['capital']).sum(axis=1)
+    }
+
+
+def simulate_shock_bands(baseline_df: pd.DataFrame, scenario: Mapping, n_paths: int = 100_000,
+                         spread: Optional[Mapping[str, float]] = None, chunk_paths: int = DEFAULT_CHUNK_PATHS,
+                         workers: int = 1, seed: int = RANDOM_SEED) -> pd.DataFrame:
+    grids = baseline_grids(baseline_df)
+    mean = np.array([float(scenario.get(column, 0) or 0) for column in SHOCK_DELTA_COLUMNS])
+    spread = {**DEFAULT_DELTA_SPREAD, **(spread or {})}
+    scale = np.array([spread[column] for column in SHOCK_DELTA_COLUMNS])
+
+    paths = simulate_paths(grids, mean, scale, n_paths, chunk_paths, workers, seed)
+
+    bands = {'PERFORMANCE_MONTH': grids['months']}
+    for metric, values in paths.items():
+        for q, band in zip(QUANTILES, np.percentile(values, QUANTILES, axis=1)):
+            bands[f'{metric}_P{q}'] = band
+    return pd.DataFrame(bands)
+
+
+def simulate_paths(grids: Dict[str, np.ndarray], mean: np.ndarray, scale: np.ndarray, n_paths: int,
+                   chunk_paths: int = DEFAULT_CHUNK_PATHS, workers: int = 1,
+                   seed: int = RANDOM_SEED) -> Dict[str, np.ndarray]:
+    # Outputs are (months, paths) so the percentile pass runs over contiguous rows.
+    n_months = len(grids['months'])
+    out = {metric: np.empty((n_months, n_paths)) for metric in ('FCF', 'ROCE', 'EVA')}
+    starts = range(0, n_paths, chunk_paths)
+    sizes = [min(chunk_paths, n_paths - start) for start in starts]
+    # One child seed per chunk keeps results identical for any worker count.
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(partial(_simulate_chunk, grids, mean, scale), sizes, seeds)
+            for start, chunk in zip(starts, chunks):
+                for metric, values in chunk.items():
+                    out[metric][:, start:start + len(values)] = values.T
+        return out
+
+    work = np.empty((min(chunk_paths, n_paths), n_months))
+    for start, size, chunk_seed in zip(starts, sizes, seeds):
+        rows = slice(start, start + size)
+        chunk_out = {metric: values[:, rows].T for metric, values in out.items()}
+        _simulate_into(grids, mean, scale, chunk_seed, chunk_out, work[:size])
+    return out
+
+
+def _simulate_chunk(grids, mean, scale, size, chunk_seed):
+    n_months = len(grids['months'])
+    chunk_out = {metric: np.empty((size, n_months)) for metric in ('FCF', 'ROCE', 'EVA')}
+    _simulate_into(grids, mean, scale, chunk_seed, chunk_out, np.empty((size, n_months)))
+    return chunk_out
+
+
+def _simulate_into(grids, mean, scale, chunk_seed, out, work):
+    size = len(work)
+    rng = np.random.default_rng(chunk_seed)
+    deltas = rng.normal(mean, scale, (size, len(mean)))
+    fcf_d = deltas[:, 0, None] / 100
+    roce_d = deltas[:, 1, None]
+    safety_d = deltas[:, 2, None] / 100
+    pipeline_d = deltas[:, 3, None] / 100
+    nopat, capital = out['FCF'], out['ROCE']
+
+    # NOPAT' = NOPAT + noise + FCF * fcf_delta
+    rng.standard_normal(out=work)
+    np.multiply(work, grids['nopat_sigma'], out=nopat)
+    nopat += grids['nopat']
+    np.multiply(fcf_d, grids['fcf'], out=work)
+    nopat += work
+
+    # CE' = CE + safety * safety_delta + pipeline * pipeline_delta
+    np.multiply(safety_d, grids['safety'], out=capital)
+    capital += grids['capital']
+    np.multiply(pipeline_d, grids['pipeline'], out=work)
+    capital += work
+
+    # EVA = NOPAT' - 10% * CE', FCF = NOPAT' - dWC - dFA
+    np.multiply(capital, -COST_OF_CAPITAL, out=out['EVA'])
+    out['EVA'] += nopat
+    nopat -= grids['outflow']
+    # Capital-weighted ROCE = sum((ROCE + roce_delta) * CE) / sum(CE')
+    np.multiply(roce_d, grids['capital'], out=work)
+    work += grids['roce_capital']
+    np.divide(work, capital, out=capital)
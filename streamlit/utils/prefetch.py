@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Hashable, Optional
+
+
+class Prefetcher:
+    def __init__(self, max_workers: int = 4, timeout: float = 60.0, retries: int = 2, backoff: float = 1.0,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        # A shared executor bounds prefetch threads across every session; a private one is owned and shut down here.
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._futures: Dict[Hashable, object] = {}
+        self._started: Dict[Hashable, float] = {}
+        self._cancelled: Dict[Hashable, threading.Event] = {}
+        self._timed_out: set = set()
+        self.completed = 0
+        self.failed: Dict[Hashable, str] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._futures)
+
+    @property
+    def total(self) -> int:
+        return self.completed + len(self.failed) + self.pending
+
+    def is_pending(self, key: Hashable) -> bool:
+        return key in self._futures
+
+    def submit(self, key: Hashable, fn: Callable[..., Dict], *args) -> None:
+        if key in self._futures or (key in self.failed and key not in self._timed_out):
+            return
+        # A timeout may be transient, so a timed-out key is tried again the next time it is submitted.
+        self.failed.pop(key, None)
+        self._timed_out.discard(key)
+        cancelled = self._cancelled[key] = threading.Event()
+        self._futures[key] = self._executor.submit(self._run, key, fn, args, cancelled)
+
+    def drain(self, wait_seconds: float = 0) -> Dict[Hashable, Dict]:
+        if self._futures and wait_seconds > 0:
+            wait(self._futures.values(), timeout=wait_seconds, return_when=FIRST_COMPLETED)
+
+        results: Dict[Hashable, Dict] = {}
+        now = time.monotonic()
+        for key, future in list(self._futures.items()):
+            if future.done():
+                results[key] = future.result()
+            elif self._expired(key, now):
+                # A running future cannot be cancelled; the flag stops the worker before its next attempt.
+                future.cancel()
+                self._cancelled[key].set()
+                self._timed_out.add(key)
+                results[key] = {"success": False, "error": f"Timed out after {self.timeout:g}s"}
+            else:
+                continue
+            del self._futures[key]
+            self._started.pop(key, None)
+            self._cancelled.pop(key, None)
+
+        for key, result in results.items():
+            if result.get("success"):
+                self.completed += 1
+            else:
+                self.failed[key] = result.get("error", "Unknown error")
+        return results
+
+    def shutdown(self) -> None:
+        for key, future in self._futures.items():
+            future.cancel()
+            self._cancelled[key].set()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._futures.clear()
+        self._cancelled.clear()
+
+    def _expired(self, key: Hashable, now: float) -> bool:
+        started = self._started.get(key)
+        return started is not None and now - started > self.timeout
+
+    def _run(self, key: Hashable, fn: Callable[..., Dict], args, cancelled: threading.Event) -> Dict:
+        result: Dict = {"success": False, "error": "Cancelled"}
+        for attempt in range(self.retries + 1):
+            # A timed-out run may still be here after the key was resubmitted; it must not touch the new run's clock.
+            if cancelled.is_set() or self._cancelled.get(key) is not cancelled:
+                break
+            # The timeout applies per attempt, so the clock restarts on every retry.
+            self._started[key] = time.monotonic()
+            try:
+                result = fn(*args)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            if result.get("success") or attempt == self.retries or cancelled.is_set():
+                break
+            self._started.pop(key, None)
+            if cancelled.wait(self.backoff * 2 ** attempt):
+                break
+        return result
@@ -1,15 +1,77 @@
-from typing import Dict, List, Tuple
-from snowflake.snowpark import Session
+import argparse
+import datetime
+import re
+import sys
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+from utils.result_cache import CLOCK_FUNCTIONS, ResultCache
+
+if TYPE_CHECKING:
+    from snowflake.snowpark import Session
 
 _QUERY_REGISTRY: Dict[str, Tuple[str, str]] = {}
+_PARAMETERIZED_REGISTRY: Dict[str, Tuple[str, Tuple[str, ...], str]] = {}
+
+# Functions whose value changes between runs; any of them makes the query text ineligible for result reuse.
+RANDOM_FUNCTIONS = ['RANDOM', 'RANDSTR', 'UUID_STRING', 'NORMAL', 'UNIFORM', 'ZIPF', 'SEQ1', 'SEQ2', 'SEQ4', 'SEQ8']
+NONDETERMINISTIC_FUNCTIONS = CLOCK_FUNCTIONS + RANDOM_FUNCTIONS
+# Clock functions may be written without parentheses; the rest only count when called, not as column names.
+_NONDETERMINISTIC = re.compile(
+    r'\b(' + '|'.join(CLOCK_FUNCTIONS) + r')\b|\b(' + '|'.join(RANDOM_FUNCTIONS) + r')\s*\(', re.IGNORECASE
+)
+_LITERAL_OR_COMMENT = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+_BIND = re.compile(r'\?')
 
 def register_query(name: str, sql: str, description: str = "") -> str:
     _QUERY_REGISTRY[name] = (sql, description)
     return sql
 
+def register_parameterized_query(name: str, sql: str, params: Sequence[str], description: str = "") -> str:
+    binds = len(_BIND.findall(_LITERAL_OR_COMMENT.sub('', sql)))
+    if binds != len(params):
+        raise ValueError(f"Query '{name}' has {binds} bind variables but {len(params)} parameter names")
+    _PARAMETERIZED_REGISTRY[name] = (sql, tuple(params), description)
+    return sql
+
 def get_all_queries() -> Dict[str, Tuple[str, str]]:
     return _QUERY_REGISTRY.copy()
 
+def get_parameterized_queries() -> Dict[str, Tuple[str, Tuple[str, ...], str]]:
+    return _PARAMETERIZED_REGISTRY.copy()
+
+def bind_values(name: str, as_of: Optional[datetime.date] = None, **values) -> List:
+    values['as_of'] = (as_of or datetime.date.today()).isoformat()
+    params = _PARAMETERIZED_REGISTRY[name][1]
+    missing = [param for param in params if param not in values]
+    if missing:
+        raise KeyError(f"Query '{name}' needs values for {missing}")
+    return [values[param] for param in params]
+
+def run_registered_query(session: 'Session', name: str, result_cache: Optional[ResultCache] = None,
+                         data_version: Optional[str] = None) -> pd.DataFrame:
+    sql = _QUERY_REGISTRY[name][0]
+    if result_cache is None or data_version is None:
+        return session.sql(sql).to_pandas()
+    return result_cache.fetch(session, sql, data_version)
+
+def run_parameterized_query(session: 'Session', name: str, result_cache: Optional[ResultCache] = None,
+                            data_version: Optional[str] = None, as_of: Optional[datetime.date] = None,
+                            **values) -> pd.DataFrame:
+    sql = _PARAMETERIZED_REGISTRY[name][0]
+    params = bind_values(name, as_of, **values)
+    if result_cache is None or data_version is None:
+        return session.sql(sql, params=params).to_pandas()
+    return result_cache.fetch(session, sql, data_version, params)
+
+def find_nondeterministic(sql: str) -> List[str]:
+    stripped = _LITERAL_OR_COMMENT.sub('', sql)
+    return sorted({(match.group(1) or match.group(2)).upper() for match in _NONDETERMINISTIC.finditer(stripped)})
+
+def check_registry() -> Dict[str, List[str]]:
+    queries = {name: sql for name, (sql, _) in _QUERY_REGISTRY.items()}
+    queries.update({f"{name} (parameterized)": sql for name, (sql, _, _) in _PARAMETERIZED_REGISTRY.items()})
+    return {name: found for name, sql in queries.items() if (found := find_nondeterministic(sql))}
+
 PERFORMANCE_SNAPSHOT_SQL = register_query(
     "performance_snapshot",
     """
@@ -138,3 +200,64 @@ PIPELINE_VS_ROCE_SQL = register_query(
     """,
     "Pipeline stock vs ROCE trend (Golden Query)"
 )
+
+register_parameterized_query(
+    "latest_metrics",
+    LATEST_METRICS_SQL.replace("DATEADD(MONTH, -3, CURRENT_DATE())", "DATEADD(MONTH, -3, ?::DATE)"),
+    ['as_of'],
+    "Latest 3-month performance metrics as of a bound date"
+)
+
+register_parameterized_query(
+    "triangle_metrics",
+    TRIANGLE_METRICS_SQL.replace("DATEADD(MONTH, -1, CURRENT_DATE())", "DATEADD(MONTH, -1, ?::DATE)"),
+    ['as_of'],
+    "Triangle trade-off metrics by strategy as of a bound date"
+)
+
+register_parameterized_query(
+    "predictions",
+    """
+    SELECT 
+        p.PERFORMANCE_MONTH,
+        p.REGION,
+        s.STRATEGY_MODE,
+        s.SHOCK_EVENT,
+        ROUND(p.PREDICTED_FCF_USD / 1000000, 2) as PRED_FCF_M,
+        ROUND(p.PREDICTED_ROCE_PCT, 2) as PRED_ROCE,
+        ROUND(p.PREDICTED_SAFETY_STOCK_USD / 1000000, 2) as PRED_SAFETY_M
+    FROM STRATEGY_SIMULATOR.PREDICTIVE_BRIDGE p
+    JOIN ATOMIC.SCENARIO_CONTROL s ON p.SCENARIO_ID = s.SCENARIO_ID
+    WHERE p.PERFORMANCE_MONTH >= DATEADD(MONTH, -6, ?::DATE)
+        AND s.STRATEGY_MODE = ?
+        AND s.SHOCK_EVENT IS NOT DISTINCT FROM ?
+    ORDER BY p.PERFORMANCE_MONTH DESC
+    """,
+    ['as_of', 'strategy_mode', 'shock_event'],
+    "ML predictions for one strategy and shock as of a bound date"
+)
+
+register_parameterized_query(
+    "pipeline_vs_roce",
+    PIPELINE_VS_ROCE_SQL.replace("DATEADD(YEAR, -1, CURRENT_DATE())", "DATEADD(YEAR, -1, ?::DATE)"),
+    ['as_of'],
+    "Pipeline stock vs ROCE trend as of a bound date (Golden Query)"
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag non-deterministic functions in the registered queries")
+    parser.parse_args(argv)
+    findings = check_registry()
+    for name, functions in sorted(findings.items()):
+        superseded = name in _PARAMETERIZED_REGISTRY
+        print(f"{name}: {', '.join(functions)}" + (" (superseded by its parameterized version)" if superseded else ""))
+    # Plain queries are allowed to stay as long as a parameterized replacement exists.
+    blocking = [name for name in findings if name not in _PARAMETERIZED_REGISTRY]
+    if not findings:
+        print("No non-deterministic functions in the registered queries")
+    return 1 if blocking else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import argparse
+import csv
+import datetime
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+import pandas as pd
+from utils.query_registry import bind_values, get_all_queries, get_parameterized_queries
+
+REPORT_FIELDS = [
+    'NAME', 'STATUS', 'ELAPSED_MS', 'ROWS', 'BYTES_SCANNED', 'BYTES_SENT_OVER_THE_NETWORK', 'RESULT_FRAME_BYTES',
+    'QUERY_ID', 'DESCRIPTION', 'ERROR'
+]
+QUERY_STATS_FIELDS = ['BYTES_SCANNED', 'BYTES_SENT_OVER_THE_NETWORK']
+DEFAULT_REGRESSION_RATIO = 1.5
+DEFAULT_MIN_DELTA_MS = 50
+
+
+def execute_profiled(session, name: str, sql: str, description: str = "", params: Optional[Sequence] = None) -> Dict:
+    record = {field: None for field in REPORT_FIELDS}
+    record.update(NAME=name, DESCRIPTION=description)
+    start = time.perf_counter()
+    try:
+        df = session.sql(sql, params=params) if params else session.sql(sql)
+        if hasattr(df, 'collect_nowait'):
+            job = df.collect_nowait()
+            record['QUERY_ID'] = job.query_id
+            result = job.result(result_type="pandas")
+        else:
+            result = df.to_pandas()
+        record['STATUS'] = 'OK'
+        record['ROWS'] = len(result)
+        # In-memory pandas size; what Snowflake scanned and shipped comes from query history.
+        record['RESULT_FRAME_BYTES'] = int(result.memory_usage(deep=True).sum())
+    except Exception as e:
+        record['STATUS'] = 'ERROR'
+        record['ERROR'] = str(e)
+    record['ELAPSED_MS'] = round((time.perf_counter() - start) * 1000, 1)
+    return record
+
+
+def run_registry(session, names: Optional[Iterable[str]] = None, max_workers: int = 4,
+                 parameterized: bool = False, as_of: Optional[datetime.date] = None, **values) -> List[Dict]:
+    registry = get_parameterized_queries() if parameterized else get_all_queries()
+    selected = list(names) if names else list(registry)
+    unknown = [name for name in selected if name not in registry]
+    if unknown:
+        raise KeyError(f"Unknown registered queries: {unknown}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(execute_profiled, session, name, registry[name][0], registry[name][-1],
+                            bind_values(name, as_of, **values) if parameterized else None)
+            for name in selected
+        ]
+        records = [future.result() for future in futures]
+    attach_query_stats(session, records)
+    return records
+
+
+def attach_query_stats(session, records: List[Dict]) -> None:
+    query_ids = [record['QUERY_ID'] for record in records if record['QUERY_ID']]
+    if not query_ids:
+        return
+    try:
+        stats = session.sql(
+            f"""
+            SELECT QUERY_ID, {', '.join(QUERY_STATS_FIELDS)}
+            FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 10000))
+            WHERE QUERY_ID IN ({', '.join('?' for _ in query_ids)})
+            """,
+            params=query_ids
+        ).to_pandas().set_index('QUERY_ID')
+    except Exception as e:
+        # Local sessions have no query history; the byte columns stay empty there.
+        print(f"Query history unavailable, transfer sizes not recorded: {str(e).splitlines()[0]}", file=sys.stderr)
+        return
+    for record in records:
+        if record['QUERY_ID'] in stats.index:
+            for field in QUERY_STATS_FIELDS:
+                value = stats.at[record['QUERY_ID'], field]
+                record[field] = None if pd.isna(value) else int(value)
+
+
+def write_report(records: List[Dict], path: Path) -> None:
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        path.write_text(json.dumps(records, indent=2, default=str))
+
+
+def read_report(path: Path) -> List[Dict]:
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        return pd.read_csv(path).to_dict('records')
+    return json.loads(path.read_text())
+
+
+def compare_reports(current: List[Dict], baseline: List[Dict], ratio: float = DEFAULT_REGRESSION_RATIO,
+                    min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> pd.DataFrame:
+    merged = pd.DataFrame(current)[['NAME', 'STATUS', 'ELAPSED_MS', 'ROWS']].merge(
+        pd.DataFrame(baseline)[['NAME', 'ELAPSED_MS', 'ROWS']],
+        on='NAME', how='left', suffixes=('', '_BASELINE')
+    )
+    merged['RATIO'] = merged['ELAPSED_MS'] / merged['ELAPSED_MS_BASELINE']
+    merged['REGRESSED'] = (
+        (merged['STATUS'] != 'OK')
+        | ((merged['RATIO'] > ratio) & (merged['ELAPSED_MS'] - merged['ELAPSED_MS_BASELINE'] > min_delta_ms))
+    )
+    return merged.sort_values('RATIO', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def create_session(connection_name: Optional[str] = None, local_data: Optional[str] = None):
+    if local_data:
+        from utils.local_session import create_local_session
+        return create_local_session(local_data)
+    from snowflake.snowpark import Session
+    builder = Session.builder
+    if connection_name:
+        builder = builder.config("connection_name", connection_name)
+    return builder.getOrCreate()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run and profile the registered dashboard queries")
+    parser.add_argument("--queries", nargs="*", help="Registered query names to run (default: all)")
+    parser.add_argument("--workers", type=int, default=4, help="Queries to run concurrently")
+    parser.add_argument("--connection", help="Snowflake connection name from connections.toml")
+    parser.add_argument("--local", nargs="?", const="1", metavar="DATA_DIR",
+                        help="Run against a local DuckDB session over CSVs (default: data/synthetic)")
+    parser.add_argument("--parameterized", action="store_true",
+                        help="Run the parameterized versions with bind variables instead")
+    parser.add_argument("--as-of", type=datetime.date.fromisoformat, help="As-of date to bind (default: today)")
+    parser.add_argument("--strategy", default="GROWTH", help="Strategy mode to bind")
+    parser.add_argument("--shock", help="Shock event to bind (default: baseline, no shock)")
+    parser.add_argument("--output", type=Path, help="Write the report to this .json or .csv file")
+    parser.add_argument("--baseline", type=Path, help="Previous report to compare latencies against")
+    parser.add_argument("--ratio", type=float, default=DEFAULT_REGRESSION_RATIO,
+                        help="Slowdown ratio that counts as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    records = run_registry(create_session(args.connection, args.local), args.queries, args.workers,
+                           args.parameterized, args.as_of, strategy_mode=args.strategy, shock_event=args.shock)
+
+    if args.output:
+        write_report(records, args.output)
+        print(f"Report written to {args.output}")
+
+    report = pd.DataFrame(records)[
+        ['NAME', 'STATUS', 'ELAPSED_MS', 'ROWS', 'BYTES_SCANNED', 'BYTES_SENT_OVER_THE_NETWORK', 'RESULT_FRAME_BYTES',
+         'QUERY_ID']
+    ]
+    print(report.to_string(index=False))
+
+    failed = bool((report['STATUS'] != 'OK').any())
+    if args.baseline:
+        comparison = compare_reports(records, read_report(args.baseline), args.ratio)
+        print()
+        print(comparison[['NAME', 'ELAPSED_MS_BASELINE', 'ELAPSED_MS', 'RATIO', 'REGRESSED']].to_string(index=False))
+        failed = failed or bool(comparison['REGRESSED'].any())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import datetime
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence, Union
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    'QUERY_RESULT_CACHE_DIR', Path(tempfile.gettempdir()) / 'causal_chain_results'
+))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+logger = logging.getLogger('causal_chain.result_cache')
+
+DATA_VERSION_SOURCES = [
+    ('RAW.PERFORMANCE_SNAPSHOT_STAGE', '_LOADED_TIMESTAMP'),
+    ('RAW.INVENTORY_STRUCTURE_STAGE', '_LOADED_TIMESTAMP'),
+    ('RAW.SCENARIO_CONTROL_STAGE', '_LOADED_TIMESTAMP'),
+    ('RAW.PREDICTIVE_BRIDGE_STAGE', '_LOADED_TIMESTAMP'),
+    ('RAW.ML_MODEL_REGISTRY_STAGE', '_LOADED_TIMESTAMP'),
+    ('RAW.CAUSAL_TRACE_STAGE', '_LOADED_TIMESTAMP'),
+    ('RAW.QBR_DOCUMENTS', '_LOADED_TIMESTAMP'),
+    ('STRATEGY_SIMULATOR.FACT_PERFORMANCE_SNAPSHOT', 'REFRESHED_AT'),
+    ('ATOMIC.SCENARIO_CONTROL', 'COALESCE(UPDATED_TIMESTAMP, CREATED_TIMESTAMP)'),
+    ('ATOMIC.CAUSAL_TRACE_DEFINITION', 'COALESCE(UPDATED_TIMESTAMP, CREATED_TIMESTAMP)')
+]
+
+DATA_VERSION_SQL = "SELECT TO_VARCHAR(MAX(TS)) AS DATA_VERSION FROM (\n" + "\n    UNION ALL\n".join(
+    f"    SELECT MAX({column}) AS TS FROM {table}" for table, column in DATA_VERSION_SOURCES
+) + "\n)"
+
+CLOCK_FUNCTIONS = ['CURRENT_DATE', 'CURRENT_TIME', 'CURRENT_TIMESTAMP', 'LOCALTIME', 'LOCALTIMESTAMP',
+                   'SYSDATE', 'SYSTIMESTAMP', 'GETDATE']
+# Results of queries that read the clock are only reusable for the day they were computed.
+_CLOCK_FUNCTIONS = re.compile(r'\b(' + '|'.join(CLOCK_FUNCTIONS) + r')\b', re.IGNORECASE)
+_LITERAL_OR_SPACE = re.compile(r"('(?:[^']|'')*')|\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    normalized = _LITERAL_OR_SPACE.sub(lambda m: m.group(1) or ' ', sql).strip()
+    return normalized.rstrip(';').strip()
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def result_key(sql: str, data_version: str, params: Optional[Sequence] = None, compact: bool = False) -> str:
+    normalized = normalize_sql(sql)
+    if _CLOCK_FUNCTIONS.search(normalized):
+        normalized += f"\n-- as of {datetime.date.today().isoformat()}"
+    if params:
+        normalized += f"\n-- binds {[str(value) if value is not None else None for value in params]!r}"
+    # Compacted frames carry float32 and categorical dtypes, so they are never served to the plain path.
+    normalized += f"\n-- {'compact' if compact else 'plain'}"
+    return f"{_digest(data_version)[:16]}-{_digest(normalized)}"
+
+
+class ResultCache:
+    def __init__(self, directory: Union[str, Path] = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, sql: str, data_version: str, params: Optional[Sequence] = None, compact: bool = False) -> Path:
+        return self.directory / f"{result_key(sql, data_version, params, compact)}.parquet"
+
+    def get(self, sql: str, data_version: str, params: Optional[Sequence] = None,
+            compact: bool = False) -> Optional[pd.DataFrame]:
+        path = self._path(sql, data_version, params, compact)
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)
+        except (FileNotFoundError, OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return df
+
+    def put(self, sql: str, data_version: str, df: pd.DataFrame, params: Optional[Sequence] = None,
+            compact: bool = False) -> bool:
+        path = self._path(sql, data_version, params, compact)
+        # Sessions are threads of one process, so the temp name has to be unique per writer, not per pid.
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_name, index=False)
+            # Readers only ever see complete files.
+            os.replace(tmp_name, path)
+            self.evict()
+        except Exception as e:
+            # The cache is an optimisation; a failed write must not fail the query that produced the frame.
+            logger.warning("Failed to cache result %s: %s", path.name, e)
+            return False
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+        return True
+
+    def fetch(self, session, sql: str, data_version: str, params: Optional[Sequence] = None) -> pd.DataFrame:
+        df = self.get(sql, data_version, params)
+        if df is None:
+            df = session.sql(sql, params=params).to_pandas() if params else session.sql(sql).to_pandas()
+            self.put(sql, data_version, df, params)
+        return df
+
+    def purge_stale(self, data_version: str) -> int:
+        prefix = _digest(data_version)[:16]
+        removed = 0
+        for path in self.directory.glob('*.parquet'):
+            if not path.name.startswith(prefix):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.directory.glob('*.parquet'):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.glob('*.parquet'))
+
+    def evict(self) -> None:
+        entries = []
+        for path in self.directory.glob('*.parquet'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def data_version(session) -> str:
+    version = session.sql(DATA_VERSION_SQL).collect()[0]['DATA_VERSION']
+    return str(version) if version is not None else 'empty'
@@ -0,0 +1,101 @@
+from typing import Mapping, Optional
+import numpy as np
+import pandas as pd
+
+SCENARIO_DELTA_COLUMNS = [
+    'FCF_DELTA_PCT', 'ROCE_DELTA_PCT', 'SAFETY_STOCK_DELTA_PCT',
+    'PIPELINE_STOCK_DELTA_PCT', 'LEAD_TIME_DELTA_DAYS'
+]
+
+BASELINE_COLUMNS = [
+    'PERFORMANCE_MONTH', 'REGION', 'FREE_CASH_FLOW_USD', 'ROCE_PCT',
+    'SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'FORECAST_MAPE_PCT'
+]
+
+PREDICTION_COLUMNS = [
+    'PREDICTED_FCF_USD', 'PREDICTED_ROCE_PCT',
+    'PREDICTED_SAFETY_STOCK_USD', 'PREDICTED_PIPELINE_STOCK_USD',
+    'LEAD_TIME_IMPACT_FCF', 'FORECAST_ERROR_IMPACT_SAFETY',
+    'FCF_LOWER_BOUND', 'FCF_UPPER_BOUND',
+    'ROCE_LOWER_BOUND', 'ROCE_UPPER_BOUND'
+]
+
+FCF_BOUND_PCT = 0.15
+ROCE_BOUND_PCT = 0.10
+
+
+def select_scenario(scenario_df: pd.DataFrame, strategy_mode: str, shock_event: Optional[str]) -> Optional[pd.Series]:
+    if shock_event is None or shock_event == "None":
+        shock_mask = scenario_df['SHOCK_EVENT'].isna()
+    else:
+        shock_mask = scenario_df['SHOCK_EVENT'] == shock_event
+    match = scenario_df[(scenario_df['STRATEGY_MODE'] == strategy_mode) & shock_mask]
+    return match.iloc[0] if len(match) > 0 else None
+
+
+def custom_scenario(base_scenario: Mapping, shock_event: str = "CUSTOM", **delta_shifts: float) -> pd.Series:
+    unknown = set(delta_shifts) - set(SCENARIO_DELTA_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown scenario deltas: {sorted(unknown)}")
+
+    scenario = pd.Series(dict(base_scenario))
+    for column, shift in delta_shifts.items():
+        scenario[column] = float(scenario.get(column, 0) or 0) + shift
+    scenario['SHOCK_EVENT'] = shock_event
+    scenario['SCENARIO_ID'] = None
+    return scenario
+
+
+def apply_scenario(baseline_df: pd.DataFrame, scenario: Optional[Mapping] = None) -> pd.DataFrame:
+    if baseline_df.empty:
+        return pd.DataFrame(columns=['PERFORMANCE_MONTH', 'REGION'] + PREDICTION_COLUMNS)
+
+    if scenario is not None and 'STRATEGY_MODE' in baseline_df.columns and scenario.get('STRATEGY_MODE'):
+        baseline_df = baseline_df[baseline_df['STRATEGY_MODE'] == scenario['STRATEGY_MODE']]
+
+    def delta(column: str):
+        if scenario is not None:
+            return float(scenario.get(column, 0) or 0)
+        return baseline_df[column].to_numpy(dtype=float)
+
+    return _predict(baseline_df, {column: delta(column) for column in SCENARIO_DELTA_COLUMNS})
+
+
+def apply_scenarios(baseline_df: pd.DataFrame, scenario_df: pd.DataFrame) -> pd.DataFrame:
+    merged = baseline_df[BASELINE_COLUMNS + ['STRATEGY_MODE']].merge(
+        scenario_df[['SCENARIO_ID', 'STRATEGY_MODE'] + SCENARIO_DELTA_COLUMNS],
+        on='STRATEGY_MODE', how='inner'
+    )
+    deltas = {column: merged[column].to_numpy(dtype=float) for column in SCENARIO_DELTA_COLUMNS}
+    predictions = _predict(merged, deltas)
+    predictions.insert(2, 'SCENARIO_ID', merged['SCENARIO_ID'].to_numpy())
+    return predictions
+
+
+def _predict(baseline_df: pd.DataFrame, deltas: dict) -> pd.DataFrame:
+    base_fcf = baseline_df['FREE_CASH_FLOW_USD'].to_numpy(dtype=float)
+    base_roce = baseline_df['ROCE_PCT'].to_numpy(dtype=float)
+    base_safety = baseline_df['SAFETY_STOCK_VALUE'].to_numpy(dtype=float)
+    base_pipeline = baseline_df['PIPELINE_STOCK_VALUE'].to_numpy(dtype=float)
+    base_mape = baseline_df['FORECAST_MAPE_PCT'].to_numpy(dtype=float)
+
+    pred_fcf = base_fcf * (1 + deltas['FCF_DELTA_PCT'] / 100)
+    pred_roce = base_roce + deltas['ROCE_DELTA_PCT']
+    pred_safety = base_safety * (1 + deltas['SAFETY_STOCK_DELTA_PCT'] / 100)
+    pred_pipeline = base_pipeline * (1 + deltas['PIPELINE_STOCK_DELTA_PCT'] / 100)
+    lead_time_impact = np.broadcast_to(-np.asarray(deltas['LEAD_TIME_DELTA_DAYS']) * 50000, base_fcf.shape)
+
+    return pd.DataFrame({
+        'PERFORMANCE_MONTH': baseline_df['PERFORMANCE_MONTH'].to_numpy(),
+        'REGION': baseline_df['REGION'].to_numpy(),
+        'PREDICTED_FCF_USD': pred_fcf,
+        'PREDICTED_ROCE_PCT': pred_roce,
+        'PREDICTED_SAFETY_STOCK_USD': pred_safety,
+        'PREDICTED_PIPELINE_STOCK_USD': pred_pipeline,
+        'LEAD_TIME_IMPACT_FCF': lead_time_impact,
+        'FORECAST_ERROR_IMPACT_SAFETY': base_mape * 20000,
+        'FCF_LOWER_BOUND': pred_fcf * (1 - FCF_BOUND_PCT),
+        'FCF_UPPER_BOUND': pred_fcf * (1 + FCF_BOUND_PCT),
+        'ROCE_LOWER_BOUND': pred_roce * (1 - ROCE_BOUND_PCT),
+        'ROCE_UPPER_BOUND': pred_roce * (1 + ROCE_BOUND_PCT)
+    })
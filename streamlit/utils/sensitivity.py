@@ -0,0 +1,51 @@
+from typing import Dict, Union
+import numpy as np
+import pandas as pd
+
+PIPELINE_CAPITAL_PER_LEAD_DAY = 150000
+CYCLE_STOCK_BATCH_ELASTICITY = 0.5
+
+
+def sensitivity_aggregates(current_data: pd.DataFrame) -> Dict[str, float]:
+    return {
+        'current_roce': float(current_data['ROCE_PCT'].mean()),
+        'safety_stock': float(current_data['SAFETY_STOCK_VALUE'].sum()),
+        'capital_employed': float(current_data['CAPITAL_EMPLOYED_USD'].sum()),
+        'cycle_stock': float(current_data['CYCLE_STOCK_VALUE'].sum()),
+        'nopat': float(current_data['NOPAT_USD'].sum())
+    }
+
+
+def calculate_roce_surface(aggregates: Dict[str, float], safety_reduction_pct, lead_time_delta, batch_delta) -> Dict[str, np.ndarray]:
+    safety_reduction_pct, lead_time_delta, batch_delta = np.broadcast_arrays(
+        np.asarray(safety_reduction_pct, dtype=float),
+        np.asarray(lead_time_delta, dtype=float),
+        np.asarray(batch_delta, dtype=float)
+    )
+    current_roce = aggregates['current_roce']
+
+    capital_freed = aggregates['safety_stock'] * (safety_reduction_pct / 100)
+    pipeline_impact = lead_time_delta * PIPELINE_CAPITAL_PER_LEAD_DAY
+    cycle_impact = aggregates['cycle_stock'] * (batch_delta / 100) * CYCLE_STOCK_BATCH_ELASTICITY
+
+    new_capital = aggregates['capital_employed'] - capital_freed + pipeline_impact + cycle_impact
+    positive = new_capital > 0
+    new_roce = np.where(positive, aggregates['nopat'] / np.where(positive, new_capital, 1) * 100, 0.0)
+
+    return {
+        'current_roce': np.full(new_roce.shape, current_roce),
+        'new_roce': new_roce,
+        'roce_delta': new_roce - current_roce,
+        'roce_delta_bps': (new_roce - current_roce) * 100,
+        'capital_freed': capital_freed,
+        'pipeline_impact': pipeline_impact,
+        'cycle_impact': cycle_impact,
+        'net_capital_impact': capital_freed - pipeline_impact - cycle_impact
+    }
+
+
+def calculate_roce_sensitivity(current_data: Union[pd.DataFrame, Dict[str, float]], safety_reduction_pct,
+                               lead_time_delta, batch_delta) -> Dict[str, float]:
+    aggregates = current_data if isinstance(current_data, dict) else sensitivity_aggregates(current_data)
+    surface = calculate_roce_surface(aggregates, safety_reduction_pct, lead_time_delta, batch_delta)
+    return {key: float(value) for key, value in surface.items()}
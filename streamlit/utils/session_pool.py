@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+POOL_CONNECTION_ENV = 'CAUSAL_CHAIN_POOL_CONNECTION'
+DEFAULT_POOL_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_HEALTH_CHECK_AFTER = 30.0
+DEFAULT_CHECKOUT_TIMEOUT = 60.0
+HEALTH_CHECK_SQL = "SELECT 1"
+
+logger = logging.getLogger('causal_chain.session_pool')
+
+_pools: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+
+
+class SessionPoolTimeout(RuntimeError):
+    pass
+
+
+class SessionPoolClosed(RuntimeError):
+    pass
+
+
+class SessionPool:
+    def __init__(self, factory: Callable[[], object], max_size: int = DEFAULT_POOL_SIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT, health_check_after: float = DEFAULT_HEALTH_CHECK_AFTER):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self._idle: List[Tuple[float, object]] = []
+        self._size = 0
+        self._closed = False
+        self._available = threading.Condition()
+        self.stats: Dict[str, int] = {'created': 0, 'reused': 0, 'evicted': 0, 'unhealthy': 0}
+
+    @contextmanager
+    def checkout(self, timeout: float = DEFAULT_CHECKOUT_TIMEOUT) -> Iterator[object]:
+        session = self._acquire(timeout)
+        healthy = True
+        try:
+            yield session
+        except Exception:
+            healthy = self._is_healthy(session)
+            raise
+        finally:
+            self._release(session, healthy)
+
+    def _acquire(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._available:
+                if self._closed:
+                    raise SessionPoolClosed("Session pool is closed")
+                stale = self._evict_idle()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if self._closed:
+                        raise SessionPoolClosed("Session pool is closed")
+                    if remaining <= 0:
+                        raise SessionPoolTimeout(f"No pooled session free after {timeout:g}s")
+                    self._available.wait(remaining)
+                if self._idle:
+                    # Most recently used first, so the oldest sessions drift out through idle eviction.
+                    idle_since, session = self._idle.pop()
+                else:
+                    idle_since, session = None, None
+                    self._size += 1
+            _close_all(stale)
+
+            if session is None:
+                try:
+                    session = self.factory()
+                except Exception:
+                    with self._available:
+                        self._size -= 1
+                        self._available.notify()
+                    raise
+                self._count('created')
+                return session
+
+            if time.monotonic() - idle_since < self.health_check_after or self._is_healthy(session):
+                self._count('reused')
+                return session
+            self._count('unhealthy')
+            self._discard(session)
+
+    def _release(self, session, healthy: bool) -> None:
+        if not healthy:
+            self._count('unhealthy')
+            self._discard(session)
+            return
+        with self._available:
+            if not self._closed:
+                self._idle.append((time.monotonic(), session))
+                self._available.notify()
+                return
+            self._size -= 1
+        _close_all([session])
+
+    def _count(self, stat: str) -> None:
+        with self._available:
+            self.stats[stat] += 1
+
+    def _discard(self, session) -> None:
+        with self._available:
+            self._size -= 1
+            self._available.notify()
+        _close_all([session])
+
+    def _evict_idle(self) -> List[object]:
+        cutoff = time.monotonic() - self.idle_timeout
+        stale = [session for idle_since, session in self._idle if idle_since < cutoff]
+        if stale:
+            self._idle = [(idle_since, session) for idle_since, session in self._idle if idle_since >= cutoff]
+            self._size -= len(stale)
+            self.stats['evicted'] += len(stale)
+            self._available.notify(len(stale))
+        return stale
+
+    def _is_healthy(self, session) -> bool:
+        try:
+            session.sql(HEALTH_CHECK_SQL).collect()
+            return True
+        except Exception as e:
+            logger.warning("Discarding pooled session that failed its health check: %s", e)
+            return False
+
+    def evict_idle(self) -> int:
+        with self._available:
+            stale = self._evict_idle()
+        _close_all(stale)
+        return len(stale)
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            stale = [session for _, session in self._idle]
+            self._idle = []
+            self._size -= len(stale)
+            self._available.notify_all()
+        _close_all(stale)
+
+
+def _close_all(sessions: List[object]) -> None:
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as e:
+            logger.warning("Failed to close pooled session: %s", e)
+
+
+def session_factory(primary) -> Optional[Callable[[], object]]:
+    if hasattr(primary, 'session_factory'):
+        return primary.session_factory()
+    connection_name = os.environ.get(POOL_CONNECTION_ENV)
+    if connection_name:
+        from snowflake.snowpark import Session
+        return lambda: Session.builder.config('connection_name', connection_name).create()
+    # Streamlit in Snowflake exposes a single active session and no credentials to open more.
+    return None
+
+
+def pool_for(primary, max_size: int = DEFAULT_POOL_SIZE) -> Optional[SessionPool]:
+    with _pools_lock:
+        if primary in _pools:
+            return _pools[primary]
+        factory = session_factory(primary)
+        pool = SessionPool(factory, max_size=max_size) if factory is not None else None
+        _pools[primary] = pool
+        return pool
+
+
+def close_pool_for(primary) -> None:
+    with _pools_lock:
+        pool = _pools.pop(primary, None)
+    if pool is not None:
+        pool.close()
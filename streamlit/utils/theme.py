@@ -0,0 +1,65 @@
+import plotly.graph_objects as go
+
+
+DARK_BG = "#000000"
+CARD_BG = "#24323D"
+BORDER = "#334155"
+TEXT = "#FFFFFF"
+TEXT_MUTED = "#8A999E"
+SNOWFLAKE_BLUE = "#29B5E8"
+STAR_BLUE = "#71D3DC"
+MID_BLUE = "#11567F"
+VALENCIA_ORANGE = "#FF9F36"
+PURPLE_MOON = "#7D44CF"
+FIRST_LIGHT = "#D45B90"
+
+CATEGORICAL_COLORS = ['#29B5E8', '#FF9F36', '#71D3DC', '#7D44CF', '#D45B90', '#8A999E']
+SNOWFLAKE_BLUES = ['#E6F7FC', '#CCF0F9', '#99E1F3', '#66D2ED', '#29B5E8', '#2198C8', '#197BA8', '#11567F', '#003545']
+BLUE_ORANGE_DIVERGING = ['#003545', '#11567F', '#29B5E8', '#71D3DC', '#8A999E', '#FFBF6B', '#FF9F36', '#E68A2E', '#CC7A29']
+
+ACRONYM_DEFINITIONS = {
+    'ROCE': ('Return on Capital Employed', 'Measures profitability relative to capital invested. ROCE = NOPAT / Capital Employed'),
+    'NOPAT': ('Net Operating Profit After Tax', 'Operating profit minus taxes, excluding financing costs. Shows true operational performance'),
+    'FCF': ('Free Cash Flow', 'Cash generated after capital expenditures. Available for dividends, debt repayment, or reinvestment'),
+    'DIOH': ('Days Inventory On Hand', 'Average number of days inventory is held before sale. Lower = faster turnover'),
+    'MAPE': ('Mean Absolute Percentage Error', 'Forecast accuracy metric. Lower values indicate more accurate demand predictions'),
+    'OEE': ('Overall Equipment Effectiveness', 'Manufacturing productivity metric combining availability, performance, and quality'),
+    'OTIF': ('On Time In Full', 'Delivery performance metric. Percentage of orders delivered complete and on schedule'),
+    'COGS': ('Cost of Goods Sold', 'Direct costs of producing goods sold. Includes materials, labor, and manufacturing overhead'),
+    'SKU': ('Stock Keeping Unit', 'Unique identifier for each distinct product. SKU breadth = product variety offered'),
+    'NPI': ('New Product Introduction', 'Process of bringing new products to market. Impacts SKU breadth and inventory complexity'),
+    'CapEx': ('Capital Expenditure', 'Funds used to acquire or upgrade physical assets like equipment or facilities'),
+    'WC': ('Working Capital', 'Current assets minus current liabilities. Measures short-term liquidity'),
+    'CI': ('Confidence Interval', 'Statistical range likely to contain the true value. Wider CI = more uncertainty'),
+    'EVA': ('Economic Value Added', 'Net operating profit minus cost of capital. Positive EVA means value creation above required returns'),
+}
+
+def acronym_with_tooltip(acronym, color=None):
+    if acronym not in ACRONYM_DEFINITIONS:
+        return acronym
+    full_name, description = ACRONYM_DEFINITIONS[acronym]
+    text_color = color if color else TEXT_MUTED
+    return f'''<span style="position: relative; cursor: help; border-bottom: 1px dotted {TEXT_MUTED};" title="{full_name}: {description}">{acronym}<sup style="font-size: 0.5rem; color: {SNOWFLAKE_BLUE}; margin-left: 1px;">ⓘ</sup></span>'''
+
+def text_with_acronym_tooltips(text, color=None):
+    result = text
+    for acronym in ACRONYM_DEFINITIONS.keys():
+        if acronym in result:
+            result = result.replace(acronym, acronym_with_tooltip(acronym, color))
+    return result
+
+
+def apply_dark_theme(fig: go.Figure) -> go.Figure:
+    fig.update_layout(
+        paper_bgcolor=DARK_BG,
+        plot_bgcolor=CARD_BG,
+        font=dict(color=TEXT, family="Inter, sans-serif"),
+        title_font=dict(color=SNOWFLAKE_BLUE, size=16),
+        hoverlabel=dict(bgcolor=CARD_BG, bordercolor=SNOWFLAKE_BLUE, font_color=TEXT),
+        legend=dict(bgcolor='rgba(36, 50, 61, 0.8)', bordercolor=SNOWFLAKE_BLUE, font=dict(color=TEXT)),
+        colorway=CATEGORICAL_COLORS,
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    fig.update_xaxes(gridcolor=BORDER, zerolinecolor=BORDER, tickfont=dict(color=TEXT_MUTED))
+    fig.update_yaxes(gridcolor=BORDER, zerolinecolor=BORDER, tickfont=dict(color=TEXT_MUTED))
+    return fig
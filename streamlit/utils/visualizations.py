@@ -1,6 +1,11 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
 
 DARK_BG = "#0f172a"
 CARD_BG = "#1e293b"
@@ -12,6 +17,78 @@ COST_COLOR = "#f59e0b"
 CASH_COLOR = "#3b82f6"
 NEGATIVE_COLOR = "#ef4444"
 
+SANKEY_DRIVER_NODES = ['FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'BATCH_SIZE', 'OEE_PCT']
+SANKEY_LEVER_NODES = ['SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'CYCLE_STOCK_VALUE', 'COGS_USD']
+SANKEY_OUTCOME_NODES = ['ROCE_PCT', 'FREE_CASH_FLOW_USD', 'GROSS_MARGIN_PCT']
+SANKEY_COLUMNS = ['SOURCE_METRIC', 'TARGET_METRIC', 'CAUSAL_WEIGHT', 'RELATIONSHIP_TYPE']
+FIGURE_CACHE_MAX_ENTRIES = 64
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(df.columns), [str(dtype) for dtype in df.dtypes], df.shape)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _fingerprint(value) -> Hashable:
+    if isinstance(value, pd.DataFrame):
+        return frame_fingerprint(value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _fingerprint(item)) for key, item in value.items()))
+    return value
+
+
+class MemoCache:
+    def __init__(self, max_entries: int = FIGURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], object]):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+figure_cache = MemoCache()
+_sankey_layouts = MemoCache(max_entries=16)
+
+
+def clear_figure_caches() -> None:
+    figure_cache.clear()
+    _sankey_layouts.clear()
+
+
+def memoized_figure(fn: Callable[..., go.Figure]) -> Callable[..., go.Figure]:
+    # Cached figures are shared between reruns and sessions; copy with go.Figure(fig) before mutating one.
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (
+            fn.__name__,
+            tuple(_fingerprint(arg) for arg in args),
+            tuple(sorted((name, _fingerprint(value)) for name, value in kwargs.items()))
+        )
+        return figure_cache.get_or_build(key, lambda: fn(*args, **kwargs))
+    wrapper.uncached = fn
+    return wrapper
+
 
 def apply_dark_theme(fig: go.Figure) -> go.Figure:
     fig.update_layout(
@@ -26,37 +103,38 @@ def apply_dark_theme(fig: go.Figure) -> go.Figure:
     return fig
 
 
+def sankey_layout(traces_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    traces = traces_df[SANKEY_COLUMNS]
+    return _sankey_layouts.get_or_build(frame_fingerprint(traces), lambda: _build_sankey_layout(traces))
+
+
+def _build_sankey_layout(traces: pd.DataFrame) -> Dict[str, np.ndarray]:
+    codes, nodes = pd.factorize(
+        pd.concat([traces['SOURCE_METRIC'], traces['TARGET_METRIC']], ignore_index=True).astype(str)
+    )
+    n_links = len(traces)
+    node_colors = np.select(
+        [nodes.isin(SANKEY_DRIVER_NODES), nodes.isin(SANKEY_LEVER_NODES), nodes.isin(SANKEY_OUTCOME_NODES)],
+        [COST_COLOR, SNOWFLAKE_BLUE, SERVICE_COLOR], default=BORDER
+    )
+    labels = nodes.str.replace('_', ' ').str.replace(' PCT', '%').str.replace(' USD', ' $').str.title()
+    return {
+        'labels': labels.to_numpy(),
+        'node_colors': node_colors,
+        'sources': codes[:n_links],
+        'targets': codes[n_links:],
+        'values': np.abs(traces['CAUSAL_WEIGHT'].to_numpy(dtype=float)) * 10,
+        'link_colors': np.where(traces['RELATIONSHIP_TYPE'].to_numpy() == 'POSITIVE',
+                                'rgba(34,197,94,0.6)', 'rgba(239,68,68,0.6)')
+    }
+
+
+@memoized_figure
 def create_causal_sankey(traces_df: pd.DataFrame) -> go.Figure:
     if traces_df.empty:
         return go.Figure()
     
-    all_nodes = list(set(traces_df['SOURCE_METRIC'].tolist() + 
-                        traces_df['TARGET_METRIC'].tolist()))
-    node_indices = {node: i for i, node in enumerate(all_nodes)}
-    
-    driver_nodes = ['FORECAST_MAPE_PCT', 'LEAD_TIME_DAYS', 'BATCH_SIZE', 'OEE_PCT']
-    lever_nodes = ['SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'CYCLE_STOCK_VALUE', 'COGS_USD']
-    outcome_nodes = ['ROCE_PCT', 'FREE_CASH_FLOW_USD', 'GROSS_MARGIN_PCT']
-    
-    node_colors = []
-    for node in all_nodes:
-        if node in driver_nodes:
-            node_colors.append(COST_COLOR)
-        elif node in lever_nodes:
-            node_colors.append(SNOWFLAKE_BLUE)
-        elif node in outcome_nodes:
-            node_colors.append(SERVICE_COLOR)
-        else:
-            node_colors.append(BORDER)
-    
-    sources = [node_indices.get(s, 0) for s in traces_df['SOURCE_METRIC']]
-    targets = [node_indices.get(t, 0) for t in traces_df['TARGET_METRIC']]
-    values = [abs(w) * 10 for w in traces_df['CAUSAL_WEIGHT'].tolist()]
-    colors = ['rgba(34,197,94,0.6)' if r == 'POSITIVE' else 'rgba(239,68,68,0.6)' 
-              for r in traces_df['RELATIONSHIP_TYPE']]
-    
-    node_labels = [n.replace('_', ' ').replace(' PCT', '%').replace(' USD', ' $').title() 
-                   for n in all_nodes]
+    layout = sankey_layout(traces_df)
     
     fig = go.Figure(go.Sankey(
         arrangement='snap',
@@ -64,15 +142,15 @@ def create_causal_sankey(traces_df: pd.DataFrame) -> go.Figure:
             pad=20,
             thickness=25,
             line=dict(color=BORDER, width=1),
-            label=node_labels,
-            color=node_colors,
+            label=layout['labels'],
+            color=layout['node_colors'],
             hovertemplate='%{label}<extra></extra>'
         ),
         link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            color=colors,
+            source=layout['sources'],
+            target=layout['targets'],
+            value=layout['values'],
+            color=layout['link_colors'],
             hovertemplate='%{source.label} → %{target.label}<br>Weight: %{value:.1f}<extra></extra>'
         )
     ))
@@ -86,6 +164,7 @@ def create_causal_sankey(traces_df: pd.DataFrame) -> go.Figure:
     return apply_dark_theme(fig)
 
 
+@memoized_figure
 def create_triangle_heatmap(service_val: float, cost_val: float, cash_val: float, 
                             mode: str, weights: Dict[str, float]) -> go.Figure:
     vertices = {
@@ -167,6 +246,7 @@ def create_triangle_heatmap(service_val: float, cost_val: float, cash_val: float
     return apply_dark_theme(fig)
 
 
+@memoized_figure
 def create_comparison_chart(baseline_df: pd.DataFrame, scenario_df: pd.DataFrame,
                            metric: str, title: str) -> go.Figure:
     fig = go.Figure()
@@ -236,6 +316,7 @@ def create_roce_gauge(current: float, projected: float, target: float = 15.0) ->
     return apply_dark_theme(fig)
 
 
+@memoized_figure
 def create_waterfall_impact(impacts: Dict[str, float], title: str) -> go.Figure:
     labels = list(impacts.keys())
     values = list(impacts.values())
@@ -1,6 +1,9 @@
+import argparse
 import random
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
@@ -13,14 +16,17 @@ STRATEGY_MODES = ['GROWTH', 'MARGIN', 'CASH']
 INVENTORY_TYPES = ['CYCLE', 'SAFETY', 'PIPELINE', 'ANTICIPATION', 'STRATEGIC']
 SHOCK_EVENTS = [None, 'SUPPLY_DISRUPTION', 'PORT_STRIKE', 'DEMAND_SURGE', 'COMMODITY_SPIKE']
 
+MODE_ADJUSTMENTS = {
+    'GROWTH': {'otif': 3, 'margin': -2, 'roce': -1},
+    'MARGIN': {'otif': -2, 'margin': 4, 'roce': 1},
+    'CASH': {'otif': -1, 'margin': -1, 'roce': 3}
+}
+
 def generate_performance_snapshot(months=36):
     random.seed(RANDOM_SEED)
     np.random.seed(RANDOM_SEED)
     
-    end_date = datetime(2025, 12, 1)
-    start_date = end_date - relativedelta(months=months-1)
-    
-    dates = [start_date + relativedelta(months=i) for i in range(months)]
+    dates = month_dates(months)
     
     rows = []
     snapshot_id = 1
@@ -108,6 +114,220 @@ def generate_performance_snapshot(months=36):
     
     return pd.DataFrame(rows)
 
+def region_groups(n_regions=None, n_entities=1):
+    n_regions = len(REGIONS) if n_regions is None else n_regions
+    regions = REGIONS[:n_regions] + [f'REGION_{i + 1:03d}' for i in range(len(REGIONS), n_regions)]
+    if n_entities <= 1:
+        return [[region] for region in regions]
+    return [[f'{region}_{e + 1:05d}' for e in range(n_entities)] for region in regions]
+
+def region_labels(n_regions=None, n_entities=1):
+    return [label for group in region_groups(n_regions, n_entities) for label in group]
+
+def strategy_modes(n_modes=None):
+    n_modes = len(STRATEGY_MODES) if n_modes is None else n_modes
+    if not 1 <= n_modes <= len(STRATEGY_MODES):
+        raise ValueError(f"n_modes must be between 1 and {len(STRATEGY_MODES)}, got {n_modes}")
+    return STRATEGY_MODES[:n_modes]
+
+def month_dates(months=36):
+    end_date = datetime(2025, 12, 1)
+    start_date = end_date - relativedelta(months=months-1)
+    return [start_date + relativedelta(months=i) for i in range(months)]
+
+def generate_performance_snapshot_batched(months=36, n_regions=None, n_modes=None, n_entities=1):
+    np.random.seed(RANDOM_SEED)
+    return _performance_block(
+        np.random, month_dates(months), region_labels(n_regions, n_entities), strategy_modes(n_modes)
+    )
+
+def _performance_block(rng, dates, regions, modes, start_id=1):
+    n_dates, n_regions, n_modes = len(dates), len(regions), len(modes)
+    n = n_dates * n_regions * n_modes
+    
+    date_idx = np.repeat(np.arange(n_dates), n_regions * n_modes)
+    region_idx = np.tile(np.repeat(np.arange(n_regions), n_modes), n_dates)
+    mode_idx = np.tile(np.arange(n_modes), n_dates * n_regions)
+    
+    month_labels = np.array([d.strftime('%Y-%m-%d') for d in dates])
+    date_month = np.array([d.month for d in dates])[date_idx]
+    date_year = np.array([d.year for d in dates])[date_idx]
+    mode_names = np.array(modes)[mode_idx]
+    
+    adjustments = [MODE_ADJUSTMENTS.get(m, MODE_ADJUSTMENTS['CASH']) for m in modes]
+    otif_adj = np.array([a['otif'] for a in adjustments])[mode_idx]
+    margin_adj = np.array([a['margin'] for a in adjustments])[mode_idx]
+    roce_adj = np.array([a['roce'] for a in adjustments])[mode_idx]
+    is_growth = mode_names == 'GROWTH'
+    is_cash = mode_names == 'CASH'
+    
+    base_otif = rng.normal(92, 3, n)
+    base_margin = rng.normal(35, 5, n)
+    base_roce = rng.normal(15, 3, n)
+    
+    seasonal = np.sin(2 * np.pi * date_month / 12) * 2
+    trend = (date_month + (date_year - 2023) * 12) * 0.05
+    
+    cycle_stock = rng.uniform(5, 15, n) * 1_000_000
+    safety_stock = rng.uniform(3, 10, n) * 1_000_000
+    pipeline_stock = rng.uniform(2, 8, n) * 1_000_000
+    anticipation_stock = rng.uniform(0.5, 3, n) * 1_000_000 * (1 + seasonal * 0.3)
+    strategic_stock = rng.uniform(1, 5, n) * 1_000_000
+    total_inventory = cycle_stock + safety_stock + pipeline_stock + anticipation_stock + strategic_stock
+    
+    cogs = rng.uniform(50, 80, n) * 1_000_000
+    sga = rng.uniform(10, 20, n) * 1_000_000
+    nopat = rng.uniform(5, 15, n) * 1_000_000
+    capital_employed = rng.uniform(80, 120, n) * 1_000_000
+    wc_delta = rng.uniform(-2, 2, n) * 1_000_000
+    fa_delta = rng.uniform(-1, 1, n) * 1_000_000
+    fcf = nopat - wc_delta - fa_delta
+    eva = nopat - (capital_employed * 0.10)
+    
+    return pd.DataFrame({
+        'SNAPSHOT_ID': np.arange(start_id, start_id + n),
+        'PERFORMANCE_MONTH': month_labels[date_idx],
+        'REGION': np.array(regions)[region_idx],
+        'STRATEGY_MODE': mode_names,
+        'OTIF_PCT': np.round(np.clip(base_otif + otif_adj + seasonal, 80, 99), 2),
+        'FILL_RATE_PCT': np.round(np.clip(base_otif + otif_adj - 2 + rng.normal(0, 1, n), 85, 99), 2),
+        'NET_SALES_GROWTH_PCT': np.round(rng.normal(5, 3, n) + trend + np.where(is_growth, 2, 0), 2),
+        'LEAD_TIME_DAYS': np.round(np.maximum(3, rng.normal(12, 3, n) + np.where(is_growth, -2, 1)), 1),
+        'ORDER_FLEXIBILITY_SCORE': np.round(rng.uniform(70, 95, n), 1),
+        'FORECAST_MAPE_PCT': np.round(np.maximum(5, rng.normal(18, 5, n)), 1),
+        'FORECAST_BIAS_PCT': np.round(rng.normal(2, 3, n), 1),
+        'NPI_COUNT': np.maximum(0, rng.poisson(3, n) + np.where(is_growth, 2, 0)).astype(int),
+        'GROSS_MARGIN_PCT': np.round(np.clip(base_margin + margin_adj + seasonal, 20, 50), 2),
+        'EBITDA_MARGIN_PCT': np.round(np.clip(base_margin * 0.5 + margin_adj * 0.5, 5, 25), 2),
+        'COGS_USD': np.round(cogs, 2),
+        'SGA_USD': np.round(sga, 2),
+        'OEE_PCT': np.round(np.clip(rng.normal(78, 8, n), 60, 95), 1),
+        'FIRST_PASS_YIELD_PCT': np.round(np.clip(rng.normal(94, 3, n), 85, 99), 1),
+        'PURCHASING_PRICE_INDEX': np.round(rng.normal(100, 5, n) + trend * 0.5, 2),
+        'ROCE_PCT': np.round(np.clip(base_roce + roce_adj + trend * 0.2, 5, 25), 2),
+        'FREE_CASH_FLOW_USD': np.round(fcf, 2),
+        'CASH_CONVERSION_CYCLE_DAYS': np.round(np.maximum(20, rng.normal(45, 10, n) + np.where(is_cash, -5, 3)), 1),
+        'DIOH_DAYS': np.round(np.maximum(20, rng.normal(55, 12, n)), 1),
+        'DSO_DAYS': np.round(np.maximum(25, rng.normal(40, 8, n)), 1),
+        'DPO_DAYS': np.round(np.maximum(30, rng.normal(50, 10, n)), 1),
+        'ASSET_TURNS': np.round(rng.uniform(1.5, 3.5, n), 2),
+        'CYCLE_STOCK_VALUE': np.round(cycle_stock, 2),
+        'SAFETY_STOCK_VALUE': np.round(safety_stock, 2),
+        'PIPELINE_STOCK_VALUE': np.round(pipeline_stock, 2),
+        'ANTICIPATION_STOCK_VALUE': np.round(anticipation_stock, 2),
+        'STRATEGIC_STOCK_VALUE': np.round(strategic_stock, 2),
+        'TOTAL_INVENTORY_VALUE': np.round(total_inventory, 2),
+        'NOPAT_USD': np.round(nopat, 2),
+        'WORKING_CAPITAL_DELTA_USD': np.round(wc_delta, 2),
+        'FIXED_ASSET_DELTA_USD': np.round(fa_delta, 2),
+        'CAPITAL_EMPLOYED_USD': np.round(capital_employed, 2),
+        'EVA_USD': np.round(eva, 2)
+    })
+
+def iter_performance_snapshot_chunks(months=36, n_regions=None, n_modes=None, n_entities=1,
+                                     chunk_months=1, rng=None):
+    rng = np.random.RandomState(RANDOM_SEED) if rng is None else rng
+    dates = month_dates(months)
+    regions = region_labels(n_regions, n_entities)
+    modes = strategy_modes(n_modes)
+    
+    next_id = 1
+    for i in range(0, months, chunk_months):
+        chunk = _performance_block(rng, dates[i:i + chunk_months], regions, modes, start_id=next_id)
+        next_id += len(chunk)
+        yield chunk
+
+def iter_synthetic_chunks(months=36, n_regions=None, n_modes=None, n_entities=1, chunk_months=1):
+    scenario_df = generate_scenario_control()
+    bridge_rng = np.random.RandomState(RANDOM_SEED)
+    
+    next_bridge_id = 1
+    for perf_chunk in iter_performance_snapshot_chunks(months, n_regions, n_modes, n_entities, chunk_months):
+        bridge_chunk = _bridge_block(bridge_rng, perf_chunk, scenario_df, start_id=next_bridge_id)
+        next_bridge_id += len(bridge_chunk)
+        yield perf_chunk, bridge_chunk
+
+def partition_rng(table_index, month_index, region_index, seed=RANDOM_SEED):
+    # Same child as SeedSequence(seed).spawn(...)[table].spawn(...)[month].spawn(...)[region],
+    # built directly so any worker can derive its stream without walking the tree.
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(table_index, month_index, region_index)))
+
+def _generate_partition(task):
+    month_index, date, region_index, regions, modes, scenario_df, seed = task
+    perf = _performance_block(partition_rng(0, month_index, region_index, seed), [date], regions, modes)
+    bridge = _bridge_block(partition_rng(1, month_index, region_index, seed), perf, scenario_df)
+    return perf, bridge
+
+def iter_partitioned_chunks(months=36, n_regions=None, n_modes=None, n_entities=1,
+                            chunk_months=1, workers=1, seed=RANDOM_SEED):
+    dates = month_dates(months)
+    groups = region_groups(n_regions, n_entities)
+    modes = strategy_modes(n_modes)
+    scenario_df = generate_scenario_control()
+    
+    chunk_tasks = [
+        [(m, dates[m], r, group, modes, scenario_df, seed)
+         for m in range(i, min(i + chunk_months, months))
+         for r, group in enumerate(groups)]
+        for i in range(0, months, chunk_months)
+    ]
+    
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    mapper = partial(executor.map, chunksize=max(1, len(groups) // (workers * 4))) if executor else map
+    
+    next_snapshot_id = 1
+    next_bridge_id = 1
+    try:
+        # Submit the next month chunk before collecting the current one so the pool
+        # stays busy while the caller writes, without queueing the whole run in memory.
+        pending = mapper(_generate_partition, chunk_tasks[0]) if chunk_tasks else None
+        for i in range(len(chunk_tasks)):
+            current = pending
+            pending = mapper(_generate_partition, chunk_tasks[i + 1]) if i + 1 < len(chunk_tasks) else None
+            parts = list(current)
+            
+            perf_chunk = pd.concat([perf for perf, _ in parts], ignore_index=True)
+            bridge_chunk = pd.concat([bridge for _, bridge in parts], ignore_index=True)
+            perf_chunk['SNAPSHOT_ID'] = np.arange(next_snapshot_id, next_snapshot_id + len(perf_chunk))
+            bridge_chunk['BRIDGE_ID'] = np.arange(next_bridge_id, next_bridge_id + len(bridge_chunk))
+            next_snapshot_id += len(perf_chunk)
+            next_bridge_id += len(bridge_chunk)
+            yield perf_chunk, bridge_chunk
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+def write_partition(df, directory, part, fmt='parquet'):
+    if fmt == 'parquet':
+        path = directory / f"part-{part:05d}.parquet"
+        df.to_parquet(path, index=False)
+    elif fmt == 'csv.gz':
+        path = directory / f"part-{part:05d}.csv.gz"
+        df.to_csv(path, index=False, compression='gzip')
+    else:
+        raise ValueError(f"Unsupported partition format: {fmt}")
+    return path
+
+def _reset_partition_dir(directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    for old_part in directory.glob("part-*"):
+        old_part.unlink()
+    return directory
+
+def stream_synthetic_data(output_path, chunks, fmt='parquet'):
+    perf_dir = _reset_partition_dir(output_path / "fact_performance_snapshot")
+    bridge_dir = _reset_partition_dir(output_path / "predictive_bridge")
+    
+    perf_rows = 0
+    bridge_rows = 0
+    for part, (perf_chunk, bridge_chunk) in enumerate(chunks):
+        write_partition(perf_chunk, perf_dir, part, fmt)
+        write_partition(bridge_chunk, bridge_dir, part, fmt)
+        perf_rows += len(perf_chunk)
+        bridge_rows += len(bridge_chunk)
+    
+    return perf_rows, bridge_rows
+
 def generate_inventory_structure():
     data = [
         {
@@ -247,61 +467,53 @@ def generate_scenario_control():
 def generate_predictive_bridge(perf_df, scenario_df):
     random.seed(RANDOM_SEED)
     np.random.seed(RANDOM_SEED)
+    return _bridge_block(np.random, perf_df, scenario_df)
+
+def _bridge_block(rng, perf_df, scenario_df, start_id=1):
+    base = perf_df.drop_duplicates(['PERFORMANCE_MONTH', 'REGION', 'STRATEGY_MODE'])[[
+        'PERFORMANCE_MONTH', 'REGION', 'STRATEGY_MODE', 'FREE_CASH_FLOW_USD', 'ROCE_PCT',
+        'SAFETY_STOCK_VALUE', 'PIPELINE_STOCK_VALUE', 'FORECAST_MAPE_PCT', 'CYCLE_STOCK_VALUE'
+    ]]
+    base = base.assign(
+        _MONTH_ORDER=pd.factorize(base['PERFORMANCE_MONTH'])[0],
+        _REGION_ORDER=pd.factorize(base['REGION'])[0]
+    )
+    scenarios = scenario_df[[
+        'SCENARIO_ID', 'STRATEGY_MODE', 'FCF_DELTA_PCT', 'ROCE_DELTA_PCT',
+        'SAFETY_STOCK_DELTA_PCT', 'PIPELINE_STOCK_DELTA_PCT', 'LEAD_TIME_DELTA_DAYS'
+    ]].assign(_SCENARIO_ORDER=np.arange(len(scenario_df)))
     
-    rows = []
-    bridge_id = 1
-    
-    months = perf_df['PERFORMANCE_MONTH'].unique()
-    regions = perf_df['REGION'].unique()
-    
-    for month in months:
-        for region in regions:
-            for _, scenario in scenario_df.iterrows():
-                base_perf = perf_df[
-                    (perf_df['PERFORMANCE_MONTH'] == month) & 
-                    (perf_df['REGION'] == region) &
-                    (perf_df['STRATEGY_MODE'] == scenario['STRATEGY_MODE'])
-                ]
-                
-                if len(base_perf) == 0:
-                    continue
-                    
-                base = base_perf.iloc[0]
-                
-                base_fcf = base['FREE_CASH_FLOW_USD']
-                base_roce = base['ROCE_PCT']
-                base_safety = base['SAFETY_STOCK_VALUE']
-                base_pipeline = base['PIPELINE_STOCK_VALUE']
-                
-                pred_fcf = base_fcf * (1 + scenario['FCF_DELTA_PCT'] / 100)
-                pred_roce = base_roce + scenario['ROCE_DELTA_PCT']
-                pred_safety = base_safety * (1 + scenario['SAFETY_STOCK_DELTA_PCT'] / 100)
-                pred_pipeline = base_pipeline * (1 + scenario['PIPELINE_STOCK_DELTA_PCT'] / 100)
-                
-                noise = np.random.normal(0, 0.02)
-                
-                row = {
-                    'BRIDGE_ID': bridge_id,
-                    'PERFORMANCE_MONTH': month,
-                    'REGION': region,
-                    'SCENARIO_ID': scenario['SCENARIO_ID'],
-                    'PREDICTED_FCF_USD': round(pred_fcf * (1 + noise), 2),
-                    'PREDICTED_ROCE_PCT': round(pred_roce * (1 + noise * 0.5), 2),
-                    'PREDICTED_SAFETY_STOCK_USD': round(pred_safety * (1 + noise), 2),
-                    'PREDICTED_PIPELINE_STOCK_USD': round(pred_pipeline * (1 + noise), 2),
-                    'LEAD_TIME_IMPACT_FCF': round(-scenario['LEAD_TIME_DELTA_DAYS'] * 50000, 2),
-                    'FORECAST_ERROR_IMPACT_SAFETY': round(base['FORECAST_MAPE_PCT'] * 20000, 2),
-                    'BATCH_SIZE_IMPACT_CYCLE': round(base['CYCLE_STOCK_VALUE'] * 0.1 * np.random.uniform(0.8, 1.2), 2),
-                    'FCF_LOWER_BOUND': round(pred_fcf * 0.85, 2),
-                    'FCF_UPPER_BOUND': round(pred_fcf * 1.15, 2),
-                    'ROCE_LOWER_BOUND': round(pred_roce * 0.9, 2),
-                    'ROCE_UPPER_BOUND': round(pred_roce * 1.1, 2),
-                    'MODEL_SOURCE': 'XGBOOST' if np.random.random() > 0.3 else 'PROPHET'
-                }
-                rows.append(row)
-                bridge_id += 1
+    merged = base.merge(scenarios, on='STRATEGY_MODE', how='inner')
+    merged = merged.sort_values(['_MONTH_ORDER', '_REGION_ORDER', '_SCENARIO_ORDER'], kind='stable')
+    n = len(merged)
     
-    return pd.DataFrame(rows)
+    pred_fcf = merged['FREE_CASH_FLOW_USD'].to_numpy() * (1 + merged['FCF_DELTA_PCT'].to_numpy() / 100)
+    pred_roce = merged['ROCE_PCT'].to_numpy() + merged['ROCE_DELTA_PCT'].to_numpy()
+    pred_safety = merged['SAFETY_STOCK_VALUE'].to_numpy() * (1 + merged['SAFETY_STOCK_DELTA_PCT'].to_numpy() / 100)
+    pred_pipeline = merged['PIPELINE_STOCK_VALUE'].to_numpy() * (1 + merged['PIPELINE_STOCK_DELTA_PCT'].to_numpy() / 100)
+    
+    noise = rng.normal(0, 0.02, n)
+    batch_factor = rng.uniform(0.8, 1.2, n)
+    model_draw = rng.random(n)
+    
+    return pd.DataFrame({
+        'BRIDGE_ID': np.arange(start_id, start_id + n),
+        'PERFORMANCE_MONTH': merged['PERFORMANCE_MONTH'].to_numpy(),
+        'REGION': merged['REGION'].to_numpy(),
+        'SCENARIO_ID': merged['SCENARIO_ID'].to_numpy(),
+        'PREDICTED_FCF_USD': np.round(pred_fcf * (1 + noise), 2),
+        'PREDICTED_ROCE_PCT': np.round(pred_roce * (1 + noise * 0.5), 2),
+        'PREDICTED_SAFETY_STOCK_USD': np.round(pred_safety * (1 + noise), 2),
+        'PREDICTED_PIPELINE_STOCK_USD': np.round(pred_pipeline * (1 + noise), 2),
+        'LEAD_TIME_IMPACT_FCF': np.round(-merged['LEAD_TIME_DELTA_DAYS'].to_numpy() * 50000, 2),
+        'FORECAST_ERROR_IMPACT_SAFETY': np.round(merged['FORECAST_MAPE_PCT'].to_numpy() * 20000, 2),
+        'BATCH_SIZE_IMPACT_CYCLE': np.round(merged['CYCLE_STOCK_VALUE'].to_numpy() * 0.1 * batch_factor, 2),
+        'FCF_LOWER_BOUND': np.round(pred_fcf * 0.85, 2),
+        'FCF_UPPER_BOUND': np.round(pred_fcf * 1.15, 2),
+        'ROCE_LOWER_BOUND': np.round(pred_roce * 0.9, 2),
+        'ROCE_UPPER_BOUND': np.round(pred_roce * 1.1, 2),
+        'MODEL_SOURCE': np.where(model_draw > 0.3, 'XGBOOST', 'PROPHET')
+    })
 
 def generate_ml_registry():
     data = [
@@ -452,17 +664,67 @@ Target: 10% working capital reduction while maintaining 92% service floor.'''
     ]
     return pd.DataFrame(docs)
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic causal chain demo data")
+    parser.add_argument("--months", type=int, default=36, help="Number of monthly snapshots")
+    parser.add_argument("--batched", action="store_true",
+                        help="Draw every performance column as a whole NumPy array (for large volumes)")
+    parser.add_argument("--regions", type=int, default=None, help="Region count (implies --batched)")
+    parser.add_argument("--modes", type=int, default=None, help="Strategy mode count (implies --batched)")
+    parser.add_argument("--entities", type=int, default=None,
+                        help="Entities (sites/SKUs) per region, default 1 (implies --batched)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write performance and bridge tables as partitioned chunks (implies batched draws)")
+    parser.add_argument("--format", choices=["parquet", "csv.gz"], default="parquet",
+                        help="Partition file format for --stream")
+    parser.add_argument("--chunk-months", type=int, default=1, help="Months per partition for --stream")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Generate (month, region) partitions across N processes with per-partition seeds")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args(argv)
+    # Only the batched generator can size the grid, so asking for a size selects it.
+    if args.regions is not None or args.modes is not None or args.entities is not None:
+        args.batched = True
+    if args.entities is None:
+        args.entities = 1
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
     random.seed(RANDOM_SEED)
     np.random.seed(RANDOM_SEED)
     
-    output_path = Path(OUTPUT_DIR)
+    output_path = Path(args.output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    print("Generating performance snapshot (36 months x 4 regions x 3 modes)...")
-    perf_df = generate_performance_snapshot(36)
-    perf_df.to_csv(output_path / "fact_performance_snapshot.csv", index=False)
-    print(f"  Generated {len(perf_df)} rows")
+    if args.workers is not None:
+        chunks = iter_partitioned_chunks(args.months, args.regions, args.modes, args.entities,
+                                         args.chunk_months, args.workers)
+    elif args.stream:
+        chunks = iter_synthetic_chunks(args.months, args.regions, args.modes, args.entities, args.chunk_months)
+    
+    if args.stream:
+        print(f"Streaming performance snapshot and predictive bridge ({args.chunk_months}-month {args.format} partitions)...")
+        perf_rows, bridge_rows = stream_synthetic_data(output_path, chunks, args.format)
+        print(f"  Generated {perf_rows} performance rows and {bridge_rows} bridge rows")
+    elif args.workers is not None:
+        print(f"Generating performance snapshot and predictive bridge ({args.workers} workers)...")
+        perf_parts, bridge_parts = zip(*chunks)
+        perf_df = pd.concat(perf_parts, ignore_index=True)
+        bridge_df = pd.concat(bridge_parts, ignore_index=True)
+        perf_df.to_csv(output_path / "fact_performance_snapshot.csv", index=False)
+        print(f"  Generated {len(perf_df)} rows")
+    else:
+        if args.batched:
+            n_regions = len(region_labels(args.regions, args.entities))
+            n_modes = len(strategy_modes(args.modes))
+            print(f"Generating performance snapshot, batched ({args.months} months x {n_regions} regions x {n_modes} modes)...")
+            perf_df = generate_performance_snapshot_batched(args.months, args.regions, args.modes, args.entities)
+        else:
+            print(f"Generating performance snapshot ({args.months} months x 4 regions x 3 modes)...")
+            perf_df = generate_performance_snapshot(args.months)
+        perf_df.to_csv(output_path / "fact_performance_snapshot.csv", index=False)
+        print(f"  Generated {len(perf_df)} rows")
     
     print("Generating inventory structure definitions...")
     inv_df = generate_inventory_structure()
@@ -474,10 +736,12 @@ def main():
     scenario_df.to_csv(output_path / "scenario_control.csv", index=False)
     print(f"  Generated {len(scenario_df)} rows")
     
-    print("Generating predictive bridge (ML pre-computed)...")
-    bridge_df = generate_predictive_bridge(perf_df, scenario_df)
-    bridge_df.to_csv(output_path / "predictive_bridge.csv", index=False)
-    print(f"  Generated {len(bridge_df)} rows")
+    if not args.stream:
+        print("Generating predictive bridge (ML pre-computed)...")
+        if args.workers is None:
+            bridge_df = generate_predictive_bridge(perf_df, scenario_df)
+        bridge_df.to_csv(output_path / "predictive_bridge.csv", index=False)
+        print(f"  Generated {len(bridge_df)} rows")
     
     print("Generating ML prediction registry...")
     ml_df = generate_ml_registry()